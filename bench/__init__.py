@@ -0,0 +1,2 @@
+"""Benchmarks (run from project root: python3 -m bench.NAME, suite -
+python3 -m bench)."""
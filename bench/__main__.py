@@ -0,0 +1,246 @@
+"""Benchmark suite: widget lifecycle and one tick of built-in widgets under
+offscreen Qt with temporary paths.conf (user configs are not touched).
+Usage: python3 -m bench [--repeat N] [--save PATH] [--compare PATH]
+Results (ms) printed as JSON, with --compare - table of changes against
+saved baseline (exit code 1 if regressions found)."""
+import os
+import sys
+import json
+import time
+import shutil
+import base64
+import logging
+import platform
+import tempfile
+import statistics
+from argparse import ArgumentParser
+
+REPEAT = 5
+"""default count of runs for every benchmark"""
+THRESHOLD = 0.2
+"""relative median growth for regression"""
+NOISE = 0.05
+"""absolute median growth (ms) ignored in comparison"""
+TICKS = {
+    'cpu': 'setup_ui',
+    'ram': 'setup_ui',
+    'net_stat': 'setup_ui',
+    'digital_time': '_timeout',
+    'timer': '_tick',
+    'minecraft': '_list_fill'
+}
+"""built-in widgets ticks, keys - modules, values - Main methods"""
+SERVERS = 20
+"""count of stub servers for Minecraft"""
+
+
+def parse_args():
+    parser = ArgumentParser('python3 -m bench')
+    parser.add_argument('--repeat', default=REPEAT, type=int,
+                        help='runs for every benchmark')
+    parser.add_argument('--save', metavar='PATH',
+                        help='save results as baseline')
+    parser.add_argument('--compare', metavar='PATH',
+                        help='compare results with baseline')
+    parser.add_argument('--threshold', default=THRESHOLD, type=float,
+                        help='relative median growth for regression')
+    parser.add_argument('--keep', action='store_true',
+                        help='do not delete temporary directory')
+    return parser.parse_args()
+
+
+def measure(func, repeat, setup=None) -> dict:
+    """Call function and measure time.
+
+    :param func: function
+    :param repeat: int, count of runs
+    :param setup: function, called before every run (not measured)
+    :return: dict, min, median, mean (ms) and runs
+    """
+    times = []
+    for i in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return {'min': round(min(times), 4),
+            'median': round(statistics.median(times), 4),
+            'mean': round(statistics.mean(times), 4),
+            'runs': repeat}
+
+
+def get_module(manager, name) -> str:
+    return os.path.basename(manager.paths[name])[:-3]
+
+
+def place_builtin(manager):
+    """Place all built-in widgets (like Add button in main window)."""
+    from PyQt5.QtCore import Qt
+    from widgets import PATH
+    for name in list(manager.info):
+        if os.path.dirname(manager.paths[name]) != PATH:
+            continue
+        manager.config.create(name)
+        if not manager.load(get_module(manager, name), False):
+            manager.config.remove(name)
+            continue
+        widget = manager.widgets[name]
+        widget.place()
+        widget.setWindowFlags(Qt.CustomizeWindowHint |
+                              Qt.WindowStaysOnBottomHint | Qt.Tool)
+        widget.show()
+        manager.config.add(name)
+    manager.config.save()
+    manager.config.flush()
+
+
+def setup_minecraft(widget):
+    """Stub servers: fake status in cache, no network."""
+    import mcstatus.pinger
+    from core.paths import RES_DIR
+    with open(os.path.join(RES_DIR, 'minecraft', 'minecraft.png'), 'rb'
+              ) as file:
+        favicon = base64.b64encode(file.read()).decode('ASCII')
+    widget.poller.poll = lambda addresses, budget=None: None
+    widget.servers = ['127.0.0.%d:25565' % (i + 1) for i in range(SERVERS)]
+    status = {'players': {'online': 5, 'max': 100,
+                          'sample': [{'name': 'player', 'id': '0'}]},
+              'version': {'name': '1.12.2', 'protocol': 340},
+              'description': 'Fake server',
+              'favicon': 'data:image/png;base64,' + favicon}
+    for addr in widget.servers:
+        response = mcstatus.pinger.PingResponse(status)
+        response.latency = 10.0
+        widget.cache.put(addr, response)
+
+
+def run(repeat) -> dict:
+    """Boot app with temporary paths and run benchmarks.
+
+    :param repeat: int, count of runs
+    :return: dict, results, keys - benchmark names
+    """
+    from PyQt5.QtWidgets import QApplication
+    from core import properties
+    from core.metrics import get_hub
+    import core.gui.gui as gui
+    app = QApplication(sys.argv[:1])
+    app.setQuitOnLastWindowClosed(False)
+    results = {'gui_init': measure(
+        lambda: gui.__init__(app, properties.read_settings()), 1)}
+    manager, main = gui.manager, gui.main
+    manager.load_new()  # catalogue (loaded in idle time in app)
+    place_builtin(manager)
+
+    def unload():
+        manager.unload_all()
+        app.processEvents()
+
+    # load_all also creates placed widgets, load_placed - only them
+    results['load_all'] = measure(manager.load_all, repeat, unload)
+    results['load_placed'] = measure(manager.load_placed, repeat, unload)
+    name = next(iter(manager.widgets))
+
+    def config_save():  # one changed section
+        section = manager.config.config[name]
+        section['bench'] = str(int(section.get('bench', '0')) + 1)
+        manager.config.save(name)
+        manager.config.flush()
+
+    results['config_save'] = measure(config_save, repeat)
+    results['_list_fill'] = measure(main._list_fill, repeat)
+    results['unload_all'] = measure(manager.unload_all, repeat,
+                                    manager.load_all)
+    # ticks
+    manager.load_all()
+    app.processEvents()
+    modules = {get_module(manager, name): widget
+               for name, widget in manager.widgets.items()}
+    for module, method in TICKS.items():
+        widget = modules.get(module)
+        if not widget:
+            results['tick.' + module] = None  # not loaded (skipped)
+            continue
+        if module == 'minecraft':
+            setup_minecraft(widget)
+        func = getattr(widget, method)
+        if method == 'setup_ui':
+            snapshot = get_hub().sample(widget._get_fields())
+            results['tick.' + module] = measure(lambda: func(snapshot),
+                                                repeat)
+        else:
+            results['tick.' + module] = measure(func, repeat)
+    manager.unload_all()
+    return results
+
+
+def compare(results, baseline, threshold) -> list:
+    """Print comparison table.
+
+    :param results: dict, current results
+    :param baseline: dict, baseline results
+    :param threshold: float, relative median growth for regression
+    :return: list, regressed benchmark names
+    """
+    regressions = []
+    print('%-20s %12s %12s %8s' % ('benchmark', 'base, ms', 'now, ms', ''))
+    for name in sorted(set(results) | set(baseline)):
+        cur, base = results.get(name), baseline.get(name)
+        if not cur or not base:
+            print('%-20s %12s %12s' % (name,
+                                        base['median'] if base else '-',
+                                        cur['median'] if cur else '-'))
+            continue
+        ratio = cur['median'] / base['median'] if base['median'] else 1.0
+        mark = ''
+        if ratio > 1 + threshold and \
+                cur['median'] - base['median'] > NOISE:
+            mark = 'SLOWER'
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            mark = 'faster'
+        print('%-20s %12.3f %12.3f %+7.0f%% %s' % (
+            name, base['median'], cur['median'], (ratio - 1) * 100, mark))
+    return regressions
+
+
+def main():
+    args = parse_args()
+    tmp = tempfile.mkdtemp(prefix='dewidgets-bench-')
+    # core.paths parse argv at import
+    argv, sys.argv = sys.argv, [sys.argv[0], '-c', tmp]
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    logging.basicConfig(level=logging.CRITICAL)
+    from PyQt5.QtCore import qInstallMessageHandler
+    qInstallMessageHandler(lambda *args: None)  # offscreen plugin warnings
+    from core import properties
+    properties.create_default_settings()
+    sys.argv = argv
+    try:
+        data = {
+            'meta': {
+                'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'repeat': args.repeat
+            },
+            'results': run(args.repeat)
+        }
+    finally:
+        if not args.keep:
+            shutil.rmtree(tmp, ignore_errors=True)
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as file:
+            json.dump(data, file, indent=1)
+    if not args.compare:
+        print(json.dumps(data, indent=1))
+        return
+    with open(args.compare, encoding='utf-8') as file:
+        baseline = json.load(file)
+    if compare(data['results'], baseline['results'], args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
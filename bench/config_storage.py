@@ -0,0 +1,67 @@
+"""Save cost of one changed section (Simple Notes) for every config storage
+depending on other widgets data size.
+Usage: python3 -m bench.config_storage [saves] [--sizes KB,KB,...]"""
+import os
+import time
+import shutil
+import base64
+import tempfile
+from argparse import ArgumentParser
+from configparser import RawConfigParser
+from core.storage import IniStorage, DirStorage, SqliteStorage
+
+SECTIONS = 50
+"""count of other widgets sections"""
+
+
+def get_parser(size) -> RawConfigParser:
+    """Config with Simple Notes and other widgets data.
+
+    :param size: int, other widgets data size (KB)
+    :return: RawConfigParser
+    """
+    parser = RawConfigParser()
+    parser['Simple Notes'] = {'notes': 'note', 'x': '0', 'y': '0'}
+    chunk = base64.b64encode(os.urandom(size * 1024 * 3 // 4 // SECTIONS)
+                             ).decode('ASCII')
+    for i in range(SECTIONS):
+        parser['Widget ' + str(i)] = {'data': chunk, 'x': '0', 'y': '0'}
+    return parser
+
+
+def bench(storage, parser, saves) -> float:
+    """Edit one note and save, return mean time (ms)."""
+    storage.write(parser)
+    start = time.perf_counter()
+    for i in range(saves):
+        parser['Simple Notes']['notes'] = 'note ' + str(i)
+        storage.write(parser, ('Simple Notes',))
+    return (time.perf_counter() - start) * 1000 / saves
+
+
+def main():
+    parser = ArgumentParser('python3 -m bench.config_storage')
+    parser.add_argument('saves', nargs='?', default=200, type=int)
+    parser.add_argument('--sizes', default='0,100,1000,10000',
+                        help='other widgets data sizes (KB)')
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(',')]
+    print('%-10s' % 'others KB' + ''.join('%10s' % s for s in
+                                         ('ini', 'dir', 'sqlite')) + '  (ms)')
+    for size in sizes:
+        tmp = tempfile.mkdtemp(prefix='dewidgets-bench-')
+        try:
+            config = get_parser(size)
+            row = []
+            for storage in (IniStorage(os.path.join(tmp, 'widgets.conf')),
+                            DirStorage(os.path.join(tmp, 'widgets.d')),
+                            SqliteStorage(os.path.join(tmp, 'widgets.db'))):
+                row.append(bench(storage, config, args.saves))
+                storage.close()
+            print('%-10d' % size + ''.join('%10.3f' % t for t in row))
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
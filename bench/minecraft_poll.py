@@ -0,0 +1,123 @@
+"""Poll fake Minecraft servers with StatusPoller (one asyncio thread) and
+optionally with legacy process-per-server mcstatus pings.
+Usage: python3 -m bench.minecraft_poll [count] [--legacy N]
+Fake servers listen one port, addresses are 127.0.X.Y (loopback)."""
+import os
+import sys
+import json
+import time
+import asyncio
+import threading
+from argparse import ArgumentParser
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5.QtCore import QCoreApplication, QTimer
+from widgets.mc.ping import StatusPoller, pack_packet, pack_string, \
+    read_packet
+
+STATUS = json.dumps({
+    'version': {'name': '1.12.2', 'protocol': 340},
+    'players': {'max': 100, 'online': 5, 'sample': [
+        {'name': 'player' + str(i), 'id': '0-0-0-0-' + str(i)}
+        for i in range(5)]},
+    'description': {'text': 'Fake server'},
+    'favicon': 'data:image/png;base64,' + 'A' * 4096
+})
+
+
+async def handle(reader, writer):
+    """fake status server: answer status request and ping"""
+    try:
+        await read_packet(reader)  # handshake
+        await read_packet(reader)  # status request
+        writer.write(pack_packet(0, pack_string(STATUS)))
+        packet_id, data = await read_packet(reader)  # ping
+        writer.write(pack_packet(1, data))
+        await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+def start_server() -> int:
+    """Start fake server in thread.
+
+    :return: int, port
+    """
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(asyncio.start_server(
+        handle, '0.0.0.0', 0, backlog=1024))
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return server.sockets[0].getsockname()[1]
+
+
+def get_addresses(port, count) -> list:
+    return ['127.0.%d.%d:%d' % (i // 250, i % 250 + 1, port)
+            for i in range(count)]
+
+
+def bench_poller(addresses) -> tuple:
+    """Poll addresses with StatusPoller.
+
+    :return: tuple, (seconds, ok count, errors count)
+    """
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    poller = StatusPoller()
+    result = {'ok': 0, 'error': 0}
+
+    def on_result(addr, status, error):
+        result['ok' if status else 'error'] += 1
+
+    poller.result.connect(on_result)
+    poller.finished.connect(app.quit)
+    QTimer.singleShot(60000, app.quit)  # guard
+    start = time.perf_counter()
+    poller.poll(addresses)
+    app.exec()
+    elapsed = time.perf_counter() - start
+    poller.stop()
+    return elapsed, result['ok'], result['error']
+
+
+def bench_legacy(addresses) -> float:
+    """Poll addresses with process per server (old way).
+
+    :return: float, seconds
+    """
+    from multiprocessing import Process
+    from mcstatus import MinecraftServer
+
+    def ping(addr):
+        try:
+            MinecraftServer.lookup(addr).status()
+        except:
+            pass
+
+    start = time.perf_counter()
+    procs = [Process(target=ping, args=(addr,)) for addr in addresses]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = ArgumentParser('python3 -m bench.minecraft_poll')
+    parser.add_argument('count', nargs='?', default=1000, type=int)
+    parser.add_argument('--legacy', default=0, type=int,
+                        help='also ping N servers with process per server')
+    args = parser.parse_args()
+    port = start_server()
+    addresses = get_addresses(port, args.count)
+    elapsed, ok, errors = bench_poller(addresses)
+    print('poller: %d servers, %.3f s (%.0f servers/s), ok: %d, errors: %d'
+          % (len(addresses), elapsed, len(addresses) / elapsed, ok, errors))
+    if args.legacy:
+        elapsed = bench_legacy(addresses[:args.legacy])
+        print('legacy: %d servers, %.3f s (%.0f servers/s)' %
+              (args.legacy, elapsed, args.legacy / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""Check Resolver cache offline with stub DNS (fake clock, no network):
+TTL limits, negative caching, SRV records, then measure resolving from
+cache against stub queries.
+Usage: python3 -m bench.minecraft_resolver [count] [--latency MS]
+Exit code 1 if a check failed."""
+import sys
+import time
+from argparse import ArgumentParser
+from widgets.mc.resolver import Resolver, NotFound, PORT, SRV_PREFIX
+
+
+class StubDNS:
+    """Fake DNS zone, counts queries."""
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        """query time, seconds"""
+        self.records = {}
+        """keys - (name, rdtype), values - (records, ttl)"""
+        self.queries = 0
+        """count of queries"""
+
+    def add(self, name, rdtype, records, ttl):
+        self.records[(name, rdtype)] = (records, ttl)
+
+    def query(self, name, rdtype) -> tuple:
+        self.queries += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if (name, rdtype) not in self.records:
+            raise NotFound(name)
+        return self.records[(name, rdtype)]
+
+
+class Clock:
+    """Fake clock (seconds)."""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def check(name, value, expected) -> bool:
+    ok = value == expected
+    print('%-40s %s' % (name, 'ok' if ok else 'FAIL: %r != %r' %
+                        (value, expected)))
+    return ok
+
+
+def run_checks() -> bool:
+    """Check cache behaviour.
+
+    :return: bool, True if all checks passed
+    """
+    dns, clock = StubDNS(), Clock()
+    dns.add('mc.example.com', 'A', ['10.0.0.1'], 5)  # below min TTL
+    dns.add('long.example.com', 'A', ['10.0.0.2'], 86400)  # above max TTL
+    dns.add(SRV_PREFIX + 'srv.example.com', 'SRV',
+            [('play.example.com', 25570)], 600)
+    dns.add('play.example.com', 'A', ['10.0.0.3'], 600)
+    resolver = Resolver(dns.query, min_ttl=30, max_ttl=3600,
+                        negative_ttl=300, clock=clock)
+    results = []
+    # TTL floor
+    results.append(check('resolve', resolver.resolve('mc.example.com:1'),
+                         ('mc.example.com', 1, '10.0.0.1')))
+    resolver.resolve('mc.example.com:1')
+    clock.now = 29
+    resolver.resolve('mc.example.com:2')  # same host, other port
+    results.append(check('min TTL (cached until 30 s)', dns.queries, 1))
+    clock.now = 30
+    resolver.resolve('mc.example.com:1')
+    results.append(check('min TTL (expired)', dns.queries, 2))
+    # TTL ceiling
+    clock.now = 0
+    resolver.resolve('long.example.com:1')
+    clock.now = 3600
+    resolver.resolve('long.example.com:1')
+    results.append(check('max TTL', dns.queries, 4))
+    # SRV (address without port), A of target
+    dns.queries, clock.now = 0, 0
+    results.append(check('SRV', resolver.resolve('srv.example.com'),
+                         ('play.example.com', 25570, '10.0.0.3')))
+    resolver.resolve('srv.example.com')
+    results.append(check('SRV cached', dns.queries, 2))
+    # negative caching: no SRV record, not existing host
+    dns.queries = 0
+    results.append(check('no SRV', resolver.resolve('mc.example.com'),
+                         ('mc.example.com', PORT, '10.0.0.1')))
+    resolver.resolve('mc.example.com')
+    results.append(check('no SRV cached (A cached)', dns.queries, 1))
+    for i in range(3):
+        try:
+            resolver.resolve('missing.example.com:1')
+            results.append(check('NXDOMAIN', 'resolved', 'OSError'))
+        except OSError:
+            pass
+    results.append(check('NXDOMAIN cached', dns.queries, 2))
+    clock.now = 300
+    try:
+        resolver.resolve('missing.example.com:1')
+    except OSError:
+        pass
+    results.append(check('NXDOMAIN expired', dns.queries, 3))
+    # IP address - no queries
+    dns.queries = 0
+    results.append(check('IP', resolver.resolve('127.0.0.1:1'),
+                         ('127.0.0.1', 1, '127.0.0.1')))
+    results.append(check('IP (no queries)', dns.queries, 0))
+    return all(results)
+
+
+def bench(count, latency) -> tuple:
+    """Resolve count hosts twice (queries, then cache).
+
+    :param count: int, count of hosts
+    :param latency: float, query time (seconds)
+    :return: tuple, (first pass seconds, second pass seconds, queries)
+    """
+    dns = StubDNS(latency)
+    addresses = []
+    for i in range(count):
+        host = 'host%d.example.com' % i
+        dns.add(host, 'A', ['10.%d.%d.%d' % (i >> 16 & 255, i >> 8 & 255,
+                                             i & 255)], 300)
+        addresses.append(host)  # SRV lookup (not found) and A
+    resolver = Resolver(dns.query)
+    times = []
+    for i in range(2):
+        start = time.perf_counter()
+        for addr in addresses:
+            resolver.resolve(addr)
+        times.append(time.perf_counter() - start)
+    return times[0], times[1], dns.queries
+
+
+def main():
+    parser = ArgumentParser('python3 -m bench.minecraft_resolver')
+    parser.add_argument('count', nargs='?', default=1000, type=int)
+    parser.add_argument('--latency', default=1.0, type=float,
+                        help='stub query time, ms')
+    args = parser.parse_args()
+    ok = run_checks()
+    first, second, queries = bench(args.count, args.latency / 1000)
+    print('%d hosts: queries %.3f s, cache %.3f s (%d queries)' %
+          (args.count, first, second, queries))
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
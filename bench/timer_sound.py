@@ -0,0 +1,85 @@
+"""Soak test for timer sounds: 24 simulated hours of tick/tack (one sound per
+simulated second) through SoundEngine, process memory printed every
+simulated hour (must be flat).
+Usage: python3 -m bench.timer_sound [hours] [--legacy N]"""
+import os
+import sys
+import time
+from argparse import ArgumentParser
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+import psutil
+from PyQt5.QtCore import QCoreApplication, QUrl
+from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
+from core.paths import RES
+from core.sound import SoundEngine
+
+TICK = os.path.join(RES, 'timer', 'tick.ogg')
+TACK = os.path.join(RES, 'timer', 'tack.ogg')
+ALARM = os.path.join(RES, 'timer', 'alarm.ogg')
+
+
+def get_rss() -> float:
+    return psutil.Process().memory_info().rss / 1048576
+
+
+def wait_decoded(app, engine, timeout=5.0):
+    for file in TICK, TACK, ALARM:
+        engine.load(file)
+    end = time.monotonic() + timeout
+    while engine._decoders and time.monotonic() < end:
+        app.processEvents()
+
+
+def soak(app, hours):
+    engine = SoundEngine()
+    wait_decoded(app, engine)
+    print('decoded: ' + str(len(engine.sounds)) + ', player fallback: ' +
+          str(len(engine._fallback)))
+    start = get_rss()
+    print('hour  rss, MB')
+    print('   0  %.1f' % start)
+    begin = time.perf_counter()
+    for hour in range(1, hours + 1):
+        for sec in range(3600):
+            engine.play(TACK if sec % 2 else TICK, 50)
+            if sec % 60 == 0:
+                app.processEvents()
+        engine.play(ALARM, 100)
+        app.processEvents()
+        print('%4d  %.1f' % (hour, get_rss()))
+    engine.stop()
+    voices = sum(len(pool) for pool in engine._pools.values())
+    print('plays: %d, voices: %d, %.1f s, rss delta: %+.1f MB' % (
+        hours * 3601, voices, time.perf_counter() - begin, get_rss() - start))
+
+
+def legacy(app, count):
+    """old way: new QMediaPlayer for every sound"""
+    start = get_rss()
+    players = []
+    for i in range(count):
+        player = QMediaPlayer()
+        player.setMedia(QMediaContent(QUrl.fromLocalFile(TICK)))
+        player.setVolume(50)
+        player.play()
+        players.append(player)  # parent keeps it alive in widget
+        if i % 60 == 0:
+            app.processEvents()
+    print('legacy: %d players, rss delta: %+.1f MB' % (count,
+                                                      get_rss() - start))
+
+
+def main():
+    parser = ArgumentParser('python3 -m bench.timer_sound')
+    parser.add_argument('hours', nargs='?', default=24, type=int)
+    parser.add_argument('--legacy', default=0, type=int,
+                        help='also play N sounds with player per sound')
+    args = parser.parse_args()
+    app = QCoreApplication(sys.argv[:1])
+    soak(app, args.hours)
+    if args.legacy:
+        legacy(app, args.legacy)
+
+
+if __name__ == '__main__':
+    main()
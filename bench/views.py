@@ -0,0 +1,94 @@
+"""Compare rebuilding elements every tick with RetainedView updates.
+Usage: python3 -m bench.views [ticks] [cores]"""
+import os
+import sys
+import time
+import random
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QLabel
+from PyQt5.QtWidgets import QProgressBar
+from PyQt5.QtCore import Qt
+from core.views import RetainedView
+
+
+def get_values(cores) -> list:
+    return [random.randint(0, 100) for i in range(cores)]
+
+
+def rebuild(widget, state, values):
+    """old way: delete and create all elements"""
+    elements = state['elements']
+    for w in elements:
+        widget.layout().removeWidget(w)
+        w.deleteLater()
+    elements.clear()
+    for i, value in enumerate(values):
+        label = QLabel('Core ' + str(i), widget)
+        label.setAlignment(Qt.AlignCenter)
+        elements.append(label)
+        widget.layout().addWidget(label)
+        bar = QProgressBar(widget)
+        bar.setMinimum(0)
+        bar.setMaximum(100)
+        bar.setValue(value)
+        state['created'] += 2
+        elements.append(bar)
+        widget.layout().addWidget(bar)
+        label = QLabel(str(value) + ' %', widget)
+        state['created'] += 1
+        label.setAlignment(Qt.AlignCenter)
+        elements.append(label)
+        widget.layout().addWidget(label)
+    widget.layout().update()
+
+
+def retained(widget, state, values):
+    """RetainedView: update in place"""
+    if 'view' not in state:
+        state['view'] = RetainedView(widget)
+    view = state['view']
+    view.begin()
+    for i, value in enumerate(values):
+        view.label(('core', i), 'Core ' + str(i))
+        view.bar(('bar', i), value)
+        view.label(('text', i), str(value) + ' %')
+    view.end()
+    state['created'] = view.created
+
+
+def run(app, func, ticks, cores) -> tuple:
+    """Run ticks.
+
+    :return: tuple, (seconds, elements created after first build)
+    """
+    widget = QWidget()
+    widget.setLayout(QVBoxLayout(widget))
+    widget.show()
+    state = {'elements': [], 'created': 0}
+    func(widget, state, get_values(cores))  # first build
+    app.processEvents()
+    first = state['created']
+    start = time.perf_counter()
+    for i in range(ticks):
+        func(widget, state, get_values(cores))
+        app.processEvents()
+    elapsed = time.perf_counter() - start
+    widget.close()
+    widget.deleteLater()
+    app.processEvents()
+    return elapsed, state['created'] - first
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    cores = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    app = QApplication(sys.argv[:1])
+    print('ticks: %d, cores: %d' % (ticks, cores))
+    for name, func in (('rebuild', rebuild), ('retained', retained)):
+        elapsed, created = run(app, func, ticks, cores)
+        print('%-9s %8.3f ms/tick, elements created per tick: %.1f' %
+              (name, elapsed / ticks * 1000, created / ticks))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,6 @@
 """API for widgets (classes for inherit)."""
-from PyQt5.QtGui import QIcon
 from core.paths import WIDGET
+from core.resources import get_icon
 
 
 class WidgetInfo:
@@ -19,7 +19,9 @@ class WidgetInfo:
         self.AUTHOR = 'none'
         self.EMAIL = 'none'
         self.URL = 'none'
-        self.ICON = QIcon(WIDGET)
+        self.ICON = get_icon(WIDGET)
+        self.ICON_PATH = None
+        """path to ICON file (None - manifest cache stores ICON as image)"""
 
 
 class Widget:
@@ -0,0 +1,84 @@
+"""Compiled Qt resources for built-in res directory (one module instead of
+a file for every icon, stylesheet and sound). If bundle exists, core.resources
+reads files from RES (core.paths) as RES_QRC (':/res') paths, custom widgets
+resources in C_RES are loose files.
+Build (again after changing res): python3 -m core.bundle
+Remove res_rc.py to use loose files."""
+import os
+import sys
+import shutil
+import tempfile
+import importlib.util
+from core.paths import RES_DIR, RES_BUNDLE
+
+PREFIX = 'res'
+"""alias prefix (resources paths are ':/res/...')"""
+_module = None
+
+
+def get_qrc(folder=RES_DIR, base='.') -> str:
+    """Get Qt resource collection for all files in folder.
+
+    :param folder: str, path to resources
+    :param base: str, qrc file directory (pyrcc5 needs relative paths)
+    :return: str, qrc XML
+    """
+    from xml.sax.saxutils import quoteattr, escape  # imports urllib
+    lines = ['<!DOCTYPE RCC><RCC version="1.0">', '<qresource>']
+    for root, dirs, files in os.walk(folder):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            alias = '/'.join([PREFIX] + os.path.relpath(
+                path, folder).split(os.sep))
+            lines.append('<file alias=' + quoteattr(alias) + '>' +
+                         escape(os.path.relpath(path, base)) + '</file>')
+    lines += ['</qresource>', '</RCC>']
+    return '\n'.join(lines)
+
+
+def build(folder=RES_DIR, path=RES_BUNDLE) -> bool:
+    """Compile resources to python module (pyrcc5).
+
+    :param folder: str, path to resources
+    :param path: str, path to module
+    :return: bool, True if built
+    """
+    from PyQt5 import pyrcc_main
+    tmp = tempfile.mkdtemp(prefix='dewidgets-rcc-')
+    try:
+        qrc = os.path.join(tmp, 'res.qrc')
+        with open(qrc, 'w', encoding='utf-8') as file:
+            file.write(get_qrc(folder, tmp))
+        out = os.path.join(tmp, os.path.basename(path))
+        if not pyrcc_main.processResourceFile([qrc], out, False):
+            return False
+        shutil.move(out, path)
+        return True
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def load(path=RES_BUNDLE) -> bool:
+    """Register compiled resources (once).
+
+    :param path: str, path to module
+    :return: bool, True if registered
+    """
+    global _module
+    if _module:
+        return True
+    if not os.path.isfile(path):
+        return False
+    spec = importlib.util.spec_from_file_location('res_rc', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)  # qInitResources
+    _module = module
+    return True
+
+
+if __name__ == '__main__':
+    if build():
+        print('written: ' + RES_BUNDLE)
+    else:
+        sys.exit('pyrcc5 failed')
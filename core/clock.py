@@ -0,0 +1,91 @@
+"""Monotonic clock and deadlines queue for timers."""
+import time
+import heapq
+import itertools
+
+if 'CLOCK_BOOTTIME' in time.__dict__:  # Linux, counts time in suspend
+    def now() -> float:
+        """Get monotonic time (includes system suspend where supported).
+
+        :return: float, seconds
+        """
+        return time.clock_gettime(time.CLOCK_BOOTTIME)
+else:
+    now = time.monotonic
+
+
+class DeadlineQueue:
+    """Min-heap of deadlines with lazy deletion: removed or rescheduled
+    items stay in heap and skipped on pop."""
+    def __init__(self):
+        self._heap = []
+        self._entries = {}
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, item):
+        return item in self._entries
+
+    def push(self, item, deadline):
+        """Add or reschedule item.
+
+        :param item: hashable object
+        :param deadline: float, time from now()
+        """
+        old = self._entries.get(item)
+        if old:
+            old[2] = None  # lazy deletion
+        entry = [deadline, next(self._counter), item]
+        self._entries[item] = entry
+        heapq.heappush(self._heap, entry)
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._compact()
+
+    def remove(self, item):
+        """Remove item (if exists).
+
+        :param item: hashable object
+        """
+        entry = self._entries.pop(item, None)
+        if entry:
+            entry[2] = None
+
+    def clear(self):
+        """Remove all items."""
+        self._heap.clear()
+        self._entries.clear()
+
+    def peek(self) -> tuple:
+        """Get nearest deadline.
+
+        :return: tuple, (deadline, item) or None if empty
+        """
+        heap = self._heap
+        while heap and heap[0][2] is None:
+            heapq.heappop(heap)
+        if not heap:
+            return None
+        return heap[0][0], heap[0][2]
+
+    def pop_due(self, time_=None) -> list:
+        """Remove and get items with deadline <= time.
+
+        :param time_: float, time (now() by default)
+        :return: list, tuples (deadline, item), sorted by deadline
+        """
+        if time_ is None:
+            time_ = now()
+        result = []
+        heap = self._heap
+        while heap and (heap[0][2] is None or heap[0][0] <= time_):
+            deadline, count, item = heapq.heappop(heap)
+            if item is not None:
+                del self._entries[item]
+                result.append((deadline, item))
+        return result
+
+    def _compact(self):
+        self._heap = [e for e in self._heap if e[2] is not None]
+        heapq.heapify(self._heap)
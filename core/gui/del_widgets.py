@@ -2,34 +2,15 @@
 import os
 import sys
 import json
-from configparser import RawConfigParser
 from PyQt5.QtWidgets import QWidget, QListWidget, QLabel, QPushButton
 from PyQt5.QtWidgets import QMessageBox, QListWidgetItem
-from PyQt5.QtGui import QIcon
 from PyQt5.QtCore import QRect, Qt
 from core.gui.help import TextViewer
 from core.paths import CONF_INSTALL, DELETE, ZIP, DEL_WIDGETS, DEL_ARCHIVES
-from core.utils import try_except, print_stack_trace, STDOUT
-
-
-def del_in_conf(path, sections):
-    """Delete data from config.
-
-    :param path: path to file
-    :param sections: dict, "{"TEST": {"name": "lol"}}"
-    """
-    conf = RawConfigParser()
-    conf.read(path, 'utf-8')
-    for sec in sections:
-        for key in sections[sec]:
-            del conf[sec][key]
-            STDOUT.debug('remove ' + key + ' key from section ' + sec)
-        if not conf[sec]:
-            del conf[sec]
-            STDOUT.debug('remove section ' + sec)
-    with open(path, 'w', encoding='utf-8') as file:
-        conf.write(file)
-    STDOUT.debug('rewrite ' + path)
+from core.resources import get_icon
+from core.installer import InstallIndex
+from core.locales import LocaleTransaction
+from core.utils import try_except, print_stack_trace, STDOUT, write_atomic
 
 
 class Delete(QWidget):
@@ -48,7 +29,7 @@ class Delete(QWidget):
         # setup window
         self.setWindowTitle(self.lang['title'])
         self.setFixedSize(410, 330)
-        self.setWindowIcon(QIcon(DEL_WIDGETS))
+        self.setWindowIcon(get_icon(DEL_WIDGETS))
         # setup widgets list
         self.w_list = QListWidget(self)
         self.w_list.setGeometry(QRect(0, 0, 280, 300))
@@ -122,7 +103,7 @@ class Delete(QWidget):
         mbox = QMessageBox(QMessageBox.Question, self.lang['del_mbox_title'],
                            self.lang['del_mbox_text'].format(item.text()),
                            QMessageBox.Yes | QMessageBox.No, self)
-        mbox.setWindowIcon(QIcon(DELETE))
+        mbox.setWindowIcon(get_icon(DELETE))
         yes = mbox.button(QMessageBox.Yes)
         yes.setText(self.lang['del_mbox_yes_button'])
         yes.setToolTip(self.lang['del_mbox_yes_button_tt'])
@@ -186,7 +167,7 @@ class ArchDelete(QWidget):
         self.lang = locale['ARCH_DELETE']
         self.setWindowTitle(self.lang['title'])
         self.setFixedSize(410, 330)
-        self.setWindowIcon(QIcon(DEL_ARCHIVES))
+        self.setWindowIcon(get_icon(DEL_ARCHIVES))
         self.archives = {}
         # setup widgets list
         self.w_list = QListWidget(self)
@@ -228,7 +209,7 @@ class ArchDelete(QWidget):
         self.w_list.clear()
         for arch in self.archives:
             item = QListWidgetItem(self.w_list)
-            item.setIcon(QIcon(ZIP))
+            item.setIcon(get_icon(ZIP))
             item.setText(os.path.basename(arch))
             item.setToolTip(arch)
             self.w_list.addItem(item)
@@ -250,7 +231,7 @@ class ArchDelete(QWidget):
         mbox = QMessageBox(QMessageBox.Question, self.lang['del_mbox_title'],
                            self.lang['del_mbox_text'].format(item.text()),
                            QMessageBox.Yes | QMessageBox.No, self)
-        mbox.setWindowIcon(QIcon(DELETE))
+        mbox.setWindowIcon(get_icon(DELETE))
         yes = mbox.button(QMessageBox.Yes)
         yes.setText(self.lang['del_mbox_yes_button'])
         yes.setToolTip(self.lang['del_mbox_yes_button_tt'])
@@ -259,23 +240,31 @@ class ArchDelete(QWidget):
         no.setToolTip(self.lang['del_mbox_no_button_tt'])
         # process
         if mbox.exec() == QMessageBox.Yes:
-            for py in self.archives[item.toolTip()]['py']:
-                if os.path.isfile(py):
+            archive = item.toolTip()
+            index = InstallIndex()
+            index.load()
+            indexed = archive in index.archives
+            # shared files deleted only without references
+            free = index.remove(archive, self.archives[archive]['py'] +
+                                self.archives[archive]['res'])
+            for py in self.archives[archive]['py']:
+                if py in free and os.path.isfile(py):
                     self.main.del_widget(py)
-            for res in self.archives[item.toolTip()]['res']:
-                if os.path.isfile(res):
+            for res in self.archives[archive]['res']:
+                if res in free and os.path.isfile(res):
                     os.remove(res)
                     STDOUT.debug('remove ' + res)
-            for res in self.archives[item.toolTip()]['res']:
+            for res in self.archives[archive]['res']:
                 d = os.path.dirname(res)
-                if os.path.isdir(d):
+                if os.path.isdir(d) and not os.listdir(d):
                     os.rmdir(d)
                     STDOUT.debug('remove dir ' + d)
-            for lang in self.archives[item.toolTip()]['langs']:
-                del_in_conf(lang[0], lang[1])
-            del self.archives[item.toolTip()]
-            with open(CONF_INSTALL, 'w') as file:
-                file.write(json.dumps(self.archives))
+            with LocaleTransaction(index.langs) as locales:
+                for lang in self.archives[archive]['langs']:
+                    locales.remove(lang[0], lang[1], archive, indexed)
+            del self.archives[archive]
+            write_atomic(CONF_INSTALL, json.dumps(self.archives))
+            index.save()
             self._list_fill()
             self.main._list_fill()
             self.__change_enabled()
@@ -295,7 +284,7 @@ class ArchInfo(TextViewer):
         super().__init__(self.lang['title'].format(os.path.basename(name)),
                          self.lang['exit_button'],
                          self.lang['exit_button_tt'])
-        self.setWindowIcon(QIcon(ZIP))
+        self.setWindowIcon(get_icon(ZIP))
         # setup
         kwargs = {'name': os.path.basename(name), 'path': name}
         py_list = ''
@@ -2,8 +2,8 @@
 from PyQt5.QtWidgets import QLabel, QSpinBox, QPushButton, QSlider, QWidget
 from PyQt5.QtWidgets import QGridLayout
 from PyQt5.QtCore import Qt, QPoint, QSize
-from PyQt5.QtGui import QIcon
 from core.paths import MOVE
+from core.resources import get_icon
 from core.utils import try_except
 
 
@@ -30,7 +30,7 @@ class Edit(QWidget):
         self.setWindowTitle(lang['title'].format(window.windowTitle()))
         self.resize(230, 220)
         self.setWindowFlags(Qt.WindowMinimizeButtonHint)
-        self.setWindowIcon(QIcon(MOVE))
+        self.setWindowIcon(get_icon(MOVE))
         # setup 'X' label
         self.x_label = QLabel(lang['x_label'], self)
         self.x_label.setAlignment(Qt.AlignCenter)
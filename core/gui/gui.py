@@ -1,22 +1,22 @@
 """Main GUI."""
 import os
 import sys
-from distutils.util import strtobool
 from PyQt5.QtWidgets import QMainWindow, QListWidgetItem
 from PyQt5.QtWidgets import QPushButton, QCheckBox, QStatusBar, QListWidget
 from PyQt5.QtWidgets import QMessageBox, QSystemTrayIcon, QMenu
-from PyQt5.QtCore import Qt, QRect, QEvent, QLocale
-from PyQt5.QtGui import QIcon
+from PyQt5.QtCore import Qt, QRect, QEvent, QLocale, QObject, QTimer
 from core.paths import DeWidgetsIcon, ERROR, DELETE, LOAD, UNLOAD, RELOAD, SHOW
 from core.paths import HIDE, SETTINGS, EXIT
+from core.resources import get_icon
 from core.gui import add_new
 from core.gui.help import Help, TextViewer
 from core.gui.edit import Edit
 from core.gui.settings import Settings
-from core.manager import WidgetManager
-from core.utils import try_except, print_stack_trace
+from core.manager import WidgetManager, SAVE_DELAY
+from core.server import Server
+from core.utils import try_except, print_stack_trace, strtobool
 import core.lock as lock_file
-from core import locales, properties
+from core import locales, properties, tracer
 
 settings = None
 """settings dict"""
@@ -30,6 +30,12 @@ app = None
 """QApplication object"""
 main = None
 """Main object"""
+server = None
+"""Server object (commands from other instances)"""
+first_paint = None
+"""FirstPaint object (startup profiling)"""
+PROFILE_TIMEOUT = 10000
+"""startup profile saved after this time (ms) if not saved before"""
 
 
 def __init__(main_app, prop):
@@ -39,12 +45,13 @@ def __init__(main_app, prop):
     :param prop: ConfigParser, settings
     :return:
     """
-    global app, main, settings, lang, c_lang, manager
+    global app, main, settings, lang, c_lang, manager, server
     # load configs
     settings = prop
-    lang = locales.get_locale(settings['MAIN']['locale'])
-    if locales.custom_is_exists(settings['MAIN']['locale']):
-        c_lang = locales.get_custom_locale(settings['MAIN']['locale'])
+    with tracer.span('get locale'):
+        lang = locales.get_merged(settings['MAIN']['locale'])
+        if locales.custom_is_exists(settings['MAIN']['locale']):
+            c_lang = locales.get_custom_locale(settings['MAIN']['locale'])
     # check lock
     if lock_file.is_locked():
         _show_error()
@@ -53,30 +60,97 @@ def __init__(main_app, prop):
     QLocale.setDefault(QLocale(QLocale.__dict__[lang['LANG']['language']],
                                QLocale.__dict__[lang['LANG']['country']]))
     # init manager
-    manager = WidgetManager(lang, c_lang, sys.modules[__name__])
+    with tracer.span('WidgetManager'):
+        manager = WidgetManager(lang, c_lang, sys.modules[__name__],
+                                int(settings['MAIN'].get('save_delay',
+                                                         SAVE_DELAY)),
+                                locales.get_stamp(settings['MAIN']['locale']))
     # create lock file
     lock_file.create_lock()
     # init
     app = main_app
-    main = Main()
+    with tracer.span('main window'):
+        main = Main()
     add_new.__init__(lang, main)
-    # load widgets
-    if strtobool(settings['MAIN']['load_placed']):
-        manager.load_placed()  # placed only
-    else:
-        manager.load_all()  # all widgets
-    manager.call_end_loading()
+    server = Server({
+        'show': main._cmd_show,
+        'hide-widgets': main._cmd_hide_widgets,
+        'reload': main._cmd_reload,
+        'edit-mode': main._cmd_edit_mode
+    }, parent=main)
+    server.listen()
+    # load placed widgets, other - in idle time (catalogue)
+    with tracer.span('load widgets'):
+        manager.load_placed()
+    with tracer.span('call_end_loading'):
+        manager.call_end_loading()
     main._list_fill()
+    if not strtobool(settings['MAIN']['load_placed']):
+        manager.catalogue.start()
+    if tracer.ENABLED:
+        _trace_startup()
     if manager.is_placed():
         return  # if found placed widgets - no show main window
     main.show()  # if no placed widgets, show window
 
 
+class FirstPaint(QObject):
+    """Application event filter, mark first paint of windows (once)."""
+    def __init__(self, windows, name):
+        """
+
+        :param windows: iterable, top level QWidget objects
+        :param name: str, mark name
+        """
+        super().__init__()
+        self.windows = set(windows)
+        """watched windows"""
+        self.name = name
+        """mark name"""
+        self.done = False
+        """True if painted"""
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint and obj.isWidgetType() and \
+                obj.window() in self.windows:
+            tracer.mark(self.name)
+            self.done = True
+            app.removeEventFilter(self)
+            _dump_profile()
+        return False
+
+
+def _trace_startup():
+    """Mark first paint and save profile after it and catalogue loading."""
+    global first_paint
+    if manager.is_placed():
+        first_paint = FirstPaint(manager.widgets.values(),
+                                 'first widget painted')
+    else:
+        first_paint = FirstPaint((main,), 'main window painted')
+    app.installEventFilter(first_paint)
+    manager.catalogue.finished.connect(_dump_profile)
+    QTimer.singleShot(PROFILE_TIMEOUT, lambda: _dump_profile(True))
+
+
+def _dump_profile(force=False):
+    global first_paint
+    if not first_paint:
+        return  # saved
+    if not force and (not first_paint.done or
+                      manager.catalogue.is_running()):
+        return
+    if not first_paint.done:
+        app.removeEventFilter(first_paint)
+    first_paint = None
+    tracer.dump()
+
+
 class Main(QMainWindow):
     """main window"""
     def __init__(self):
         super().__init__()
-        icon = QIcon(DeWidgetsIcon)
+        icon = get_icon(DeWidgetsIcon)
         # setup window
         self.setWindowTitle(lang['MAIN']['title'])
         self.setFixedSize(520, 262)
@@ -97,16 +171,16 @@ class Main(QMainWindow):
         self.list.customContextMenuRequested.connect(self._show_list_menu)
         # setup list context menu
         self.list_menu = QMenu(self)
-        load_action = self.list_menu.addAction(QIcon(LOAD),
+        load_action = self.list_menu.addAction(get_icon(LOAD),
                                                lang['LIST_MENU']['load'])
         load_action.setToolTip(lang['LIST_MENU']['load_tt'])
         load_action.triggered.connect(self._load_not_placed)
-        unload_action = self.list_menu.addAction(QIcon(UNLOAD),
+        unload_action = self.list_menu.addAction(get_icon(UNLOAD),
                                                  lang['LIST_MENU']['unload'])
         unload_action.setToolTip(lang['LIST_MENU']['unload_tt'])
         unload_action.triggered.connect(self._unload_not_placed)
         self.list_menu.addSeparator()
-        reload_action = self.list_menu.addAction(QIcon(RELOAD),
+        reload_action = self.list_menu.addAction(get_icon(RELOAD),
                                                  lang['LIST_MENU']['reload'])
         reload_action.setToolTip(lang['LIST_MENU']['reload_tt'])
         reload_action.triggered.connect(self._reload)
@@ -167,22 +241,27 @@ class Main(QMainWindow):
         self.tray.setToolTip(lang['MAIN']['title'])
         self.tray.activated.connect(self._visible)
         menu = QMenu(self)
-        show_action = menu.addAction(QIcon(SHOW), lang['TRAY']['show_action'])
+        show_action = menu.addAction(get_icon(SHOW),
+                                     lang['TRAY']['show_action'])
         show_action.setToolTip(lang['TRAY']['show_action_tt'])
         show_action.triggered.connect(self.showNormal)
-        hide_action = menu.addAction(QIcon(HIDE), lang['TRAY']['hide_action'])
+        hide_action = menu.addAction(get_icon(HIDE),
+                                     lang['TRAY']['hide_action'])
         hide_action.setToolTip(lang['TRAY']['hide_action_tt'])
         hide_action.triggered.connect(self._hide_widgets)
-        settings_action = menu.addAction(QIcon(SETTINGS),
+        settings_action = menu.addAction(get_icon(SETTINGS),
                                          lang['TRAY']['settings_action'])
         settings_action.setToolTip(lang['TRAY']['settings_action'])
         settings_action.triggered.connect(self._show_settings)
         menu.addSeparator()
-        exit_action = menu.addAction(QIcon(EXIT), lang['TRAY']['exit_action'])
+        exit_action = menu.addAction(get_icon(EXIT),
+                                     lang['TRAY']['exit_action'])
         exit_action.setToolTip(lang['TRAY']['exit_action_tt'])
         exit_action.triggered.connect(app.quit)
         self.tray.setContextMenu(menu)
         self.tray.show()
+        # add items from catalogue loading
+        manager.catalogue.loaded.connect(self._list_add)
         # set enabled
         self.__change_enabled()
 
@@ -225,7 +304,7 @@ class Main(QMainWindow):
         widget.show()
         # edit config
         manager.config.add(widget.info.NAME)
-        manager.config.save()
+        manager.config.save(widget.info.NAME)
         # change item font
         font = item.font()
         font.setBold(True)
@@ -237,21 +316,24 @@ class Main(QMainWindow):
     def _show_help(self, checked):
         self.help_window = Help(lang)
 
+    @tracer.traced('_list_fill')
     def _list_fill(self):
         self.list.clear()
-        for info in manager.info.values():
-            try:
-                item = QListWidgetItem(self.list)
-                item.setIcon(info.ICON)
-                item.setText(info.NAME)
-                item.setToolTip(info.DESCRIPTION)
-                if manager.config.is_placed(info.NAME):
-                    font = item.font()
-                    font.setBold(True)
-                    item.setFont(font)
-                self.list.addItem(item)
-            except:
-                print_stack_trace()()
+        for name in manager.info:
+            self._list_add(name)
+
+    @try_except()
+    def _list_add(self, name):
+        info = manager.info[name]
+        item = QListWidgetItem(self.list)
+        item.setIcon(info.ICON)
+        item.setText(info.NAME)
+        item.setToolTip(info.DESCRIPTION)
+        if manager.config.is_placed(info.NAME):
+            font = item.font()
+            font.setBold(True)
+            item.setFont(font)
+        self.list.addItem(item)
 
     @try_except()
     def _list_double_click(self, item):
@@ -264,7 +346,10 @@ class Main(QMainWindow):
 
     @try_except()
     def _show_add_new(self, checked):
-        names = add_new.install()
+        add_new.install(self._installed)
+
+    @try_except()
+    def _installed(self, names):
         for name in names:
             try:
                 manager.load(name)
@@ -299,7 +384,7 @@ class Main(QMainWindow):
         mbox = QMessageBox(QMessageBox.Question, lang['DELETE']['title'],
                            lang['DELETE']['question'], QMessageBox.Yes |
                            QMessageBox.No | QMessageBox.Cancel, self)
-        mbox.setWindowIcon(QIcon(DELETE))
+        mbox.setWindowIcon(get_icon(DELETE))
         # setup 'Yes' button
         yes = mbox.button(QMessageBox.Yes)
         yes.setText(lang['DELETE']['yes'])
@@ -357,6 +442,33 @@ class Main(QMainWindow):
             except:
                 print_stack_trace()()
 
+    def _cmd_show(self, arg):
+        self.showNormal()
+        self.raise_()
+        self.activateWindow()
+
+    def _cmd_hide_widgets(self, arg):
+        if arg not in ('', 'toggle', 'on', 'off'):
+            raise ValueError('expected on, off or toggle')
+        if arg in ('', 'toggle'):
+            self._hide_widgets(False)
+            return
+        hidden = arg == 'on'
+        for name in manager.widgets:
+            widget = manager.widgets[name]
+            if widget.isHidden() != hidden:
+                widget.hide_event(hidden)
+                widget.setHidden(hidden)
+
+    def _cmd_reload(self, arg):
+        self._reload(None)
+
+    def _cmd_edit_mode(self, arg):
+        if arg not in ('on', 'off'):
+            raise ValueError('expected on or off')
+        self.edit_mode_checkbox.setChecked(arg == 'on')
+        self._edit_mode(arg == 'on')
+
     @try_except()
     def _show_list_menu(self, point):
         self.list_menu.exec(self.list.mapToGlobal(point))
@@ -417,7 +529,7 @@ class ItemInfo(TextViewer):
 def _show_error():
     mbox = QMessageBox(QMessageBox.Critical, lang['RUNNING']['title'],
                        lang['RUNNING']['text'], QMessageBox.Ok)
-    mbox.setWindowIcon(QIcon(ERROR))
+    mbox.setWindowIcon(get_icon(ERROR))
     ok = mbox.button(QMessageBox.Ok)
     ok.setText(lang['RUNNING']['ok_button'])
     ok.setToolTip(lang['RUNNING']['ok_button_tt'])
@@ -2,9 +2,9 @@
 import traceback
 from PyQt5.QtWidgets import QWidget, QTextBrowser, QGridLayout, QPushButton
 from PyQt5.QtWidgets import QVBoxLayout, QLabel
-from PyQt5.QtGui import QPixmap, QIcon
 from PyQt5.QtCore import Qt
 from core.paths import HELP, LICENSE, AVA, LICENSE_TXT
+from core.resources import get_icon, get_pixmap
 from core.utils import try_except
 
 
@@ -18,7 +18,7 @@ class Help(QWidget):
         # setup window
         self.setWindowTitle(lang['HELP']['title'])
         self.resize(400, 450)
-        self.setWindowIcon(QIcon(HELP))
+        self.setWindowIcon(get_icon(HELP))
         # setup text
         self.text = QTextBrowser()
         self.text.setOpenExternalLinks(True)
@@ -82,7 +82,7 @@ class License(TextViewer):
         super().__init__(lang['LICENSE']['title'],
                          lang['LICENSE']['exit_button'],
                          lang['LICENSE']['exit_button_tt'])
-        self.setWindowIcon(QIcon(LICENSE))
+        self.setWindowIcon(get_icon(LICENSE))
         # setup text
         try:
             with open(LICENSE_TXT, 'r', encoding='UTF-8') as text:
@@ -100,13 +100,13 @@ class Author(TextViewer):
         super().__init__(lang['AUTHOR']['title'],
                          lang['AUTHOR']['exit_button'],
                          lang['AUTHOR']['exit_button_tt'])
-        self.setWindowIcon(QIcon(AVA))
+        self.setWindowIcon(get_icon(AVA))
         # setup image
         self.label_ava = QLabel(self)
         self.label_ava.setAlignment(Qt.AlignCenter)
         self.label_ava.setToolTip(lang['AUTHOR']['label_tt'])
         try:
-            self.label_ava.setPixmap(QPixmap(AVA))
+            self.label_ava.setPixmap(get_pixmap(AVA))
         except:
             print(traceback.format_exc())
         # setup text
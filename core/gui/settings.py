@@ -1,14 +1,13 @@
 """Edit gui settings app."""
 import sys
-from distutils.util import strtobool
 from PyQt5.QtWidgets import QWidget, QPushButton, QCheckBox, QComboBox, QLabel
 from PyQt5.QtWidgets import QMessageBox, QGridLayout, QHBoxLayout
-from PyQt5.QtGui import QIcon
 from PyQt5.QtCore import Qt
 from core.gui.del_widgets import Delete
 from core.paths import SETTINGS, SUCCESS
-from core.utils import LogLevel, try_except, print_stack_trace
-from core.locales import get_locales, get_locale
+from core.resources import get_icon
+from core.utils import LogLevel, try_except, print_stack_trace, strtobool
+from core.locales import get_locales, get_info
 from core import properties
 
 
@@ -31,7 +30,7 @@ class Settings(QWidget):
         self.del_widgets_win = None
         # setup window
         self.setWindowTitle(self.lang['title'])
-        self.setWindowIcon(QIcon(SETTINGS))
+        self.setWindowIcon(get_icon(SETTINGS))
         self.resize(290, 200)
         self.setWindowFlags(Qt.WindowMinimizeButtonHint |
                             Qt.WindowCloseButtonHint)
@@ -92,9 +91,8 @@ class Settings(QWidget):
     def _langs_box_fill(self):
         for name in get_locales():
             try:
-                conf = get_locale(name)
-                item = conf['LANG']['name'] + ' ('
-                item += conf['LANG']['description'] + ')'
+                info = get_info(name)
+                item = info['name'] + ' (' + info['description'] + ')'
                 self.language.addItem(item)
                 if name == self.settings['MAIN']['locale']:
                     self.language.setCurrentText(item)
@@ -134,7 +132,7 @@ class Settings(QWidget):
     def _show_warn(self):
         mbox = QMessageBox(QMessageBox.Warning, self.lang['warn_title'],
                            self.lang['warn_text'], QMessageBox.Ok, self)
-        mbox.setWindowIcon(QIcon(SUCCESS))
+        mbox.setWindowIcon(get_icon(SUCCESS))
         ok = mbox.button(QMessageBox.Ok)
         ok.setText(self.lang['warn_ok_button'])
         ok.setToolTip(self.lang['warn_ok_button_tt'])
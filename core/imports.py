@@ -0,0 +1,147 @@
+"""Lazy imports for heavy optional dependencies and import cost report
+(--import-report argument)."""
+import os
+import sys
+import types
+import importlib
+import subprocess
+from core.paths import C_WIDGETS
+
+TOP = 5
+"""count of heaviest direct imports in report"""
+
+
+class LazyModule(types.ModuleType):
+    """Module proxy, real module is imported on first attribute access (import
+    errors are raised there)."""
+    def __init__(self, name):
+        """
+
+        :param name: str, full module name
+        """
+        super().__init__(name)
+        self.__dict__['_lazy_loaded'] = False
+
+    def __getattr__(self, attr):  # called only for missing attributes
+        if self.__dict__['_lazy_loaded']:
+            raise AttributeError("module '" + self.__name__ +
+                                 "' has no attribute '" + attr + "'")
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+        self.__dict__['_lazy_loaded'] = True
+        return getattr(module, attr)
+
+
+def lazy(name):
+    """Get module, imported on first use (if not imported yet). Example:
+    AES = lazy('Crypto.Cipher.AES')
+
+    :param name: str, full module name
+    :return: module or LazyModule
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
+
+
+def is_loaded(module) -> bool:
+    """Check module imported.
+
+    :param module: module or LazyModule
+    :return: bool, True if imported
+    """
+    return not isinstance(module, LazyModule) or \
+        module.__dict__['_lazy_loaded']
+
+
+def parse_import_time(text) -> list:
+    """Parse -X importtime output.
+
+    :param text: str, stderr of python -X importtime
+    :return: list, tuples (name, self us, cumulative us, level), in import
+    order (children before parent)
+    """
+    result = []
+    for line in text.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        try:
+            self_us, cumulative, name = line[12:].split('|', 2)
+            level = (len(name) - len(name.lstrip()) - 1) // 2
+            result.append((name.strip(), int(self_us), int(cumulative),
+                           level))
+        except ValueError:
+            continue
+    return result
+
+
+def measure_import(module) -> tuple:
+    """Import widget module in new process (after core.api, app base).
+
+    :param module: str, module name
+    :return: tuple, self us, cumulative us, list of direct imports
+    (name, cumulative us) or None if import failed and error text
+    """
+    argv = [a for a in sys.argv[1:] if a != '--import-report']  # for paths
+    code = '\n'.join((
+        'import sys',
+        'sys.argv[1:] = ' + repr(argv),
+        'sys.path.insert(0, ' + repr(sys.path[0]) + ')',
+        'import core.api, widgets',
+        'sys.path.append(' + repr(C_WIDGETS) + ')',
+        'import ' + module
+    ))
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    proc = subprocess.run((sys.executable, '-X', 'importtime', '-'),
+                          input=code, cwd=sys.path[0], env=env,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          universal_newlines=True, timeout=120)
+    rows = parse_import_time(proc.stderr)
+    if proc.returncode:
+        error = [line for line in proc.stderr.splitlines()
+                 if not line.startswith('import time:')]
+        return None, error[-1] if error else 'exit code ' + \
+            str(proc.returncode)
+    children = []
+    for name, self_us, cumulative, level in rows:
+        if level == 1:
+            children.append((name, cumulative))
+        elif level == 0:
+            if name == module:
+                return self_us, cumulative, children
+            children = []
+    return None, 'not found in -X importtime output'
+
+
+def print_report(modules=None, out=sys.stdout):
+    """Print import time of every widget module (imported in isolation).
+
+    :param modules: list, modules names (built-in and custom by default)
+    :param out: file object
+    """
+    if modules is None:
+        import widgets
+        modules = widgets.get_widgets()
+        if os.path.isdir(C_WIDGETS):
+            modules += [n[:-3] for n in sorted(os.listdir(C_WIDGETS))
+                        if n.endswith('.py') and n != '__init__.py']
+    rows = []
+    for module in modules:
+        result = measure_import(module)
+        if result[0] is None:
+            rows.append((-1, module, result[1]))
+            continue
+        self_us, cumulative, children = result
+        children.sort(key=lambda c: c[1], reverse=True)
+        rows.append((cumulative, module, self_us, children[:TOP]))
+    out.write('%-24s %12s %12s\n' % ('module', 'self, ms', 'cumul., ms'))
+    for row in sorted(rows, key=lambda r: r[0], reverse=True):
+        if row[0] < 0:
+            out.write('%-24s failed: %s\n' % (row[1], row[2]))
+            continue
+        cumulative, module, self_us, children = row
+        out.write('%-24s %12.2f %12.2f\n' % (module, self_us / 1000,
+                                            cumulative / 1000))
+        for name, child in children:
+            out.write('  %-22s %12s %12.2f\n' % (name, '', child / 1000))
+    out.flush()
@@ -0,0 +1,494 @@
+"""Widgets installer: ZIP archives are verified and extracted in one
+streaming pass to staging directory, files are moved to custom widgets
+directories only if whole archive is valid. InstallWorker runs it in
+background thread. InstallIndex keeps SHA-256 of archives and members:
+unchanged archives are skipped, unchanged members are not extracted and
+identical resources are stored once (with references)."""
+import os
+import json
+import shutil
+import zipfile
+import hashlib
+import tempfile
+from contextlib import nullcontext
+from configparser import RawConfigParser, Error as ConfigError
+from PyQt5.QtCore import QThread, pyqtSignal
+from core.paths import C_WIDGETS, C_RES, C_LANGS, CONF_INSTALL
+from core.paths import CONF_INSTALL_INDEX
+from core.locales import LocaleTransaction
+from core.utils import write_atomic, STDOUT
+
+CHUNK = 65536
+"""read size (bytes)"""
+
+
+class Cancelled(Exception):
+    """installation cancelled"""
+    pass
+
+
+class BadArchive(Exception):
+    """archive is not valid widgets archive"""
+    pass
+
+
+def get_total(files) -> int:
+    """Get size of all members (uncompressed, from central directories).
+
+    :param files: list, paths to archives
+    :return: int, bytes
+    """
+    total = 0
+    for file in files:
+        try:
+            with zipfile.ZipFile(file) as arch:
+                total += sum(i.file_size for i in arch.infolist())
+        except (OSError, zipfile.BadZipFile):
+            continue
+    return total
+
+
+def check_name(name) -> str:
+    """Check member name (no absolute paths and parent dirs).
+
+    :param name: str, member name
+    :return: str, name with os separators
+    """
+    parts = name.split('/')
+    if name.startswith('/') or '..' in parts or ':' in parts[0]:
+        raise BadArchive('bad member name: ' + name)
+    return os.path.join(*parts)
+
+
+def hash_file(path) -> str:
+    """Get SHA-256 of file.
+
+    :param path: str, path to file
+    :return: str, hex digest
+    """
+    sha = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(CHUNK), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def link(src, dst):
+    """Hard link file (copy if links not supported).
+
+    :param src: str, path to existing file
+    :param dst: str, path to new file
+    """
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+class InstallIndex:
+    """Content index of installed archives (JSON). Archives: SHA-256 of
+    archive and members, files: SHA-256 of installed file and references
+    (archives paths)."""
+    def __init__(self, path=CONF_INSTALL_INDEX):
+        """
+
+        :param path: str, path to index file
+        """
+        self.path = path
+        """path to index file"""
+        self.archives = {}
+        """keys - archives paths, values - dicts: sha256, members (keys -
+        members names, values - dicts: sha256, crc, size)"""
+        self.files = {}
+        """keys - installed files paths, values - dicts: sha256, refs"""
+        self.langs = {}
+        """locales keys owners (LocaleTransaction owners index)"""
+
+    def load(self):
+        """Read index (if exists)."""
+        if not os.path.isfile(self.path):
+            return
+        with open(self.path, encoding='utf-8') as file:
+            data = json.loads(file.read())
+        self.archives = data.get('archives', {})
+        self.files = data.get('files', {})
+        self.langs = data.get('langs', {})
+
+    def save(self):
+        """Write index."""
+        write_atomic(self.path, json.dumps({'archives': self.archives,
+                                            'files': self.files,
+                                            'langs': self.langs}))
+
+    def is_installed(self, archive, sha) -> bool:
+        """Check archive installed and not changed (all files exist).
+
+        :param archive: str, path to archive
+        :param sha: str, SHA-256 of archive
+        :return: bool, True if re-install not needed
+        """
+        info = self.archives.get(archive)
+        if not info or info['sha256'] != sha:
+            return False
+        for path, data in self.files.items():
+            if archive in data['refs'] and not os.path.isfile(path):
+                return False
+        return True
+
+    def get_member(self, archive, name) -> dict:
+        """Get member info from previous installation.
+
+        :param archive: str, path to archive
+        :param name: str, member name
+        :return: dict, sha256, crc, size or None
+        """
+        return self.archives.get(archive, {}).get('members', {}).get(name)
+
+    def get_sha(self, path) -> str:
+        """Get SHA-256 of installed file.
+
+        :param path: str, path to file
+        :return: str, hex digest or None (not indexed)
+        """
+        return self.files.get(path, {}).get('sha256')
+
+    def find(self, sha) -> str:
+        """Find installed file with content.
+
+        :param sha: str, SHA-256
+        :return: str, path or None
+        """
+        for path, data in self.files.items():
+            if data['sha256'] == sha and os.path.isfile(path):
+                return path
+        return None
+
+    def add_ref(self, path, sha, archive):
+        """Add reference to installed file.
+
+        :param path: str, path to file
+        :param sha: str, SHA-256 of file
+        :param archive: str, path to archive
+        """
+        data = self.files.setdefault(path, {'sha256': sha, 'refs': []})
+        data['sha256'] = sha
+        if archive not in data['refs']:
+            data['refs'].append(archive)
+
+    def release(self, archive, paths) -> list:
+        """Remove archive references from files.
+
+        :param archive: str, path to archive
+        :param paths: iterable, files paths
+        :return: list, paths without references (files to delete, not
+        indexed files included)
+        """
+        result = []
+        for path in paths:
+            data = self.files.get(path)
+            if data:
+                if archive in data['refs']:
+                    data['refs'].remove(archive)
+                if data['refs']:
+                    continue
+                del self.files[path]
+            result.append(path)
+        return result
+
+    def remove(self, archive, paths=()) -> list:
+        """Remove archive from index and its references.
+
+        :param archive: str, path to archive
+        :param paths: iterable, files from install.conf (not indexed files)
+        :return: list, paths without references (files to delete)
+        """
+        self.archives.pop(archive, None)
+        paths = list(paths)
+        paths += [path for path, data in self.files.items()
+                  if archive in data['refs'] and path not in paths]
+        return self.release(archive, paths)
+
+
+class Installer:
+    """Install archives. Progress function called after every chunk."""
+    def __init__(self, progress=None, is_cancelled=None, index=None):
+        """
+
+        :param progress: function, progress(done_bytes, member_name)
+        :param is_cancelled: function, return True to cancel
+        :param index: InstallIndex (loaded from CONF_INSTALL_INDEX if None)
+        """
+        if not index:
+            index = InstallIndex()
+            index.load()
+        self.index = index
+        """InstallIndex"""
+        self.locales = LocaleTransaction(index.langs)
+        """locales patches (every file written once)"""
+        self.progress = progress
+        """progress function"""
+        self.is_cancelled = is_cancelled
+        """cancel check function"""
+        self.done = 0
+        """processed bytes"""
+
+    def _copy(self, arch, info, path=None) -> str:
+        """Stream member to file (CRC checked by zipfile at end).
+
+        :param arch: ZipFile
+        :param info: ZipInfo
+        :param path: str, path to file (None - only verify and hash)
+        :return: str, SHA-256 of member
+        """
+        sha = hashlib.sha256()
+        if path:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with arch.open(info) as src, \
+                open(path, 'wb') if path else nullcontext() as dst:
+            while True:
+                if self.is_cancelled and self.is_cancelled():
+                    raise Cancelled()
+                chunk = src.read(CHUNK)
+                if not chunk:
+                    break
+                sha.update(chunk)
+                if path:
+                    dst.write(chunk)
+                self.done += len(chunk)
+                if self.progress:
+                    self.progress(self.done, info.filename)
+        return sha.hexdigest()
+
+    def _read(self, arch, info) -> bytes:
+        data = arch.read(info)  # CRC checked
+        self.done += len(data)
+        if self.progress:
+            self.progress(self.done, info.filename)
+        return data
+
+    def _is_same(self, archive, info, path) -> bool:
+        """Check member not changed since previous installation (CRC and
+        size, SHA-256 checked after reading)."""
+        member = self.index.get_member(archive, info.filename)
+        return bool(member) and member['crc'] == info.CRC and \
+            member['size'] == info.file_size and \
+            self.index.get_sha(path) == member['sha256'] and \
+            os.path.isfile(path)
+
+    def stage(self, arch, stage, archive=None) -> dict:
+        """Verify and extract archive to staging directory. Members not
+        changed since previous installation only verified.
+
+        :param arch: ZipFile
+        :param stage: str, path to staging directory
+        :param archive: str, path to archive (for index)
+        :return: dict, py - modules (path, SHA-256), res - resources
+        (path, SHA-256), langs - list of (lang file name, sections dict),
+        paths relative to stage, same - set of not changed installed files,
+        members - dict for InstallIndex
+        """
+        if 'DeWidgets.txt' not in arch.namelist():
+            raise BadArchive('not DeWidgets.txt')
+        result = {'py': [], 'res': [], 'langs': [], 'same': set(),
+                  'members': {}}
+        for info in arch.infolist():
+            if info.is_dir():
+                continue
+            name = check_name(info.filename)
+            if info.filename[-3:] == '.py':  # widgets
+                kind, path = 'py', os.path.join(C_WIDGETS, name)
+            elif info.filename[:3] == 'res':  # resources
+                name = check_name(info.filename[4:])
+                kind, path = 'res', os.path.join(C_RES, name)
+            elif info.filename[:5] == 'langs':  # locales (patches)
+                data = self._read(arch, info)
+                conf = RawConfigParser()
+                conf.read_string(data.decode('utf-8'))
+                result['langs'].append((os.path.basename(info.filename),
+                                        conf._sections))
+                kind, sha = None, hashlib.sha256(data).hexdigest()
+            else:  # verify CRC only
+                kind, sha = None, self._copy(arch, info)
+            if kind:
+                sha = None
+                if self._is_same(archive, info, path):
+                    sha = self._copy(arch, info)
+                    if sha == self.index.get_sha(path):
+                        result['same'].add(path)
+                    else:  # CRC collision, extract
+                        self.done -= info.file_size
+                        sha = None
+                if not sha:
+                    sha = self._copy(arch, info,
+                                     os.path.join(stage, kind, name))
+                result[kind].append((name, sha))
+            result['members'][info.filename] = {
+                'sha256': sha, 'crc': info.CRC, 'size': info.file_size}
+        return result
+
+    @staticmethod
+    def _move(src, dst):
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        try:
+            os.replace(src, dst)  # atomic on one file system
+        except OSError:
+            shutil.move(src, dst)
+
+    def _is_own(self, path, archive, old) -> bool:
+        """Check existing resource installed only by this archive."""
+        data = self.index.files.get(path)
+        if data:
+            return data['refs'] in ([], [archive])
+        return bool(old) and path in old['res']  # not indexed installation
+
+    def commit(self, staged, stage, archive=None, old=None) -> dict:
+        """Move staged files to custom widgets directories and patch locales.
+        Existing resources are not replaced (except installed by this
+        archive), identical resources are hard linked.
+
+        :param staged: dict, from stage
+        :param stage: str, path to staging directory
+        :param archive: str, path to archive (for index)
+        :param old: dict, previous install info of archive
+        :return: dict, install info (for install.conf)
+        """
+        info = {'py': [], 'res': [], 'langs': []}
+        for name, sha in staged['py']:
+            path = os.path.join(C_WIDGETS, name)
+            if path not in staged['same']:
+                self._move(os.path.join(stage, 'py', name), path)
+                STDOUT.debug('extract module: ' + name)
+            self.index.add_ref(path, sha, archive)
+            info['py'].append(path)
+        for name, sha in staged['res']:
+            path = os.path.join(C_RES, name)
+            if path in staged['same'] or (
+                    os.path.isfile(path) and self.index.get_sha(path) == sha):
+                pass  # not changed or shared
+            elif os.path.isfile(path):
+                if not self._is_own(path, archive, old):
+                    continue  # not replace
+                self._move(os.path.join(stage, 'res', name), path)
+                STDOUT.debug('update res: ' + name)
+            else:
+                shared = self.index.find(sha)  # store once
+                if shared:
+                    try:
+                        link(shared, path)
+                        STDOUT.debug('link res: ' + name)
+                    except FileNotFoundError:  # removed after find
+                        shared = None
+                if not shared:
+                    self._move(os.path.join(stage, 'res', name), path)
+                    STDOUT.debug('extract res: ' + name)
+            self.index.add_ref(path, sha, archive)
+            info['res'].append(path)
+        for name, sections in staged['langs']:  # written in install
+            lang_file = os.path.join(C_LANGS, name)
+            self.locales.patch(lang_file, sections, archive)
+            info['langs'].append((lang_file, sections))
+        return info
+
+    def _clean(self, archive, old, new):
+        """Remove resources of previous version of archive (if not used)."""
+        stale = [path for path in old['res'] if path not in new['res']]
+        for path in self.index.release(archive, stale):
+            if os.path.isfile(path):
+                os.remove(path)
+                STDOUT.debug('remove ' + path)
+
+    def install(self, files) -> tuple:
+        """Install archives. Not changed archives skipped.
+
+        :param files: list, paths to archives
+        :return: tuple, list of modules names, list of broken archives
+        names
+        """
+        result = []
+        broken = []
+        conf_inst = {}
+        if os.path.isfile(CONF_INSTALL):
+            with open(CONF_INSTALL, encoding='utf-8') as file_install:
+                conf_inst = json.loads(file_install.read())
+        os.makedirs(C_WIDGETS, exist_ok=True)
+        try:
+            for file in files:
+                try:
+                    sha = hash_file(file)
+                    if file in conf_inst and \
+                            self.index.is_installed(file, sha):
+                        result += [os.path.basename(path)[:-3]
+                                   for path in conf_inst[file]['py']]
+                        self.done += get_total((file,))
+                        STDOUT.debug('not changed: ' + file)
+                        continue
+                    stage = tempfile.mkdtemp(prefix='.install-',
+                                             dir=C_WIDGETS)
+                    try:
+                        with zipfile.ZipFile(file) as arch:
+                            staged = self.stage(arch, stage, file)
+                        old = conf_inst.get(file)
+                        conf_inst[file] = self.commit(staged, stage, file,
+                                                      old)
+                        self.index.archives[file] = {
+                            'sha256': sha, 'members': staged['members']}
+                        if old:
+                            self._clean(file, old, conf_inst[file])
+                        result += [name[:-3] for name, sha in staged['py']]
+                    finally:
+                        shutil.rmtree(stage, ignore_errors=True)
+                except (OSError, zipfile.BadZipFile, BadArchive,
+                        UnicodeDecodeError, ConfigError) as e:
+                    broken.append(os.path.basename(file))
+                    STDOUT.debug('broken: ' + file + ' (' + str(e) + ')')
+                except Cancelled:  # installed archives are kept
+                    STDOUT.debug('installation cancelled: ' + file)
+                    break
+        finally:  # write installed (also if cancelled)
+            self.locales.commit()
+            write_atomic(CONF_INSTALL, json.dumps(conf_inst))
+            self.index.save()
+        return result, broken
+
+
+class InstallWorker(QThread):
+    """Install archives in background thread."""
+    progress = pyqtSignal(int, str)
+    """percents, member name"""
+    done = pyqtSignal(list, list)
+    """modules names, broken archives names"""
+
+    def __init__(self, files, parent=None):
+        """
+
+        :param files: list, paths to archives
+        :param parent: QObject
+        """
+        super().__init__(parent)
+        self.files = files
+        """paths to archives"""
+        self._total = 1
+        self._percent = -1
+
+    def cancel(self):
+        """Request cancel (current and next archives are not installed,
+        files of archive being moved are moved to the end)."""
+        self.requestInterruption()
+
+    def _progress(self, done, name):
+        percent = min(100, done * 100 // self._total)
+        if percent != self._percent:  # limit signals
+            self._percent = percent
+            self.progress.emit(percent, name)
+
+    def run(self):
+        result, broken = [], []
+        try:
+            self._total = max(1, get_total(self.files))
+            result, broken = Installer(self._progress,
+                                       self.isInterruptionRequested
+                                       ).install(self.files)
+        except:
+            STDOUT.error('installation failed', exc_info=True)
+        self.done.emit(result, broken)
@@ -0,0 +1,61 @@
+"""Single instance: running instance listens local socket (core.server),
+other instances send commands to it and exit. Client does not import Qt
+where AF_UNIX sockets are available (checked before heavy imports).
+
+Protocol: command line (utf-8, '\\n' terminated), for example
+'edit-mode on', answer line 'ok' or 'error: text'."""
+import socket
+from core.paths import SOCKET
+
+TIMEOUT = 2.0
+"""client timeout (seconds)"""
+OK = 'ok'
+"""answer for executed command"""
+
+
+def send(command, path=SOCKET, timeout=TIMEOUT) -> str:
+    """Send command to running instance.
+
+    :param command: str, command line
+    :param path: str, socket path (or pipe name)
+    :param timeout: float, seconds
+    :return: str, answer or None if instance not running
+    """
+    data = command.encode('utf-8') + b'\n'
+    if not hasattr(socket, 'AF_UNIX'):
+        return _send_qt(data, path, timeout)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        try:
+            sock.connect(path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            return None  # not running or stale socket
+        except OSError as e:  # hung instance, socket of other user
+            return 'error: ' + str(e)
+        try:
+            sock.sendall(data)
+            answer = b''
+            while not answer.endswith(b'\n'):
+                chunk = sock.recv(1024)
+                if not chunk:
+                    break
+                answer += chunk
+        except OSError as e:
+            return 'error: ' + str(e)
+    return answer.decode('utf-8').strip()
+
+
+def _send_qt(data, path, timeout) -> str:
+    from PyQt5.QtNetwork import QLocalSocket  # named pipes (Windows)
+    msecs = int(timeout * 1000)
+    sock = QLocalSocket()
+    sock.connectToServer(path)
+    if not sock.waitForConnected(msecs):
+        return None
+    sock.write(data)
+    sock.waitForBytesWritten(msecs)
+    answer = b''
+    while not answer.endswith(b'\n') and sock.waitForReadyRead(msecs):
+        answer += bytes(sock.readAll())
+    sock.disconnectFromServer()
+    return answer.decode('utf-8').strip()
@@ -1,15 +1,114 @@
-"""Manage locales - get list and conf."""
+"""Manage locales - get list and conf, patch custom locales. Parsed locales
+are cached in memory and in compiled (marshal) files in cache directory,
+both checked by file mtime and size."""
+import io
+import os
+import marshal
+import hashlib
 from configparser import RawConfigParser
-from core.paths import LANGS, C_LANGS, get_paths
+from core.paths import LANGS, C_LANGS, CACHE, get_paths
+from core.utils import write_atomic, get_signature, STDOUT
 
+LOCALES_CACHE = os.path.join(CACHE, 'locales')
+"""directory for compiled locales"""
+FIELDS = ('name', 'description', 'language', 'country')
+"""required keys in LANG section"""
+_sections = {}
+"""parsed locales, keys - paths, values - (signature, sections dict)"""
+_locales = {}
+"""locale dicts, keys - paths or merged names, values - (signature,
+locale dict)"""
+_headers = {}
+"""LANG sections, keys - paths, values - (signature, dict)"""
 
-def __validate(path) -> bool:
+
+def _get_blob(path) -> str:
+    name = hashlib.sha1(path.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(LOCALES_CACHE, name + '-' +
+                        os.path.basename(path) + '.marshal')
+
+
+def _parse(path) -> dict:
     conf = RawConfigParser()
     conf.read(path, 'utf-8')
-    if 'LANG' not in conf:
-        return False
-    for key in ('name', 'description', 'language', 'country'):
-        if key not in conf['LANG']:
+    return {name: dict(conf[name]) for name in conf.sections()}
+
+
+def get_sections(path) -> dict:
+    """Get parsed locale file (memory, compiled file or parse).
+
+    :param path: str, path to locale file
+    :return: dict, keys - sections, values - dicts (do not change)
+    """
+    signature = get_signature(path)
+    if path in _sections and _sections[path][0] == signature:
+        return _sections[path][1]
+    blob = _get_blob(path)
+    sections = None
+    try:
+        with open(blob, 'rb') as file:
+            data = marshal.load(file)
+        if data[0] == signature:
+            sections = data[1]
+    except (OSError, EOFError, ValueError, TypeError, IndexError):
+        pass
+    if sections is None:
+        sections = _parse(path)
+        try:
+            os.makedirs(LOCALES_CACHE, exist_ok=True)
+            write_atomic(blob, marshal.dumps((signature, sections)))
+        except OSError as e:
+            STDOUT.debug('locale not cached: ' + path + ' (' + str(e) + ')')
+    _sections[path] = (signature, sections)
+    return sections
+
+
+def _to_locale(sections) -> dict:
+    conf = RawConfigParser()
+    conf.read_dict(sections)
+    return dict(conf)
+
+
+def _get_locale(path) -> dict:
+    signature = get_signature(path)
+    if path not in _locales or _locales[path][0] != signature:
+        _locales[path] = (signature, _to_locale(get_sections(path)))
+    return _locales[path][1]
+
+
+def get_header(path) -> dict:
+    """Get LANG section, file not fully parsed (read to next section).
+
+    :param path: str, path to locale file
+    :return: dict, LANG section (empty if not found)
+    """
+    signature = get_signature(path)
+    if path in _sections and _sections[path][0] == signature:
+        return _sections[path][1].get('LANG', {})
+    if path in _headers and _headers[path][0] == signature:
+        return _headers[path][1]
+    lines = []
+    inside = False
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            match = RawConfigParser.SECTCRE.match(line)
+            if match:
+                if inside:
+                    break
+                inside = match.group('header') == 'LANG'
+            if inside:
+                lines.append(line)
+    conf = RawConfigParser()
+    conf.read_string(''.join(lines))
+    header = dict(conf['LANG']) if conf.has_section('LANG') else {}
+    _headers[path] = (signature, header)
+    return header
+
+
+def __validate(path) -> bool:
+    header = get_header(path)
+    for key in FIELDS:
+        if key not in header:
             return False
     return True
 
@@ -32,14 +131,21 @@ def get_locales() -> list:
 
 
 def get_locale(name) -> dict:
-    """Get locale.
+    """Get locale (shared between calls, do not change).
 
     :param name: str, locale name (file name without ext).
     :return: dict
     """
-    conf = RawConfigParser()
-    conf.read(get_paths(LANGS)[name], 'utf-8')
-    return dict(conf)
+    return _get_locale(get_paths(LANGS)[name])
+
+
+def get_info(name) -> dict:
+    """Get LANG section of locale (name, description, language, country).
+
+    :param name: str, locale name (file name without ext).
+    :return: dict
+    """
+    return get_header(get_paths(LANGS)[name])
 
 
 def get_custom_locales() -> list:
@@ -51,14 +157,37 @@ def get_custom_locales() -> list:
 
 
 def get_custom_locale(name) -> dict:
-    """Get custom locale (for user widgets).
+    """Get custom locale (for user widgets, shared between calls, do not
+    change).
 
     :param name: str, locale name (file name without ext).
     :return: dict
     """
-    conf = RawConfigParser()
-    conf.read(get_paths(C_LANGS)[name], 'utf-8')
-    return dict(conf)
+    return _get_locale(get_paths(C_LANGS)[name])
+
+
+def get_merged(name) -> dict:
+    """Get locale with sections and keys from custom locale (base keys not
+    replaced), shared between calls, do not change.
+
+    :param name: str, locale name (file name without ext).
+    :return: dict
+    """
+    stamp = get_stamp(name)
+    key = 'merged:' + name
+    if key in _locales and _locales[key][0] == stamp:
+        return _locales[key][1]
+    custom_path = os.path.join(C_LANGS, name + '.conf')
+    if not os.path.isfile(custom_path):
+        _locales[key] = (stamp, get_locale(name))
+        return _locales[key][1]
+    base = get_sections(get_paths(LANGS)[name])
+    sections = {section: dict(items) for section, items in base.items()}
+    for section, items in get_sections(custom_path).items():
+        for item, value in items.items():
+            sections.setdefault(section, {}).setdefault(item, value)
+    _locales[key] = (stamp, _to_locale(sections))
+    return _locales[key][1]
 
 
 def is_exists(name) -> bool:
@@ -83,3 +212,145 @@ def custom_is_exists(name) -> bool:
     if name in files:
         return __validate(files[name])
     return False
+
+
+def get_stamp(name) -> str:
+    """Get locale version stamp (changed if locale or custom locale file
+    changed). For caches of localized data.
+
+    :param name: str, locale name (file name without ext).
+    :return: str
+    """
+    result = name
+    for path in (os.path.join(LANGS, name + '.conf'),
+                 os.path.join(C_LANGS, name + '.conf')):
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            result += ':' + str(stat.st_mtime_ns) + ':' + str(stat.st_size)
+    return result
+
+
+class LocaleTransaction:
+    """Batch of locale files changes (install / uninstall archives). Every
+    file parsed once on first use and written once (atomic) on commit.
+    Added keys are remembered in owners index, so removing is set
+    difference, keys existed before patch are never removed."""
+    def __init__(self, owners=None):
+        """
+
+        :param owners: dict, owners index (changed in place), keys - paths
+        to locale files, values - dicts: keys - sections, values - dicts:
+        keys - locale keys, values - lists of owners (archives paths)
+        """
+        self.owners = owners if owners is not None else {}
+        """owners index"""
+        self._files = {}
+        self._changed = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if not exc_type:
+            self.commit()
+
+    def get(self, path) -> RawConfigParser:
+        """Get locale file (read once).
+
+        :param path: str, path to locale file
+        :return: RawConfigParser
+        """
+        if path not in self._files:
+            conf = RawConfigParser()
+            if os.path.isfile(path):
+                conf.read(path, 'utf-8')
+            self._files[path] = conf
+        return self._files[path]
+
+    def patch(self, path, sections, owner=None) -> int:
+        """Add new sections and keys (existing keys not replaced).
+
+        :param path: str, path to locale file (created if not exists)
+        :param sections: dict, keys - sections, values - dicts
+        :param owner: str, owner name (archive path)
+        :return: int, count of added keys
+        """
+        conf = self.get(path)
+        owners = self.owners.setdefault(path, {})
+        added = 0
+        for section, items in sections.items():
+            if not conf.has_section(section):
+                conf.add_section(section)
+            for key, value in items.items():
+                key_owners = owners.get(section, {}).get(key)
+                if not conf.has_option(section, key):
+                    conf.set(section, key, value)
+                    added += 1
+                    key_owners = owners.setdefault(section, {})[key] = []
+                if key_owners is not None and owner and \
+                        owner not in key_owners:
+                    key_owners.append(owner)  # shared key
+        if added or not os.path.isfile(path):
+            self._changed.add(path)
+        STDOUT.debug('patch ' + path + ': ' + str(added) + ' keys added')
+        return added
+
+    def remove(self, path, sections, owner=None, indexed=True) -> int:
+        """Remove keys added by owner (if other owners not exists), empty
+        sections removed. Without owners index (old installations) -
+        remove all not owned keys from sections.
+
+        :param path: str, path to locale file
+        :param sections: dict, patch (keys - sections, values - dicts)
+        :param owner: str, owner name (archive path)
+        :param indexed: bool, False if owner installed without owners index
+        :return: int, count of removed keys
+        """
+        if not os.path.isfile(path) and path not in self._files:
+            return 0
+        conf = self.get(path)
+        owners = self.owners.get(path, {})
+        owned = {(section, key) for section in owners
+                 for key in owners[section] if owner in owners[section][key]}
+        if not indexed:
+            owned = {(section, key) for section in sections
+                     for key in sections[section]
+                     if not owners.get(section, {}).get(key)}
+        removed = 0
+        for section, key in owned:
+            key_owners = owners.get(section, {}).get(key, [])
+            if owner in key_owners:
+                key_owners.remove(owner)
+            if key_owners:
+                continue  # used by other owner
+            owners.get(section, {}).pop(key, None)
+            if conf.has_option(section, key):
+                conf.remove_option(section, key)
+                removed += 1
+            if conf.has_section(section) and not conf[section]:
+                conf.remove_section(section)
+            if section in owners and not owners[section]:
+                del owners[section]
+        if path in self.owners and not owners:
+            del self.owners[path]
+        if removed:
+            self._changed.add(path)
+        STDOUT.debug('patch ' + path + ': ' + str(removed) +
+                     ' keys removed')
+        return removed
+
+    def commit(self) -> list:
+        """Write changed locale files.
+
+        :return: list, written files paths
+        """
+        result = []
+        for path in sorted(self._changed):
+            buf = io.StringIO()
+            self._files[path].write(buf)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            write_atomic(path, buf.getvalue())
+            result.append(path)
+            STDOUT.debug('write lang file: ' + path)
+        self._changed.clear()
+        return result
@@ -0,0 +1,132 @@
+"""Asynchronous logging: records are put to bounded queue (dropped if full)
+and written to console and log files by listener thread."""
+import os
+import sys
+import copy
+import queue
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from logging.handlers import RotatingFileHandler
+
+QUEUE_SIZE = 10000
+"""max count of records in queue (new records are dropped if full)"""
+MAX_BYTES = 1048576
+"""max log file size (bytes) before rotation, 0 - never rotate"""
+BACKUP_COUNT = 3
+"""count of rotated log files (stdout.log.1 etc)"""
+
+_handler = None
+_listener = None
+
+
+class DropQueueHandler(QueueHandler):
+    """Put records to bounded queue without blocking, count dropped."""
+    def __init__(self, queue_):
+        """
+
+        :param queue_: queue.Queue, bounded queue
+        """
+        QueueHandler.__init__(self, queue_)
+        self.dropped = 0
+        """count of dropped records"""
+        self._reported = 0
+
+    def prepare(self, record):
+        """Copy record, message (msg % args) and traceback are formatted in
+        listener thread."""
+        return copy.copy(record)
+
+    def enqueue(self, record):
+        try:
+            if self._reported < self.dropped:  # report after storm
+                self.queue.put_nowait(self._get_drop_record(record))
+                self._reported = self.dropped
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _get_drop_record(self, record):
+        return logging.LogRecord(
+            record.name, logging.WARNING, __file__, 0,
+            'dropped log records (queue full): ' + str(self.dropped -
+                                                       self._reported),
+            None, None)
+
+
+class StreamProxy:
+    """for replace stdout and stderr streams"""
+    def __init__(self, logger):
+        self.logger = logger
+
+    def write(self, buf):
+        frame = sys._getframe(1)  # code object data only, no source reads
+        prefix = os.path.basename(frame.f_code.co_filename) + ':' + \
+            str(frame.f_lineno) + ' -> '
+        for line in buf.rstrip().splitlines():
+            self.logger.info(prefix + line.rstrip())
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def get_file_handler(path, log_format, name, max_bytes=MAX_BYTES,
+                     backup_count=BACKUP_COUNT) -> RotatingFileHandler:
+    """Get rotating file handler for logger records.
+
+    :param path: str, path to log file
+    :param log_format: str, logging format
+    :param name: str, logger name (records of other loggers are ignored)
+    :param max_bytes: int, max file size
+    :param backup_count: int, count of rotated files
+    :return: RotatingFileHandler
+    """
+    handler = RotatingFileHandler(path, maxBytes=max_bytes,
+                                  backupCount=backup_count, encoding='utf-8')
+    handler.setLevel(logging.NOTSET)
+    handler.setFormatter(logging.Formatter(log_format))
+    handler.addFilter(logging.Filter(name))
+    return handler
+
+
+def setup(level, handlers, queue_size=QUEUE_SIZE):
+    """Start listener thread and set queue handler to root logger.
+
+    :param level: int, logging level
+    :param handlers: list, handlers for listener thread
+    :param queue_size: int, max count of records in queue
+    """
+    global _handler, _listener
+    stop()
+    _handler = DropQueueHandler(queue.Queue(queue_size))
+    _listener = QueueListener(_handler.queue, *handlers,
+                              respect_handler_level=True)
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(_handler)
+    _listener.start()
+
+
+def get_dropped() -> int:
+    """Get count of dropped records.
+
+    :return: int
+    """
+    return _handler.dropped if _handler else 0
+
+
+def stop():
+    """Write queued records and stop listener thread, next records will be
+    written synchronously."""
+    global _handler, _listener
+    if not _listener:
+        return
+    root = logging.getLogger()
+    for handler in _listener.handlers:
+        root.addHandler(handler)
+    root.removeHandler(_handler)
+    _listener.stop()
+    _handler = None
+    _listener = None
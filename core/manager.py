@@ -1,16 +1,20 @@
 """Manage widgets."""
 import os
 import sys
+import time
 import inspect
-from distutils.util import strtobool
+from collections import deque
 from configparser import RawConfigParser
 from importlib.machinery import SourceFileLoader
 from PyQt5.QtWidgets import QWidget
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer, QObject, pyqtSignal
 import widgets as w
-from core.paths import CONF_WIDGETS, C_WIDGETS
-from core.utils import try_except, print_stack_trace, STDOUT
+from core.paths import C_WIDGETS
+from core.utils import try_except, print_stack_trace, STDOUT, strtobool
 from core.api import WidgetInfo, Widget
+from core.manifest import Manifest, CachedInfo
+from core import tracer
+from core.storage import get_storage
 from core.gui.drag import mouse_enter
 
 sys.path.append(C_WIDGETS)
@@ -18,16 +22,23 @@ CUSTOM_WIDGETS = SourceFileLoader('__init__',
                                   os.path.join(C_WIDGETS, '__init__.py')
                                   ).load_module()
 """Custom widgets module for *use get_widgets(path)* function."""
+SAVE_DELAY = 500
+"""Default write-behind window for ConfigManager.save (ms)."""
+CHUNK_TIME = 8
+"""CatalogueLoader time slice (ms) for one event loop iteration."""
 
 
 class WidgetManager:
     """manage widgets"""
-    def __init__(self, lang, c_lang, main):
+    def __init__(self, lang, c_lang, main, save_delay=SAVE_DELAY,
+                 locale=''):
         """
 
         :param lang: ConfigParser locale dict
         :param c_lang: ConfigParser locale dict for custom widgets
         :param main: gui module
+        :param save_delay: int, write-behind window for config saves (ms)
+        :param locale: str, locale stamp for manifest cache
         """
         self.lang = lang
         """RawConfigParser dict, current locale."""
@@ -41,8 +52,12 @@ class WidgetManager:
         """Custom widgets names list."""
         self.paths = {}
         """Paths to widget files. Keys - names, values - paths to files."""
-        self.config = ConfigManager(self)
+        self.config = ConfigManager(self, save_delay)
         """ConfigManager object"""
+        self.manifest = Manifest(locale)
+        """Manifest object, cached widgets info"""
+        self.catalogue = CatalogueLoader(self)
+        """CatalogueLoader object, idle loading not placed widgets info"""
         self.main_gui = main
         """core.gui.gui module"""
         self.logger = STDOUT
@@ -50,10 +65,12 @@ class WidgetManager:
 
     def load_all(self):
         """Loading all widgets."""
+        self.catalogue.stop()
         for name in w.get_widgets():
             self.load(name)
         for name in CUSTOM_WIDGETS.get_widgets():
             self.load(name)
+        self.manifest.save()
 
     def load_placed(self, placed=True):
         """Loading placed widgets.
@@ -61,12 +78,7 @@ class WidgetManager:
         :param placed: bool, True - only placed, False - only hidden
         """
         if not placed:
-            for name in w.get_widgets():
-                if name not in sys.modules:
-                    self.load(name)
-            for name in CUSTOM_WIDGETS.get_widgets():
-                if name not in sys.modules:
-                    self.load(name)
+            self.load_new()
             return
         for name in self.config.config:
             if name == 'DEFAULT' or name in self.widgets:
@@ -76,12 +88,76 @@ class WidgetManager:
 
     def load_new(self):
         """Loading only new widgets (not loaded before)."""
-        for name in w.get_widgets():
-            if name not in sys.modules:
-                self.load(name)
-        for name in CUSTOM_WIDGETS.get_widgets():
-            if name not in sys.modules:
+        self.catalogue.stop()
+        for name in self.get_new_modules():
+            if not self.is_loaded(name):
                 self.load(name)
+        self.manifest.save()
+
+    def get_new_modules(self) -> list:
+        """Get modules names of not loaded widgets.
+
+        :return: list, str modules names
+        """
+        return [name for name in w.get_widgets() +
+                CUSTOM_WIDGETS.get_widgets() if not self.is_loaded(name)]
+
+    def is_loaded(self, module_name) -> bool:
+        """Check module is imported or its info is loaded from manifest.
+
+        :param module_name: str, module name
+        :return: bool, True if loaded
+        """
+        if module_name in sys.modules:
+            return True
+        for path in self.paths.values():
+            if os.path.basename(path)[:-3] == module_name:
+                return True
+        return False
+
+    @staticmethod
+    def find_module(module_name) -> str:
+        """Find widget module file (without import).
+
+        :param module_name: str, module name
+        :return: str, path to file or None if not found
+        """
+        for folder in (w.PATH, C_WIDGETS):
+            path = os.path.join(folder, module_name + '.py')
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def load_cached(self, module_name) -> bool:
+        """Load WidgetInfo from manifest (without import module). Only for
+        not placed widgets.
+
+        :param module_name: str, module name
+        :return: bool, True if loaded, None if no valid manifest entry
+        """
+        path = self.find_module(module_name)
+        entry = self.manifest.get(path)
+        if not entry:
+            return None
+        if entry['skip']:
+            self.logger.debug(module_name + ' skipped (manifest)')
+            return False
+        if entry['NAME'] in self.info:
+            self.logger.info(module_name + ', name "' + entry['NAME'] +
+                             '" is exists')
+            return False
+        if self.config.is_placed(entry['NAME']):
+            return None
+        info = CachedInfo(self.lang, entry)
+        if os.path.dirname(path) == C_WIDGETS:
+            if info.NAME in self.custom_widgets:
+                self.logger.info(module_name + ', name "' + info.NAME +
+                                 '" is exists')
+                return False
+            self.custom_widgets.append(info.NAME)
+        self.info[info.NAME] = info
+        self.paths[info.NAME] = path
+        return True
 
     def load(self, module_name, only_info=True) -> bool:
         """Load widget from module.
@@ -96,20 +172,28 @@ class WidgetManager:
                 del sys.modules[module_name]
             return False
 
+        start = tracer.now()
         try:
+            if only_info and module_name not in sys.modules:
+                result = self.load_cached(module_name)
+                if result is not None:  # info from manifest
+                    return result
             if module_name in sys.modules:  # get module
                 mod = sys.modules[module_name]
             else:  # import module
-                mod = __import__(module_name)
+                with tracer.span('import', 'step', widget=module_name):
+                    mod = __import__(module_name)
             # validate module
             if not self.validate_widget_module(mod):
                 self.logger.info(module_name + ' fail validation module')
                 return return_false()
             if self.is_loading_skip(mod):
                 self.logger.debug(module_name + ' skipped')
+                self.manifest.put_skip(mod.__file__)
                 return return_false()
             # init and validate WidgetInfo
-            info = mod.Info(self.lang)
+            with tracer.span('Info', 'step', widget=module_name):
+                info = mod.Info(self.lang)
             if not self.validate_widget_info(info):
                 self.logger.info(module_name + ' fail validation WidgetInfo')
                 return return_false()
@@ -126,30 +210,37 @@ class WidgetManager:
             # fill data
             if os.path.dirname(mod.__file__) == C_WIDGETS:
                 if info.NAME in self.custom_widgets:  # check exists
-                    self.logger.info(module_name + ', name "' + info.NAME +
-                                     '" is exists')
-                    return return_false()
+                    if self.paths.get(info.NAME) != mod.__file__:
+                        self.logger.info(module_name + ', name "' +
+                                         info.NAME + '" is exists')
+                        return return_false()
                 else:
                     self.custom_widgets.append(info.NAME)
             self.info[info.NAME] = info
             self.paths[info.NAME] = mod.__file__
+            self.manifest.put(mod.__file__, info, self.lang)
             if only_info and not self.config.is_placed(info.NAME):
                 return True
             # init and validate Main class
-            widget = mod.Main(self, info)
+            with tracer.span('Main', 'step', widget=module_name):
+                widget = mod.Main(self, info)
             if not self.validate_widget_main(widget):
                 self.logger.info(module_name + ' fail validation Main')
                 return return_false()
             # setup Main class
-            self.setup_widget(widget, info)
+            with tracer.span('setup_widget', 'step', widget=module_name):
+                self.setup_widget(widget, info)
             self.widgets[info.NAME] = widget
-            self.config.load(info.NAME)
+            with tracer.span('config.load', 'step', widget=module_name):
+                self.config.load(info.NAME)
             self.call_load_other(info.NAME)
             return True
         except:
             print_stack_trace()()
             self.logger.error(module_name + ' fail loading')
             return return_false()
+        finally:
+            tracer.record('load', start, 'widget', widget=module_name)
 
     @staticmethod
     def is_loading_skip(mod):
@@ -241,7 +332,7 @@ class WidgetManager:
         self.config.set_placed(name, False)
         if reminconf:
             self.config.remove(name)
-        self.config.save()
+        self.config.save(name)
 
     @try_except()
     def delete_widget(self, name):
@@ -273,9 +364,12 @@ class WidgetManager:
         :param module_name: str, module name
         :return: bool, True if success, False if bad validation or except
         """
-        if module_name not in sys.modules:
+        if module_name in sys.modules:
+            mod = sys.modules[module_name]
+        elif self.is_loaded(module_name):  # info from manifest
+            mod = __import__(module_name)
+        else:
             return False
-        mod = sys.modules[module_name]
         # validate module
         if not self.validate_widget_module(mod):
             return False
@@ -306,7 +400,7 @@ class WidgetManager:
         del self.paths[name]
         if name in self.custom_widgets:
             self.custom_widgets.remove(name)
-        del sys.modules[module_name]
+        sys.modules.pop(module_name, None)
 
     @try_except()
     def unload(self, name):
@@ -328,14 +422,18 @@ class WidgetManager:
         """Unload all loaded widgets.
 
         :param del_from_dicts: bool, if True - like del_from_dicts"""
+        self.catalogue.stop()
         for name in list(self.widgets.keys()):
             self.unload(name)
             if del_from_dicts:
                 self.del_from_dicts(name)
+        self.config.flush()
+        self.manifest.save()
 
     def del_data_no_placed(self):
         """Remove data (from info, paths and sys.modules) only not placed
         widgets."""
+        self.catalogue.stop()
         for name in list(self.info.keys()):
             if name not in self.widgets:
                 self.del_from_dicts(name)
@@ -428,7 +526,7 @@ class WidgetManager:
 
         if name and name in self.widgets:
             save(self.widgets[name])
-            self.config.save()
+            self.config.save(name)
             return True
         elif not name:
             for w_object in self.widgets.values():
@@ -439,18 +537,105 @@ class WidgetManager:
             return False
 
 
+class CatalogueLoader(QObject):
+    """Load info of not loaded widgets in idle time: zero-interval timer,
+    modules are loaded while time slice not ended."""
+    loaded = pyqtSignal(str)
+    """widget info loaded, widget name"""
+    finished = pyqtSignal()
+    """all modules loaded"""
+
+    def __init__(self, widget_manager, chunk_time=CHUNK_TIME):
+        """
+
+        :param widget_manager: WidgetManager object
+        :param chunk_time: int, time slice (ms)
+        """
+        super().__init__()
+        self.wm = widget_manager
+        """WidgetManager object"""
+        self.chunk_time = chunk_time
+        """time slice (ms)"""
+        self.queue = deque()
+        """modules names for loading"""
+        self._start = 0
+        self._timer = QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._load_chunk)
+
+    def start(self):
+        """Start loading not loaded widgets."""
+        self.queue = deque(self.wm.get_new_modules())
+        self._start = tracer.now()
+        self._timer.start()
+
+    def is_running(self) -> bool:
+        """Check loading.
+
+        :return: bool, True if not finished
+        """
+        return self._timer.isActive()
+
+    def stop(self):
+        """Stop loading (not loaded modules are skipped)."""
+        if not self._timer.isActive():
+            return
+        self._timer.stop()
+        self.queue.clear()
+        self.wm.manifest.save()
+
+    def _load_chunk(self):
+        end = time.perf_counter() + self.chunk_time / 1000
+        while self.queue and time.perf_counter() < end:
+            name = self.queue.popleft()
+            if self.wm.is_loaded(name):
+                continue
+            count = len(self.wm.info)
+            if not self.wm.load(name):
+                continue
+            for info_name in list(self.wm.info)[count:]:
+                self.loaded.emit(info_name)
+        if self.queue:
+            return
+        self._timer.stop()
+        self.wm.manifest.save()
+        tracer.record('catalogue', self._start)
+        self.finished.emit()
+
+
 class ConfigManager:
     """manage config"""
-    def __init__(self, widget_manager):
+    def __init__(self, widget_manager, delay=SAVE_DELAY):
+        """
+
+        :param widget_manager: WidgetManager object
+        :param delay: int, write-behind window (ms), 0 - write at once
+        """
         self.wm = widget_manager
         """WidgetManager object"""
         self.config = RawConfigParser()
         """RawConfigParser object"""
+        self.storage = None
+        """Storage object (see core.storage)"""
+        self.delay = delay
+        """Saves are coalesced over this window (ms)."""
+        self._dirty = set()
+        self._dirty_all = False
+        self._timer = QTimer()
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.flush)
         try:
-            if os.path.isfile(CONF_WIDGETS):
-                self.config.read(CONF_WIDGETS, 'UTF-8')
+            self.storage = get_storage()
+            self.storage.read(self.config)
         except:
             print_stack_trace()()
+            STDOUT.warning('widgets config storage failed, use ini')
+            self.config = RawConfigParser()
+            self.storage = get_storage('ini')
+            try:
+                self.storage.read(self.config)
+            except:
+                print_stack_trace()()
 
     def load_all(self):
         """Load (setup) only configured widgets."""
@@ -476,14 +661,42 @@ class ConfigManager:
         widget.setWindowOpacity(float(prop['opacity']))
         if self.is_placed(name):
             # if placed, show window
-            widget.boot()
+            with tracer.span('boot', 'step', widget=widget.__module__):
+                widget.boot()
             widget.show()
 
+    def save(self, name=None):
+        """Schedule saving config to file (write-behind). Calls within the
+        delay window are coalesced into one write, see flush.
+
+        :param name: str, changed widget section (None - all sections)
+        """
+        if name is None:
+            self._dirty_all = True
+        else:
+            self._dirty.add(name)
+        if self.delay <= 0:
+            self.flush()
+        elif not self._timer.isActive():
+            self._timer.start(self.delay)
+
+    def is_dirty(self) -> bool:
+        """Check unsaved changes.
+
+        :return: bool, True if save called after last flush
+        """
+        return self._dirty_all or bool(self._dirty)
+
     @try_except()
-    def save(self):
-        """Save config to file."""
-        with open(CONF_WIDGETS, 'w', encoding='UTF-8') as config:
-            self.config.write(config)
+    def flush(self):
+        """Write pending changes to storage now (only changed sections)."""
+        self._timer.stop()
+        if not self.is_dirty():
+            return
+        self.storage.write(self.config,
+                           None if self._dirty_all else self._dirty)
+        self._dirty.clear()
+        self._dirty_all = False
 
     @try_except()
     def add(self, name):
@@ -0,0 +1,160 @@
+"""Widgets manifest - cached WidgetInfo data for building the widgets list
+without importing widget modules."""
+import os
+import json
+import base64
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice
+from PyQt5.QtGui import QIcon, QPixmap
+from core.api import WidgetInfo
+from core.paths import CACHE, RES
+from core.resources import get_icon
+from core.utils import try_except, print_stack_trace, write_atomic, STDOUT
+from core.utils import get_signature
+
+MANIFEST = os.path.join(CACHE, 'manifest.json')
+"""manifest cache file"""
+FIELDS = ('NAME', 'VERSION', 'DESCRIPTION', 'HELP', 'AUTHOR', 'EMAIL', 'URL')
+"""cached WidgetInfo attributes"""
+
+
+def get_section(lang, info) -> str:
+    """Find locale section name used by WidgetInfo.
+
+    :param lang: ConfigParser locale dict
+    :param info: WidgetInfo object
+    :return: str, section name or None
+    """
+    for name in lang:
+        if lang[name] is info.lang:
+            return name
+    return None
+
+
+def icon_to_png(icon, size=64) -> str:
+    """Serialize QIcon to base64 PNG string.
+
+    :param icon: QIcon
+    :param size: int, pixmap size
+    :return: str, base64 PNG
+    """
+    data = QByteArray()
+    buf = QBuffer(data)
+    buf.open(QIODevice.WriteOnly)
+    icon.pixmap(size, size).save(buf, 'PNG')
+    buf.close()
+    return base64.b64encode(bytes(data)).decode('ASCII')
+
+
+class CachedInfo(WidgetInfo):
+    """WidgetInfo restored from manifest (module not imported)"""
+    def __init__(self, lang, entry):
+        """
+
+        :param lang: ConfigParser locale dict
+        :param entry: dict, manifest entry
+        """
+        WidgetInfo.__init__(self, lang)
+        if entry['section'] and entry['section'] in lang:
+            self.lang = lang[entry['section']]
+        for key in FIELDS:
+            setattr(self, key, entry[key])
+        if entry['icon']:
+            self.ICON_PATH = entry['icon']
+            self.ICON = get_icon(self.ICON_PATH)
+        elif entry['icon_png']:
+            pixmap = QPixmap()
+            pixmap.loadFromData(base64.b64decode(entry['icon_png']), 'PNG')
+            self.ICON = QIcon(pixmap)
+
+
+class Manifest:
+    """manage manifest cache, entries keyed by module path and validated by
+    file mtime, size and locale stamp"""
+    def __init__(self, locale='', path=MANIFEST):
+        """
+
+        :param locale: str, locale stamp (entries for other stamp is invalid)
+        :param path: str, path to manifest file
+        """
+        self.locale = locale
+        """locale stamp"""
+        self.path = path
+        """path to manifest file"""
+        self.entries = {}
+        """Entries dict, keys - module paths, values - dicts."""
+        self._changed = False
+        try:
+            if os.path.isfile(path):
+                with open(path, encoding='utf-8') as file:
+                    self.entries = json.loads(file.read())
+        except:
+            print_stack_trace()()
+            self.entries = {}
+
+    def get(self, path) -> dict:
+        """Get valid entry for module.
+
+        :param path: str, path to module file
+        :return: dict, entry or None if not cached or changed
+        """
+        if not path or path not in self.entries:
+            return None
+        entry = self.entries[path]
+        if entry['locale'] != self.locale or \
+                entry['signature'] != get_signature(path) or \
+                entry.get('res') != RES:  # icons paths (moved)
+            return None
+        return entry
+
+    def _put(self, path, entry):
+        entry['signature'] = get_signature(path)
+        entry['locale'] = self.locale
+        entry['res'] = RES
+        self.entries[path] = entry
+        self._changed = True
+
+    @try_except()
+    def put(self, path, info, lang):
+        """Add or update module entry.
+
+        :param path: str, path to module file
+        :param info: WidgetInfo object
+        :param lang: ConfigParser locale dict (passed to Info)
+        """
+        entry = {'skip': False, 'section': get_section(lang, info),
+                 'icon': info.ICON_PATH, 'icon_png': None}
+        for key in FIELDS:
+            entry[key] = getattr(info, key)
+        if not info.ICON_PATH:
+            entry['icon_png'] = icon_to_png(info.ICON)
+        self._put(path, entry)
+
+    def put_skip(self, path):
+        """Add entry for module with not_loading option.
+
+        :param path: str, path to module file
+        """
+        self._put(path, {'skip': True})
+
+    def remove(self, path):
+        """Remove module entry.
+
+        :param path: str, path to module file
+        """
+        if path in self.entries:
+            del self.entries[path]
+            self._changed = True
+
+    @try_except()
+    def save(self):
+        """Write manifest if changed (entries for removed files dropped)."""
+        for path in list(self.entries.keys()):
+            if not os.path.isfile(path):
+                self.remove(path)
+        if not self._changed:
+            return
+        if not os.path.isdir(os.path.dirname(self.path)):
+            os.makedirs(os.path.dirname(self.path))
+        write_atomic(self.path, json.dumps(self.entries))
+        self._changed = False
+        STDOUT.debug('manifest saved: ' + self.path)
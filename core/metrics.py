@@ -0,0 +1,180 @@
+"""Shared system metrics sampler. One psutil snapshot per interval for all
+subscribed widgets (only fields requested by subscribers are sampled)."""
+import time
+from collections import namedtuple, deque
+from types import MappingProxyType
+from PyQt5.QtCore import QTimer
+from core.utils import print_stack_trace
+from core.imports import lazy
+
+psutil = lazy('psutil')
+
+INTERVAL = 500
+"""base sampling interval (ms), subscribers intervals are rounded to it"""
+HISTORY = 120
+"""count of snapshots in history"""
+SAMPLERS = {
+    'cpu_percent': lambda: psutil.cpu_percent(),
+    'cpu_percpu': lambda: tuple(psutil.cpu_percent(percpu=True)),
+    'cpu_freq': lambda: psutil.cpu_freq() if hasattr(psutil, 'cpu_freq')
+    else None,
+    'cpu_freq_percpu': lambda: tuple(psutil.cpu_freq(True)) if hasattr(
+        psutil, 'cpu_freq') else None,
+    'virtual_memory': lambda: psutil.virtual_memory(),
+    'swap_memory': lambda: psutil.swap_memory(),
+    'net_io': lambda: psutil.net_io_counters(),
+    'net_io_pernic': lambda: MappingProxyType(psutil.net_io_counters(True)),
+    'net_if_stats': lambda: MappingProxyType(psutil.net_if_stats())
+}
+"""Fields, keys - names, values - functions. Also supported field
+'net_connections:KIND' (count of connections, KIND - psutil kind)."""
+
+
+def sample_field(field):
+    """Get field value.
+
+    :param field: str, field name
+    :return: value (None if failed)
+    """
+    try:
+        if field.startswith('net_connections:'):
+            return len(psutil.net_connections(field[16:]))
+        return SAMPLERS[field]()
+    except:
+        print_stack_trace()()
+        return None
+
+
+class Snapshot(namedtuple('Snapshot', ('time', 'values'))):
+    """Immutable metrics snapshot: time (time.time()) and values
+    (read-only dict, keys - fields)."""
+    __slots__ = ()
+
+    def get(self, field, default=None):
+        """Get field value.
+
+        :param field: str, field name
+        :param default: value if field not sampled
+        :return: value
+        """
+        return self.values.get(field, default)
+
+
+class _Subscriber:
+    __slots__ = ('fields', 'every', 'countdown')
+
+    def __init__(self, fields, every):
+        self.fields = fields
+        self.every = every
+        self.countdown = every
+
+
+class MetricsHub:
+    """Sample metrics by timer and deliver snapshots to subscribers. Timer
+    work only while there are subscribers."""
+    def __init__(self, interval=INTERVAL, history=HISTORY):
+        """
+
+        :param interval: int, base interval (ms)
+        :param history: int, max count of snapshots in history
+        """
+        self.interval = interval
+        """base interval (ms)"""
+        self.history = deque(maxlen=history)
+        """last snapshots (ring buffer)"""
+        self._subs = {}
+        self._timer = QTimer()
+        self._timer.timeout.connect(self._tick)
+
+    def sample(self, fields) -> Snapshot:
+        """Sample fields and add snapshot to history.
+
+        :param fields: iterable, field names
+        :return: Snapshot
+        """
+        values = {}
+        for field in fields:
+            values[field] = sample_field(field)
+        snapshot = Snapshot(time.time(), MappingProxyType(values))
+        self.history.append(snapshot)
+        return snapshot
+
+    def subscribe(self, callback, fields, interval=1000):
+        """Subscribe or update subscription, callback will be called with
+        current snapshot immediately.
+
+        :param callback: function, callback(snapshot)
+        :param fields: iterable, field names
+        :param interval: int, update interval (ms)
+        """
+        sub = _Subscriber(frozenset(fields),
+                          max(1, round(interval / self.interval)))
+        self._subs[callback] = sub
+        self._deliver(callback, self.sample(sub.fields))
+        if not self._timer.isActive():
+            self._timer.start(self.interval)
+
+    def unsubscribe(self, callback):
+        """Remove subscription (sampling stops if no subscribers).
+
+        :param callback: function, subscribed callback
+        """
+        if callback in self._subs:
+            del self._subs[callback]
+        if not self._subs:
+            self._timer.stop()
+
+    def is_subscribed(self, callback) -> bool:
+        """Check subscription.
+
+        :param callback: function, callback
+        :return: bool, True if subscribed
+        """
+        return callback in self._subs
+
+    def get_history(self, field) -> list:
+        """Get field values from history.
+
+        :param field: str, field name
+        :return: list, tuples (time, value), oldest first
+        """
+        return [(s.time, s.values[field]) for s in self.history
+                if field in s.values]
+
+    @staticmethod
+    def _deliver(callback, snapshot):
+        try:
+            callback(snapshot)
+        except:
+            print_stack_trace()()
+
+    def _tick(self):
+        due = []
+        fields = set()
+        for callback, sub in self._subs.items():
+            sub.countdown -= 1
+            if sub.countdown > 0:
+                continue
+            sub.countdown = sub.every
+            due.append(callback)
+            fields.update(sub.fields)
+        if not due:
+            return
+        snapshot = self.sample(fields)
+        for callback in due:
+            if callback in self._subs:  # may be unsubscribed by other
+                self._deliver(callback, snapshot)
+
+
+_hub = None
+
+
+def get_hub() -> MetricsHub:
+    """Get shared MetricsHub (created on first call).
+
+    :return: MetricsHub
+    """
+    global _hub
+    if _hub is None:
+        _hub = MetricsHub()
+    return _hub
@@ -6,7 +6,15 @@ from argparse import ArgumentParser
 from configparser import RawConfigParser
 
 
-RES = os.path.join(sys.path[0], 'res')
+RES_DIR = os.path.join(sys.path[0], 'res')
+"""built-in resources directory (loose files)"""
+RES_BUNDLE = os.path.join(sys.path[0], 'res_rc.py')
+"""compiled built-in resources (python3 -m core.bundle)"""
+RES = RES_DIR
+"""built-in resources directory (files are read from compiled bundle by
+core.resources if bundle exists)"""
+RES_QRC = ':/res'
+"""built-in resources in compiled bundle (used only by core.resources)"""
 LANGS = os.path.join(sys.path[0], 'langs')
 C_WIDGETS = os.path.join(sys.path[0], 'custom_widgets')
 """custom widgets directory"""
@@ -14,6 +22,8 @@ C_RES = os.path.join(C_WIDGETS, 'res')
 """resource directory for custom widgets"""
 C_LANGS = os.path.join(C_WIDGETS, 'langs')
 """langs directory for custom widgets"""
+CACHE = os.path.join(sys.path[0], '.cache')
+"""directory for rebuildable data (widgets manifest and other caches)"""
 
 AVA = os.path.join(RES, 'ava.png')
 DELETE = os.path.join(RES, 'delete.png')
@@ -40,12 +50,29 @@ DEL_ARCHIVES = os.path.join(RES, 'del_archives.png')
 
 CONF_SETTINGS = os.path.join(sys.path[0], 'settings.conf')
 CONF_WIDGETS = os.path.join(sys.path[0], 'widgets.conf')
+CONF_STORAGE = 'ini'
+"""widgets config storage: ini, dir (file per widget) or sqlite"""
+CONF_WIDGETS_DIR = os.path.join(sys.path[0], 'widgets.d')
+"""directory for dir storage"""
+CONF_WIDGETS_DB = os.path.join(sys.path[0], 'widgets.db')
+"""database for sqlite storage"""
 CONF_PATHS = os.path.join(sys.path[0], 'paths.conf')
 CONF_INSTALL = os.path.join(C_WIDGETS, 'install.conf')
+CONF_INSTALL_INDEX = os.path.join(C_WIDGETS, 'install.index')
+"""content index of installed archives (SHA-256, references)"""
 STDOUT_LOG = os.path.join(sys.path[0], 'stdout.log')
 STDERR_LOG = os.path.join(sys.path[0], 'stderr.log')
 LICENSE_TXT = os.path.join(sys.path[0], 'license.txt')
 LOCK_FILE = os.path.join(sys.path[0], '.pid.lock')
+SOCKET = os.path.join(sys.path[0], '.dewidgets.sock')
+"""local socket of running instance (commands from other instances)"""
+PROFILE_STARTUP = None
+"""path to startup trace file (None - tracer disabled)"""
+IMPORT_REPORT = False
+"""True - print widgets import time report and exit"""
+COMMANDS = []
+"""commands for running instance (--show and others), for example
+['edit-mode on']"""
 
 if len(sys.argv):  # parsing arguments
     parser = ArgumentParser('DeWidgets', 'DeWidgets [-c /home/alex/.dw]',
@@ -56,30 +83,54 @@ if len(sys.argv):  # parsing arguments
                         help='Load config for use custom components paths.')
     parser.add_argument('-c', '--create', default=None, type=str,
                         help='Create folders and filed into the given path.')
+    parser.add_argument('--profile-startup', default=None, type=str,
+                        help='Write startup timeline (Chrome trace JSON and '
+                             'text summary) to the given path.')
+    parser.add_argument('--import-report', action='store_true',
+                        help='Print import time of every widget module and '
+                             'exit.')
+    parser.add_argument('--show', action='store_true',
+                        help='Show main window of running instance (or '
+                             'start).')
+    parser.add_argument('--hide-widgets', nargs='?', const='toggle',
+                        choices=('on', 'off', 'toggle'),
+                        help='Hide or show widgets of running instance.')
+    parser.add_argument('--reload', action='store_true',
+                        help='Reload widgets of running instance.')
+    parser.add_argument('--edit-mode', choices=('on', 'off'),
+                        help='Switch edit mode of running instance.')
     result = parser.parse_known_args(sys.argv)[0]
     if result.create:
         CR = os.path.join(result.create, 'res')
         CL = os.path.join(result.create, 'langs')
         CW = os.path.join(result.create, 'custom_widgets')
+        CC = os.path.join(result.create, 'cache')
         P = os.path.join(result.create, 'paths.conf')
         if not os.path.isfile(P):
             conf = RawConfigParser()
             conf['CONFIGS'] = {
                 'settings': os.path.join(result.create, 'settings.conf'),
                 'widgets': os.path.join(result.create, 'widgets.conf'),
-                'install': os.path.join(result.create, 'install.conf')
+                'install': os.path.join(result.create, 'install.conf'),
+                'install_index': os.path.join(result.create,
+                                              'install.index'),
+                'storage': 'ini',
+                'widgets_dir': os.path.join(result.create, 'widgets.d'),
+                'widgets_db': os.path.join(result.create, 'widgets.db')
             }
             conf['LOGS'] = {
                 'stderr': os.path.join(result.create, 'stderr.log'),
                 'stdout': os.path.join(result.create, 'stdout.log')
             }
             conf['OTHER'] = {
-                'lock': os.path.join(result.create, '.pid.lock')
+                'lock': os.path.join(result.create, '.pid.lock'),
+                'socket': os.path.join(result.create, '.dewidgets.sock')
             }
             conf['DIRS'] = {
                 'c_widgets': CW,
                 'c_res': CR,
-                'c_langs': CL
+                'c_langs': CL,
+                'cache': CC
             }
             if not os.path.isdir(result.create):
                 os.mkdir(result.create)
@@ -98,6 +149,17 @@ if len(sys.argv):  # parsing arguments
         CONF_PATHS = P
     if result.paths:
         CONF_PATHS = result.paths
+    if result.profile_startup:
+        PROFILE_STARTUP = os.path.abspath(result.profile_startup)
+    IMPORT_REPORT = result.import_report
+    if result.hide_widgets:
+        COMMANDS.append('hide-widgets ' + result.hide_widgets)
+    if result.reload:
+        COMMANDS.append('reload')
+    if result.edit_mode:
+        COMMANDS.append('edit-mode ' + result.edit_mode)
+    if result.show:
+        COMMANDS.append('show')
 
 if os.path.isfile(CONF_PATHS):  # for user customization
     paths = RawConfigParser()
@@ -105,15 +167,26 @@ if os.path.isfile(CONF_PATHS):  # for user customization
     CONF_SETTINGS = paths['CONFIGS']['settings']
     CONF_WIDGETS = paths['CONFIGS']['widgets']
     CONF_INSTALL = paths['CONFIGS']['install']
+    CONF_INSTALL_INDEX = paths['CONFIGS'].get('install_index', os.path.join(
+        os.path.dirname(CONF_INSTALL), 'install.index'))
+    CONF_STORAGE = paths['CONFIGS'].get('storage', CONF_STORAGE)
+    CONF_WIDGETS_DIR = paths['CONFIGS'].get('widgets_dir', os.path.join(
+        os.path.dirname(CONF_WIDGETS), 'widgets.d'))
+    CONF_WIDGETS_DB = paths['CONFIGS'].get('widgets_db', os.path.join(
+        os.path.dirname(CONF_WIDGETS), 'widgets.db'))
     STDERR_LOG = paths['LOGS']['stderr']
     STDOUT_LOG = paths['LOGS']['stdout']
     LOCK_FILE = paths['OTHER']['lock']
+    SOCKET = paths['OTHER'].get('socket', os.path.join(
+        os.path.dirname(LOCK_FILE), '.dewidgets.sock'))
     C_WIDGETS = paths['DIRS']['c_widgets']
     C_RES = paths['DIRS']['c_res']
     C_LANGS = paths['DIRS']['c_langs']
+    CACHE = paths['DIRS'].get('cache', os.path.join(
+        os.path.dirname(CONF_WIDGETS), '.cache'))
 
 
-def get_paths(folder=RES, files=True) -> dict:
+def get_paths(folder=RES_DIR, files=True) -> dict:
     """Get file or subdir paths in given dir.
     
     :param folder: full path to dir
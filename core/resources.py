@@ -0,0 +1,106 @@
+"""Shared resources: icons, pixmaps and stylesheets (by path, for example
+constants from core.paths). Icons are lazy (image decoded on first paint and
+kept in QPixmapCache), pixmaps are kept in QPixmapCache (bounded by its
+limit), stylesheets are cached and re-read only if file changed. Compiled
+built-in resources (core.bundle) are registered on import, files from RES are
+read from them."""
+import os
+from PyQt5.QtCore import QFile, QIODevice, QUrl
+from PyQt5.QtGui import QIcon, QPixmap, QPixmapCache
+from core.paths import RES, RES_QRC
+from core.utils import get_signature
+from core import bundle
+
+_icons = {}
+"""keys - paths, values - QIcon"""
+_styles = {}
+"""keys - paths, values - (signature, text)"""
+_bundled = bundle.load()
+"""True if compiled resources registered"""
+
+
+def get_path(path) -> str:
+    """Get path for Qt (resource path for built-in file if bundle loaded).
+
+    :param path: str, path to file
+    :return: str, ':/res/...' or path
+    """
+    if not _bundled or not path.startswith(RES + os.sep):
+        return path
+    return '/'.join([RES_QRC] + os.path.relpath(path, RES).split(os.sep))
+
+
+def get_icon(path) -> QIcon:
+    """Get shared icon (needs QApplication).
+
+    :param path: str, path to image
+    :return: QIcon
+    """
+    if path not in _icons:
+        _icons[path] = QIcon(get_path(path))
+    return _icons[path]
+
+
+def get_pixmap(path) -> QPixmap:
+    """Get pixmap from QPixmapCache (loaded if not cached or evicted, needs
+    QApplication).
+
+    :param path: str, path to image
+    :return: QPixmap
+    """
+    key = 'dw:' + path
+    pixmap = QPixmapCache.find(key)
+    if pixmap is None or pixmap.isNull():
+        pixmap = QPixmap(get_path(path))
+        QPixmapCache.insert(key, pixmap)
+    return pixmap
+
+
+def get_style(path) -> str:
+    """Get stylesheet (file read again only if changed).
+
+    :param path: str, path to css file
+    :return: str, stylesheet
+    """
+    signature = get_signature(path)
+    if path not in _styles or _styles[path][0] != signature:
+        _styles[path] = (signature, read_text(path))
+    return _styles[path][1]
+
+
+def read_text(path) -> str:
+    """Read text file (also from compiled resources).
+
+    :param path: str, path to file (':/...' - resource)
+    :return: str, text (utf-8)
+    """
+    path = get_path(path)
+    if not path.startswith(':'):
+        with open(path, encoding='utf-8') as file:
+            return file.read()
+    file = QFile(path)
+    if not file.open(QIODevice.ReadOnly):
+        raise FileNotFoundError('resource not found: ' + path)
+    try:
+        return bytes(file.readAll()).decode('utf-8')
+    finally:
+        file.close()
+
+
+def get_url(path) -> QUrl:
+    """Get URL for file (qrc URL for compiled resources).
+
+    :param path: str, path to file
+    :return: QUrl
+    """
+    path = get_path(path)
+    if path.startswith(':'):
+        return QUrl('qrc' + path)
+    return QUrl.fromLocalFile(path)
+
+
+def clear():
+    """Clear all caches."""
+    _icons.clear()
+    _styles.clear()
+    QPixmapCache.clear()
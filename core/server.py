@@ -0,0 +1,91 @@
+"""Local server of running instance, executes commands from other instances
+(client and protocol - core.ipc)."""
+from PyQt5.QtCore import QObject
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+from core.ipc import OK, TIMEOUT
+from core.paths import SOCKET
+from core.utils import try_except, STDOUT
+
+
+class Server(QObject):
+    """Local server for commands from other instances."""
+    def __init__(self, handlers, path=SOCKET, parent=None):
+        """
+
+        :param handlers: dict, keys - commands names, values - functions
+        (argument - str, text after name or empty)
+        :param path: str, socket path (or pipe name)
+        :param parent: QObject
+        """
+        super().__init__(parent)
+        self.handlers = handlers
+        """commands handlers"""
+        self.path = path
+        """socket path"""
+        self.server = QLocalServer(self)
+        """QLocalServer"""
+        self.server.setSocketOptions(QLocalServer.UserAccessOption)
+        self.server.newConnection.connect(self._connection)
+
+    def listen(self) -> bool:
+        """Start listening (stale socket removed, socket of other running
+        instance is kept).
+
+        :return: bool, True if listening
+        """
+        if not self._is_stale():
+            STDOUT.warning('local server not started: socket used by other '
+                           'instance: ' + self.path)
+            return False
+        QLocalServer.removeServer(self.path)
+        if not self.server.listen(self.path):
+            STDOUT.warning('local server not started: ' +
+                           self.server.errorString())
+            return False
+        STDOUT.debug('local server: ' + self.server.fullServerName())
+        return True
+
+    def _is_stale(self) -> bool:
+        sock = QLocalSocket()
+        sock.connectToServer(self.path)
+        if sock.waitForConnected(int(TIMEOUT * 1000)):
+            sock.disconnectFromServer()
+            return False
+        return sock.error() in (QLocalSocket.ConnectionRefusedError,
+                                QLocalSocket.ServerNotFoundError)
+
+    def close(self):
+        """Stop listening (socket removed)."""
+        self.server.close()
+
+    def execute(self, line) -> str:
+        """Execute command.
+
+        :param line: str, command line
+        :return: str, answer
+        """
+        name, _, arg = line.strip().partition(' ')
+        if name not in self.handlers:
+            return 'error: unknown command ' + name
+        STDOUT.info('command: ' + line.strip())
+        try:
+            self.handlers[name](arg.strip())
+        except Exception as e:
+            STDOUT.error('command failed: ' + line.strip(),
+                         exc_info=True)
+            return 'error: ' + str(e)
+        return OK
+
+    @try_except()
+    def _connection(self):
+        while self.server.hasPendingConnections():
+            sock = self.server.nextPendingConnection()
+            sock.readyRead.connect(lambda s=sock: self._read(s))
+            sock.disconnected.connect(sock.deleteLater)
+
+    @try_except()
+    def _read(self, sock):
+        while sock.canReadLine():
+            line = bytes(sock.readLine()).decode('utf-8', 'replace')
+            sock.write((self.execute(line) + '\n').encode('utf-8'))
+        sock.flush()
@@ -0,0 +1,190 @@
+"""Sound engine for short effects: files are decoded once and played by
+fixed pool of audio outputs (QMediaPlayer pool if decoding not supported)."""
+from PyQt5.QtCore import QObject, QBuffer, QByteArray, QIODevice, QFile
+from core.utils import print_stack_trace, STDOUT
+from core.resources import get_url, get_path
+from core.imports import lazy
+
+QtMultimedia = lazy('PyQt5.QtMultimedia')
+
+VOICES = 4
+"""count of voices in pool (simultaneous sounds)"""
+
+
+class Sound:
+    """decoded sound"""
+    def __init__(self, data, audio_format):
+        """
+
+        :param data: QByteArray, PCM data
+        :param audio_format: QAudioFormat
+        """
+        self.data = data
+        self.format = audio_format
+
+    def get_format_key(self) -> tuple:
+        f = self.format
+        return (f.sampleRate(), f.channelCount(), f.sampleSize(),
+                f.codec(), int(f.byteOrder()), int(f.sampleType()))
+
+
+class _Voice:
+    """audio output with buffer"""
+    def __init__(self, audio_format, parent):
+        self.output = QtMultimedia.QAudioOutput(audio_format, parent)
+        self.buffer = QBuffer(parent)
+
+    def is_idle(self) -> bool:
+        return self.output.state() != QtMultimedia.QAudio.ActiveState
+
+    def play(self, sound, volume):
+        self.output.stop()
+        self.buffer.close()
+        self.buffer.setData(sound.data)  # implicitly shared, no copy
+        self.buffer.open(QIODevice.ReadOnly)
+        self.output.setVolume(volume / 100)
+        self.output.start(self.buffer)
+
+    def stop(self):
+        self.output.stop()
+        self.buffer.close()
+
+
+class _PlayerVoice:
+    """QMediaPlayer voice (fallback), media changed only for other file"""
+    def __init__(self, parent):
+        self.player = QtMultimedia.QMediaPlayer(parent)
+        self.path = None
+
+    def is_idle(self) -> bool:
+        return self.player.state() != \
+            QtMultimedia.QMediaPlayer.PlayingState
+
+    def play(self, path, volume):
+        if self.path != path:
+            self.player.setMedia(QtMultimedia.QMediaContent(get_url(path)))
+            self.path = path
+        else:
+            self.player.stop()
+        self.player.setVolume(volume)
+        self.player.play()
+
+    def stop(self):
+        self.player.stop()
+
+
+class SoundEngine(QObject):
+    """Decoded sounds cache and voices pool."""
+    def __init__(self, voices=VOICES, parent=None):
+        """
+
+        :param voices: int, count of voices in every pool
+        :param parent: QObject
+        """
+        super().__init__(parent)
+        self.voices = voices
+        """count of voices in pool"""
+        self.sounds = {}
+        """decoded sounds, keys - paths, values - Sound"""
+        self._fallback = set()
+        self._decoders = {}
+        self._pools = {}
+        self._next = {}
+
+    def load(self, path):
+        """Decode file (asynchronously, fallback player used until decoded).
+
+        :param path: str, path to sound file
+        """
+        if path in self.sounds or path in self._decoders or \
+                path in self._fallback:
+            return
+        chunks = []
+        decoder = QtMultimedia.QAudioDecoder(self)
+        self._decoders[path] = decoder
+
+        def ready():
+            buffer = decoder.read()
+            chunks.append(buffer.constData().asstring(buffer.byteCount()))
+            if not audio_format:
+                audio_format.append(buffer.format())
+
+        def finished():
+            self._decoders.pop(path, None)
+            decoder.deleteLater()
+            if chunks and audio_format:
+                self.sounds[path] = Sound(QByteArray(b''.join(chunks)),
+                                          audio_format[0])
+            else:
+                self._fallback.add(path)
+
+        def error(code):
+            STDOUT.debug('decode failed (' + decoder.errorString() + '), '
+                         'use player: ' + path)
+            self._decoders.pop(path, None)
+            decoder.deleteLater()
+            self._fallback.add(path)
+
+        audio_format = []
+        decoder.bufferReady.connect(ready)
+        decoder.finished.connect(finished)
+        decoder.error.connect(error)
+        if get_path(path).startswith(':'):  # compiled resources
+            source = QFile(get_path(path), decoder)
+            source.open(QIODevice.ReadOnly)
+            decoder.setSourceDevice(source)
+        else:
+            decoder.setSourceFilename(path)
+        decoder.start()
+
+    def _get_voice(self, key, create):
+        pool = self._pools.setdefault(key, [])
+        for voice in pool:
+            if voice.is_idle():
+                return voice
+        if len(pool) < self.voices:
+            voice = create()
+            pool.append(voice)
+            return voice
+        index = self._next.get(key, 0)  # steal oldest
+        self._next[key] = (index + 1) % len(pool)
+        return pool[index]
+
+    def play(self, path, volume=100):
+        """Play sound (loaded if not loaded).
+
+        :param path: str, path to sound file
+        :param volume: int, 0 - 100
+        """
+        try:
+            sound = self.sounds.get(path)
+            if sound:
+                self._get_voice(sound.get_format_key(),
+                                lambda: _Voice(sound.format, self)
+                                ).play(sound, volume)
+                return
+            self.load(path)
+            self._get_voice(None, lambda: _PlayerVoice(self)).play(path,
+                                                                   volume)
+        except:
+            print_stack_trace()()
+
+    def stop(self):
+        """Stop all voices."""
+        for pool in self._pools.values():
+            for voice in pool:
+                voice.stop()
+
+
+_engine = None
+
+
+def get_engine() -> SoundEngine:
+    """Get shared SoundEngine (created on first call).
+
+    :return: SoundEngine
+    """
+    global _engine
+    if _engine is None:
+        _engine = SoundEngine()
+    return _engine
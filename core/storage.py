@@ -0,0 +1,233 @@
+"""Widgets config storages. Config is RawConfigParser in memory, storage
+writes only changed sections: ini - one file (all sections rewritten),
+dir - file per section, sqlite - database with per-key upserts."""
+import io
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from urllib.parse import quote, unquote
+from configparser import RawConfigParser
+from core.paths import CONF_STORAGE, CONF_WIDGETS, CONF_WIDGETS_DIR
+from core.paths import CONF_WIDGETS_DB
+from core.utils import write_atomic, STDOUT
+
+
+class Storage(ABC):
+    """Base storage. Remember written sections and skip unchanged."""
+    def __init__(self, path):
+        """
+
+        :param path: str, path to file or dir
+        """
+        self.path = path
+        """path to storage"""
+        self._saved = {}
+
+    def exists(self) -> bool:
+        """Check storage exists.
+
+        :return: bool, True if exists
+        """
+        return os.path.isfile(self.path)
+
+    def read(self, parser):
+        """Read all sections to parser.
+
+        :param parser: RawConfigParser
+        """
+        if not self.exists():
+            return
+        data = self._read()
+        parser.read_dict(data)
+        self._saved = {name: dict(parser[name]) for name in data}
+
+    def write(self, parser, names=None) -> list:
+        """Write changed sections.
+
+        :param parser: RawConfigParser
+        :param names: iterable, changed sections names (None - check all)
+        :return: list, written (and removed) sections names
+        """
+        if names is None:
+            names = set(parser.sections()) | set(self._saved)
+        changed = {}
+        removed = []
+        for name in names:
+            if parser.has_section(name):
+                items = dict(parser[name])
+                if self._saved.get(name) != items:
+                    changed[name] = items
+            elif name in self._saved:
+                removed.append(name)
+        if not changed and not removed:
+            return []
+        self._write(parser, changed, removed)
+        self._saved.update(changed)
+        for name in removed:
+            del self._saved[name]
+        return list(changed) + removed
+
+    def close(self):
+        """Close storage."""
+        pass
+
+    @abstractmethod
+    def _read(self) -> dict:
+        """Read all sections (storage exists).
+
+        :return: dict, keys - sections names, values - dicts of items
+        """
+
+    @abstractmethod
+    def _write(self, parser, changed, removed):
+        """Write sections.
+
+        :param parser: RawConfigParser
+        :param changed: dict, changed sections, keys - names, values - dicts
+        of items
+        :param removed: list, removed sections names
+        """
+
+
+class IniStorage(Storage):
+    """One ini file, every write rewrite all sections."""
+    def _read(self) -> dict:
+        parser = RawConfigParser()
+        parser.read(self.path, 'UTF-8')
+        return {name: dict(parser[name]) for name in parser.sections()}
+
+    def _write(self, parser, changed, removed):
+        buf = io.StringIO()
+        parser.write(buf)
+        write_atomic(self.path, buf.getvalue(), 'UTF-8')
+
+
+class DirStorage(Storage):
+    """Directory with ini file for every section."""
+    def exists(self) -> bool:
+        return os.path.isdir(self.path)
+
+    def get_file(self, name) -> str:
+        """Get path to section file.
+
+        :param name: str, section name
+        :return: str, path
+        """
+        return os.path.join(self.path, quote(name, ' ') + '.conf')
+
+    def _read(self) -> dict:
+        result = {}
+        for file in sorted(os.listdir(self.path)):
+            if not file.endswith('.conf'):
+                continue
+            parser = RawConfigParser()
+            parser.read(os.path.join(self.path, file), 'UTF-8')
+            name = unquote(file[:-5])
+            if parser.has_section(name):
+                result[name] = dict(parser[name])
+        return result
+
+    def _write(self, parser, changed, removed):
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path)
+        for name, items in changed.items():
+            section = RawConfigParser()
+            section[name] = items
+            buf = io.StringIO()
+            section.write(buf)
+            write_atomic(self.get_file(name), buf.getvalue(), 'UTF-8')
+        for name in removed:
+            if os.path.isfile(self.get_file(name)):
+                os.remove(self.get_file(name))
+
+
+class SqliteStorage(Storage):
+    """SQLite database (WAL mode), only changed keys are written."""
+    def __init__(self, path):
+        Storage.__init__(self, path)
+        self._db = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db:
+            return self._db
+        self._db = sqlite3.connect(self.path)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS sections '
+                         '(name TEXT PRIMARY KEY)')
+        self._db.execute('CREATE TABLE IF NOT EXISTS items (section TEXT, '
+                         'key TEXT, value TEXT, PRIMARY KEY (section, key))')
+        return self._db
+
+    def _read(self) -> dict:
+        db = self._connect()
+        result = {}
+        for (name,) in db.execute('SELECT name FROM sections ORDER BY rowid'):
+            result[name] = {}
+        for name, key, value in db.execute(
+                'SELECT section, key, value FROM items ORDER BY rowid'):
+            result.setdefault(name, {})[key] = value
+        return result
+
+    def _write(self, parser, changed, removed):
+        db = self._connect()
+        with db:  # transaction
+            for name, items in changed.items():
+                old = self._saved.get(name, {})
+                db.execute('INSERT OR IGNORE INTO sections VALUES (?)',
+                           (name,))
+                db.executemany(
+                    'INSERT INTO items VALUES (?, ?, ?) ON CONFLICT '
+                    '(section, key) DO UPDATE SET value = excluded.value',
+                    [(name, k, v) for k, v in items.items()
+                     if old.get(k) != v])
+                db.executemany(
+                    'DELETE FROM items WHERE section = ? AND key = ?',
+                    [(name, k) for k in old if k not in items])
+            for name in removed:
+                db.execute('DELETE FROM items WHERE section = ?', (name,))
+                db.execute('DELETE FROM sections WHERE name = ?', (name,))
+
+    def close(self):
+        if self._db:
+            self._db.close()
+            self._db = None
+
+
+STORAGES = {
+    'ini': lambda: IniStorage(CONF_WIDGETS),
+    'dir': lambda: DirStorage(CONF_WIDGETS_DIR),
+    'sqlite': lambda: SqliteStorage(CONF_WIDGETS_DB)
+}
+"""storages, keys - names (storage in paths.conf), values - functions"""
+
+
+def migrate(source, target):
+    """Copy all sections.
+
+    :param source: Storage
+    :param target: Storage
+    """
+    parser = RawConfigParser()
+    source.read(parser)
+    target.write(parser)
+
+
+def get_storage(name=CONF_STORAGE) -> Storage:
+    """Get widgets config storage. If storage not exists and widgets.conf
+    exists - migrate (widgets.conf renamed to widgets.conf.migrated).
+
+    :param name: str, storage name (key from STORAGES)
+    :return: Storage
+    """
+    if name not in STORAGES:
+        STDOUT.warning('unknown config storage: ' + name + ', use ini')
+        name = 'ini'
+    storage = STORAGES[name]()
+    if name != 'ini' and not storage.exists() and \
+            os.path.isfile(CONF_WIDGETS):
+        migrate(IniStorage(CONF_WIDGETS), storage)
+        os.replace(CONF_WIDGETS, CONF_WIDGETS + '.migrated')
+        STDOUT.info('widgets config migrated to ' + name + ': ' +
+                    storage.path)
+    return storage
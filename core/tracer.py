@@ -0,0 +1,183 @@
+"""Startup timeline tracer. Records spans and writes Chrome trace-event JSON
+(open in chrome://tracing or Perfetto) and plain-text summary. Enabled by
+--profile-startup argument, when disabled spans are shared no-op object."""
+import os
+import json
+import time
+import threading
+from core.paths import PROFILE_STARTUP
+from core.utils import try_except, STDOUT
+
+ENABLED = bool(PROFILE_STARTUP)
+"""True if --profile-startup given"""
+START = time.perf_counter_ns()
+"""timeline start (tracer import), ns"""
+TOP = 10
+"""count of slowest items in summary"""
+now = time.perf_counter_ns
+"""get current timestamp, ns"""
+events = []
+"""recorded spans: (name, category, start ns, end ns, thread id, args)"""
+marks = {}
+"""recorded moments (first paint etc), keys - names, values - timestamps"""
+
+
+class _NullSpan:
+    """span for disabled tracer"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NULL = _NullSpan()
+
+
+class _Span:
+    """context manager, record span on exit"""
+    __slots__ = ('name', 'cat', 'args', 'start')
+
+    def __init__(self, name, cat, args):
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.start = 0
+
+    def __enter__(self):
+        self.start = now()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        events.append((self.name, self.cat, self.start, now(),
+                       threading.get_ident(), self.args))
+        return False
+
+
+def span(name, cat='phase', **args):
+    """Measure block. Example: with tracer.span('load', 'widget', widget=n):
+
+    :param name: str, span name
+    :param cat: str, category ('phase' - startup phase, 'widget' - widget
+    loading, 'step' - part of widget loading)
+    :param args: additional data (shown in trace viewer)
+    :return: context manager
+    """
+    if not ENABLED:
+        return _NULL
+    return _Span(name, cat, args)
+
+
+def record(name, start, cat='phase', **args):
+    """Record span from start to current time.
+
+    :param name: str, span name
+    :param start: int, start timestamp (from now())
+    :param cat: str, category
+    :param args: additional data
+    """
+    if ENABLED:
+        events.append((name, cat, start, now(), threading.get_ident(), args))
+
+
+def mark(name):
+    """Record moment (only first call for name).
+
+    :param name: str, mark name
+    """
+    if ENABLED and name not in marks:
+        marks[name] = now()
+
+
+def traced(name=None, cat='phase'):
+    """Decorator for measure function calls (function returned as is if
+    tracer disabled).
+
+    :param name: str, span name (function name by default)
+    :param cat: str, category
+    :return: decorator
+    """
+    def decorator(func):
+        if not ENABLED:
+            return func
+        span_name = name if name else func.__name__
+
+        def wrapper(*args, **kwargs):
+            with _Span(span_name, cat, {}):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def get_trace() -> dict:
+    """Get Chrome trace-event format data.
+
+    :return: dict, JSON object
+    """
+    pid = os.getpid()
+    trace = []
+    for name, cat, start, end, tid, args in events:
+        trace.append({'name': name, 'cat': cat, 'ph': 'X', 'pid': pid,
+                      'tid': tid, 'ts': (start - START) / 1000,
+                      'dur': (end - start) / 1000, 'args': args})
+    for name, time_ in marks.items():
+        trace.append({'name': name, 'cat': 'mark', 'ph': 'i', 's': 'g',
+                      'pid': pid, 'tid': 0, 'ts': (time_ - START) / 1000})
+    trace.sort(key=lambda e: e['ts'])
+    return {'traceEvents': trace, 'displayTimeUnit': 'ms'}
+
+
+def get_summary(end=None) -> str:
+    """Get plain-text summary: slowest phases and widgets.
+
+    :param end: int, timeline end timestamp (current time by default)
+    :return: str, summary text
+    """
+    def ms(ns):
+        return '%10.2f ms' % (ns / 1000000)
+
+    total = (end if end else now()) - START
+    phases = []
+    widgets = {}
+    for name, cat, start, stop, tid, args in events:
+        if cat == 'phase':
+            phases.append((stop - start, name))
+        elif cat in ('widget', 'step') and 'widget' in args:
+            data = widgets.setdefault(args['widget'], {'total': 0})
+            key = 'total' if cat == 'widget' else name
+            data[key] = data.get(key, 0) + stop - start
+    lines = ['startup: ' + ms(total)]
+    for name, time_ in sorted(marks.items(), key=lambda i: i[1]):
+        lines.append(name + ': ' + ms(time_ - START))
+    lines += ['', 'slowest phases:']
+    for dur, name in sorted(phases, reverse=True)[:TOP]:
+        lines.append(ms(dur) + '  ' + name)
+    lines += ['', 'slowest widgets:']
+    top = sorted(widgets.items(), key=lambda i: i[1]['total'], reverse=True)
+    for widget, data in top[:TOP]:
+        steps = ', '.join(key + ' ' + '%.2f' % (data[key] / 1000000)
+                          for key in data if key != 'total')
+        lines.append(ms(data['total']) + '  ' + widget +
+                     (' (' + steps + ')' if steps else ''))
+    return '\n'.join(lines) + '\n'
+
+
+@try_except()
+def dump(path=PROFILE_STARTUP):
+    """Write trace JSON to path and summary to path with .txt extension.
+
+    :param path: str, path to trace file
+    """
+    if not ENABLED or not path:
+        return
+    end = now()
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(json.dumps(get_trace()))
+    with open(os.path.splitext(path)[0] + '.txt', 'w',
+              encoding='utf-8') as file:
+        file.write(get_summary(end))
+    STDOUT.info('startup profile saved: ' + path)
@@ -1,6 +1,8 @@
 """All utils for using in widgets and core."""
+import os
+import stat
 import logging
-import traceback
+import tempfile
 from enum import IntEnum
 
 
@@ -10,6 +12,9 @@ STDERR = logging.getLogger('stderr')
 """stderr logger"""
 CONS = logging.getLogger()
 """main logger (console output and writing to stdout)"""
+UMASK = os.umask(0)
+"""process umask (mode of new files written by write_atomic)"""
+os.umask(UMASK)
 
 
 class LogLevel(IntEnum):
@@ -80,16 +85,19 @@ def try_except(except_func=None, ex_args=(), ex_kwargs=(),
                 return func(*args, **kwargs)
             except:
                 lvl = int(level)
-                STDOUT.log(lvl, traceback.format_exc())
+                # traceback formatted by handler (in logging thread)
+                STDOUT.log(lvl, 'Exception in %s', func.__qualname__,
+                           exc_info=True)
                 if except_func:
                     try:
                         return except_func(*ex_args, **ex_kwargs)
                     except:
-                        STDOUT.log(lvl, traceback.format_exc())
-                        STDOUT.log(lvl, 'Except args: ' + str(ex_args))
-                        STDOUT.log(lvl, 'Except kwargs: ' + str(ex_kwargs))
-                STDOUT.log(lvl, 'Args: ' + str(args))
-                STDOUT.log(lvl, 'Kwargs: ' + str(kwargs))
+                        STDOUT.log(lvl, 'Exception in except_func',
+                                   exc_info=True)
+                        STDOUT.log(lvl, 'Except args: %s', ex_args)
+                        STDOUT.log(lvl, 'Except kwargs: %s', ex_kwargs)
+                STDOUT.log(lvl, 'Args: %s', args)
+                STDOUT.log(lvl, 'Kwargs: %s', kwargs)
 
         return wrapper
 
@@ -102,4 +110,62 @@ def print_stack_trace(level=LogLevel.ERROR):
     :param level: LogLevel, logging level
     :return: lambda function (for create correct trace)
     """
-    return lambda: STDOUT.log(int(level), traceback.format_exc())
+    return lambda: STDOUT.log(int(level), 'Exception', exc_info=True)
+
+
+def strtobool(value) -> int:
+    """Convert string to bool (like distutils.util.strtobool, distutils import
+    is slow).
+
+    :param value: str, y, yes, t, true, on, 1 or n, no, f, false, off, 0
+    :return: int, 1 or 0
+    """
+    value = value.lower()
+    if value in ('y', 'yes', 't', 'true', 'on', '1'):
+        return 1
+    elif value in ('n', 'no', 'f', 'false', 'off', '0'):
+        return 0
+    raise ValueError('invalid truth value ' + repr(value))
+
+
+def write_atomic(path, data, encoding='utf-8'):
+    """Write file through a temporary file and rename. Readers and a crash
+    mid-write always see the old or the new content, never a truncated file.
+    Mode of existing file is kept, new file gets default mode (umask).
+
+    :param path: str, path to file
+    :param data: str or bytes, file content
+    :param encoding: str, encoding for str data
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.',
+                               suffix='.tmp', dir=folder)
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(data.encode(encoding) if isinstance(data, str)
+                       else data)
+            file.flush()
+            os.fsync(file.fileno())
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~UMASK
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except:
+        if os.path.isfile(tmp):
+            os.remove(tmp)
+        raise
+
+
+def get_signature(path) -> list:
+    """Get file signature for cache validation.
+
+    :param path: str, path to file
+    :return: list, [mtime_ns, size] or None if file not found
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
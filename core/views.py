@@ -0,0 +1,136 @@
+"""Retained views for widgets: elements are created once and updated in
+place (text and values are set only when changed)."""
+from PyQt5.QtWidgets import QLabel, QProgressBar
+from PyQt5.QtGui import QPalette, QFont
+from PyQt5.QtCore import Qt
+
+
+class RetainedView:
+    """Keyed elements in layout. Every update is a pass: begin(), elements
+    in display order (label, bar), end(). Elements are rebuilt only if keys
+    order changed, elements with keys missing in pass are deleted."""
+    def __init__(self, parent, layout=None):
+        """
+
+        :param parent: QWidget, parent for elements
+        :param layout: QBoxLayout, layout for elements (parent layout by
+        default)
+        """
+        self.parent = parent
+        """parent QWidget"""
+        self.layout = layout if layout else parent.layout()
+        """layout for elements"""
+        self.elements = {}
+        """elements dict, keys - element keys, values - QWidget"""
+        self.created = 0
+        """count of created elements (for statistics)"""
+        self._keys = []
+        self._index = 0
+        self._changed = False
+        self._palette = None
+        self._font = None
+
+    def set_style(self, palette, font):
+        """Set palette and font for labels (applied to existing labels if
+        changed).
+
+        :param palette: QPalette
+        :param font: QFont
+        """
+        if self._palette is not None and self._palette == palette and \
+                self._font == font:
+            return
+        self._palette = QPalette(palette)
+        self._font = QFont(font)
+        for element in self.elements.values():
+            if isinstance(element, QLabel):
+                self._apply_style(element)
+
+    def _apply_style(self, label):
+        if self._palette is not None:
+            label.setPalette(self._palette)
+            label.setFont(self._font)
+
+    def begin(self):
+        """Start update pass."""
+        self._index = 0
+        self._changed = False
+
+    def _get(self, key, cls):
+        index = self._index
+        self._index += 1
+        if not self._changed and index < len(self._keys) and \
+                self._keys[index] == key:
+            return self.elements[key], False
+        if not self._changed:  # structure changed, detach elements after
+            self._changed = True
+            for k in self._keys[index:]:
+                self.layout.removeWidget(self.elements[k])
+            del self._keys[index:]
+        element = self.elements.get(key)
+        created = False
+        if not isinstance(element, cls):
+            if element is not None:
+                element.deleteLater()
+            element = cls(self.parent)
+            self.elements[key] = element
+            self.created += 1
+            created = True
+        self.layout.addWidget(element)
+        self._keys.append(key)
+        return element, created
+
+    def label(self, key, text):
+        """Set text for label (create if not exists).
+
+        :param key: hashable, element key
+        :param text: str, label text
+        :return: QLabel
+        """
+        label, created = self._get(key, QLabel)
+        if created:
+            label.setAlignment(Qt.AlignCenter)
+            self._apply_style(label)
+        if label.text() != text:
+            label.setText(text)
+        return label
+
+    def bar(self, key, value, minimum=0, maximum=100):
+        """Set value for progress bar (create if not exists).
+
+        :param key: hashable, element key
+        :param value: int, value
+        :param minimum: int, minimum value
+        :param maximum: int, maximum value
+        :return: QProgressBar
+        """
+        bar = self._get(key, QProgressBar)[0]
+        if bar.minimum() != minimum or bar.maximum() != maximum:
+            bar.setRange(minimum, maximum)
+        if bar.value() != value:
+            bar.setValue(value)
+        return bar
+
+    def end(self):
+        """End update pass, delete unused elements."""
+        if self._index < len(self._keys):  # elements removed from end
+            self._changed = True
+            for k in self._keys[self._index:]:
+                self.layout.removeWidget(self.elements[k])
+            del self._keys[self._index:]
+        if not self._changed:
+            return
+        if len(self.elements) > len(self._keys):
+            keys = set(self._keys)
+            for k in [k for k in self.elements if k not in keys]:
+                self.elements.pop(k).deleteLater()
+        self.layout.update()
+
+    def clear(self):
+        """Delete all elements."""
+        for element in self.elements.values():
+            self.layout.removeWidget(element)
+            element.deleteLater()
+        self.elements.clear()
+        self._keys.clear()
+        self.layout.update()
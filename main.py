@@ -1,77 +1,81 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import os
 import sys
-import inspect
 import logging
-from PyQt5.QtWidgets import QApplication
-import core.gui.gui as gui
-from core.paths import STDERR_LOG, STDOUT_LOG
+from core import tracer
+from core.paths import STDERR_LOG, STDOUT_LOG, IMPORT_REPORT, COMMANDS
 from core.utils import try_except, print_stack_trace
-from core import lock, properties
-
-
-class StreamProxy:
-    """for replace stdout and stderr streams"""
-    def __init__(self, logger):
-        self.logger = logger
-
-    def write(self, buf):
-        (file, number, func, lines, index) =\
-            inspect.getframeinfo(inspect.currentframe().f_back)
-        for line in buf.rstrip().splitlines():
-            self.logger.info(os.path.basename(file) + ':' + str(number) +
-                             ' -> ' + line.rstrip())
-
-    def flush(self):
-        pass
-
-    def close(self):
-        pass
-
-
-def get_file_handler(path, log_format):
-    handler = logging.FileHandler(path, encoding='utf-8')
-    handler.setLevel(logging.NOTSET)
-    handler.setFormatter(logging.Formatter(log_format))
-    return handler
+from core import lock, properties, logs, imports, ipc
 
 
 @try_except()
+@tracer.traced('setup loggers')
 def __setup_loggers(prop):
     level = int(prop['LOGS']['log_level'])
-    out_format = prop['LOGS']['stdout']
-    err_format = prop['LOGS']['stderr']
-    logging.basicConfig(format=prop['LOGS']['CONS'], level=level)
+    max_bytes = int(prop['LOGS'].get('max_bytes', logs.MAX_BYTES))
+    backup_count = int(prop['LOGS'].get('backup_count', logs.BACKUP_COUNT))
+    cons = logging.StreamHandler()
+    cons.setFormatter(logging.Formatter(prop['LOGS']['CONS']))
+    logs.setup(level, (
+        cons,
+        logs.get_file_handler(STDOUT_LOG, prop['LOGS']['stdout'], 'stdout',
+                              max_bytes, backup_count),
+        logs.get_file_handler(STDERR_LOG, prop['LOGS']['stderr'], 'stderr',
+                              max_bytes, backup_count)
+    ), int(prop['LOGS'].get('queue_size', logs.QUEUE_SIZE)))
 
     stdout = logging.getLogger('stdout')
     stdout.setLevel(level)
-    stdout.addHandler(get_file_handler(STDOUT_LOG, out_format))
 
     stderr = logging.getLogger('stderr')
     stderr.setLevel(level)
-    stderr.addHandler(get_file_handler(STDERR_LOG, err_format))
 
-    sys.stdout = StreamProxy(stdout)
-    sys.stderr = StreamProxy(stderr)
+    sys.stdout = logs.StreamProxy(stdout)
+    sys.stderr = logs.StreamProxy(stderr)
+
+
+def __send_commands() -> bool:
+    """Send commands (or show) to running instance.
+
+    :return: bool, True if instance running
+    """
+    for command in COMMANDS or ['show']:
+        answer = ipc.send(command)
+        if answer is None:  # not running
+            if COMMANDS and COMMANDS != ['show']:
+                sys.exit('DeWidgets is not running')
+            return False
+        if answer != ipc.OK:
+            sys.exit(command + ': ' + answer)
+    return True
 
 
 @try_except()
 def __start():
+    tracer.record('imports', tracer.START)
+    if IMPORT_REPORT:
+        imports.print_report()
+        return
+    with tracer.span('import gui'):
+        from PyQt5.QtWidgets import QApplication
+        import core.gui.gui as gui
     is_new = False
     if not properties.is_exists():
         is_new = True
         properties.create_default_settings()
-    prop = properties.read_settings()
+    with tracer.span('read settings'):
+        prop = properties.read_settings()
     __setup_loggers(prop)
     if is_new:
         logging.getLogger('stdout').critical('written default settings config')
     try:
         # start
         logging.getLogger('stdout').info('start')
-        app = QApplication(sys.argv)
+        with tracer.span('QApplication'):
+            app = QApplication(sys.argv)
         app.setQuitOnLastWindowClosed(False)
-        gui.__init__(app, prop)
+        with tracer.span('gui init'):
+            gui.__init__(app, prop)
         # exit
         status = app.exec()  # waiting
         sys.exit(status)
@@ -80,17 +84,27 @@ def __start():
     except:
         print_stack_trace()()
     finally:  # correct exit
+        try:  # finish installation (not interrupted in the middle)
+            gui.add_new.stop()
+        except:
+            print_stack_trace()()
         try:  # unload widgets and save config
             if gui.manager:
                 gui.manager.unload_all()
-                gui.manager.config.save()
+                gui.manager.config.save()  # settings changed in unload
+                gui.manager.config.flush()
+                gui.manager.config.storage.close()
         except:
             print_stack_trace()()
-        try:  # remove lock file
+        try:  # remove lock file and socket
             lock.remove_lock()
+            if gui.server:
+                gui.server.close()
         except:
             print_stack_trace()()
+        logs.stop()  # write queued records
 
 
 if __name__ == '__main__':
-    __start()
+    if IMPORT_REPORT or not __send_commands():  # not running
+        __start()
@@ -1,14 +1,15 @@
 import os
-from distutils.util import strtobool
-import psutil
-from PyQt5.QtWidgets import QWidget, QLabel, QProgressBar, QPushButton
+from PyQt5.QtWidgets import QWidget, QLabel, QPushButton
 from PyQt5.QtWidgets import QCheckBox, QSpinBox, QColorDialog
 from PyQt5.QtWidgets import QHBoxLayout, QVBoxLayout, QGridLayout
-from PyQt5.QtGui import QIcon, QColor, QPalette, QFont
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QColor, QPalette, QFont
+from PyQt5.QtCore import Qt
 from core.api import Widget, WidgetInfo
 from core.paths import RES, SETTINGS
-from core.utils import try_except
+from core.resources import get_icon, get_style
+from core.utils import try_except, strtobool
+from core.metrics import get_hub
+from core.views import RetainedView
 
 
 class Info(WidgetInfo):
@@ -21,7 +22,8 @@ class Info(WidgetInfo):
         self.AUTHOR = 'InterVi'
         self.EMAIL = 'intervionly@gmail.com'
         self.URL = 'https://github.com/InterVi/DeWidgets'
-        self.ICON = QIcon(os.path.join(RES, 'cpu', 'icon.png'))
+        self.ICON_PATH = os.path.join(RES, 'cpu', 'icon.png')
+        self.ICON = get_icon(self.ICON_PATH)
 
 
 class Main(Widget, QWidget):
@@ -36,16 +38,10 @@ class Main(Widget, QWidget):
         self.setLayout(QVBoxLayout(self))
         self.layout().setContentsMargins(0, 0, 0, 0)
         # setup stylesheet
-        with open(os.path.join(RES, 'cpu', 'style.css'), encoding='utf-8'
-                  ) as file:
-            style = file.read()
-            self.setStyleSheet(style)
+        self.setStyleSheet(get_style(os.path.join(RES, 'cpu', 'style.css')))
         self.setAttribute(Qt.WA_TranslucentBackground)
-        # setup timer
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.setup_ui)
         # setup vars
-        self._widgets = []
+        self._view = RetainedView(self)
         self._setup_vars()
 
     def _setup_vars(self):
@@ -60,64 +56,51 @@ class Main(Widget, QWidget):
         self._palette.setColor(QPalette.WindowText, QColor('#000000'))
         self._font = QFont()
 
+    def _get_fields(self) -> list:
+        fields = []
+        if self._percent:
+            fields.append('cpu_percpu' if self._percpu else 'cpu_percent')
+        if self._freq:
+            fields.append('cpu_freq_percpu' if self._percpu else 'cpu_freq')
+        return fields
+
+    def _subscribe(self):
+        get_hub().subscribe(self.setup_ui, self._get_fields(), self._update)
+
     @try_except()
-    def setup_ui(self):
-        if self._widgets:  # clear
-            for w in self._widgets:
-                self.layout().removeWidget(w)
-                w.deleteLater()
-            self._widgets.clear()
-        # setup elements
-        for i in range(psutil.cpu_count() if self._percpu else 1):
-            if self._percent:  # percents
-                pc = psutil.cpu_percent(percpu=self._percpu)
+    def setup_ui(self, snapshot):
+        self._view.set_style(self._palette, self._font)
+        self._view.begin()
+        pc = snapshot.get('cpu_percpu' if self._percpu else 'cpu_percent')
+        pf = snapshot.get('cpu_freq_percpu' if self._percpu else 'cpu_freq')
+        count = 1
+        if self._percpu:
+            count = max(len(pc) if pc else 0, len(pf) if pf else 0)
+        for i in range(count):
+            if self._percent and pc is not None and \
+                    (not self._percpu or i < len(pc)):  # percents
                 if self._labels:  # titles
                     text = self.lang['proc']
                     if self._percpu:
                         text = self.lang['core'].format(str(i))
-                    label = QLabel(text, self)
-                    label.setAlignment(Qt.AlignCenter)
-                    self._widgets.append(label)
-                    self.layout().addWidget(label)
-                bar = QProgressBar(self)
-                bar.setMinimum(0)
-                bar.setMaximum(100)
-                bar.setValue(int(pc[i]) if self._percpu else int(pc))
-                self._widgets.append(bar)
-                self.layout().addWidget(bar)
-            if self._freq and 'cpu_freq' in psutil.__dict__:  # freqs
-                pf = psutil.cpu_freq(self._percpu)
+                    self._view.label(('proc', i), text)
+                self._view.bar(('pc', i),
+                               int(pc[i]) if self._percpu else int(pc))
+            if self._freq and pf and \
+                    (not self._percpu or i < len(pf)):  # freqs
+                freq = pf[i] if self._percpu else pf
                 if self._labels:  # titles
                     text = self.lang['freq']
                     if self._percpu:
                         text = self.lang['core_freq'].format(str(i))
-                    label = QLabel(text, self)
-                    label.setAlignment(Qt.AlignCenter)
-                    label.setPalette(self._palette)
-                    label.setFont(self._font)
-                    self._widgets.append(label)
-                    self.layout().addWidget(label)
-                bar = QProgressBar(self)
-                bar.setMinimum(int(pf[i].min) if self._percpu else
-                               int(pf.min))
-                bar.setMaximum(int(pf[i].max) if self._percpu else
-                               int(pf.max))
-                bar.setValue(int(pf[i].current) if self._percpu else
-                             int(pf.current))
-                self._widgets.append(bar)
-                self.layout().addWidget(bar)
+                    self._view.label(('freq', i), text)
+                self._view.bar(('pf', i), int(freq.current), int(freq.min),
+                               int(freq.max))
                 if self._text:  # text info
-                    text = str(round(pf[i].current, self._round)) if \
-                        self._percpu else \
-                        str(round(pf.current, self._round))
-                    label = QLabel(self.lang['freq_text'].format(text))
-                    label.setAlignment(Qt.AlignCenter)
-                    label.setPalette(self._palette)
-                    label.setFont(self._font)
-                    self._widgets.append(label)
-                    self.layout().addWidget(label)
-        # set layout
-        self.layout().update()
+                    text = str(round(freq.current, self._round))
+                    self._view.label(('freq_text', i),
+                                     self.lang['freq_text'].format(text))
+        self._view.end()
 
     def _load_settings(self):
         self.conf = self.widget_manager.get_config(self.info.NAME)
@@ -161,6 +144,7 @@ class Main(Widget, QWidget):
         self.settings_win = Settings(self)
 
     def unload(self):
+        get_hub().unsubscribe(self.setup_ui)
         self.save_settings()
 
     def place(self):
@@ -171,20 +155,19 @@ class Main(Widget, QWidget):
         self._load_settings()
 
     def remove(self):
-        self.timer.stop()
+        get_hub().unsubscribe(self.setup_ui)
 
     def purge(self):
-        self.timer.stop()
+        get_hub().unsubscribe(self.setup_ui)
         self._setup_vars()
 
     @try_except()
     def showEvent(self, event):
-        self.setup_ui()
-        self.timer.start(self._update)
+        self._subscribe()
 
     @try_except()
     def hideEvent(self, event):
-        self.timer.stop()
+        get_hub().unsubscribe(self.setup_ui)
 
 
 class Settings(QWidget):
@@ -194,7 +177,7 @@ class Settings(QWidget):
         self.main = main
         self.lang = main.lang
         # setup window
-        self.setWindowIcon(QIcon(SETTINGS))
+        self.setWindowIcon(get_icon(SETTINGS))
         self.setWindowTitle(self.lang['settings_title'])
         self.resize(240, 240)
         # setup vars
@@ -306,6 +289,6 @@ class Settings(QWidget):
         self.main._font.setPointSize(self.size_spinbox.value())
         self.main._font.setBold(self.bold_checkbox.isChecked())
         self.main.save_settings()
-        self.main.timer.stop()
-        self.main.timer.start(self.main._update)
+        if self.main.isVisible():
+            self.main._subscribe()
         self.close()
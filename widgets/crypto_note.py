@@ -4,20 +4,20 @@ import json
 import gzip
 import base64
 import hashlib
-from distutils.util import strtobool
-from Crypto.Cipher import AES
-from Crypto import Random
 from PyQt5.QtWidgets import QWidget, QLabel, QSpinBox, QTextEdit, QLineEdit
 from PyQt5.QtWidgets import QPushButton, QCheckBox, QMessageBox, QInputDialog
 from PyQt5.QtWidgets import QGridLayout, QHBoxLayout
-from PyQt5.QtGui import QIcon, QPixmap
 from PyQt5.QtCore import Qt, QTimer, QRect
 from core.api import Widget, WidgetInfo
 from core.paths import RES, SETTINGS, ERROR
-from core.utils import try_except, print_stack_trace
+from core.resources import get_icon, get_pixmap
+from core.utils import try_except, print_stack_trace, strtobool
+from core.imports import lazy
 
-ICON_PIXMAP = QPixmap(os.path.join(RES, 'cnote', 'icon.png'))
-OPEN_PIXMAP = QPixmap(os.path.join(RES, 'cnote', 'open.png'))
+AES = lazy('Crypto.Cipher.AES')
+Random = lazy('Crypto.Random')
+ICON_PATH = os.path.join(RES, 'cnote', 'icon.png')
+OPEN_PATH = os.path.join(RES, 'cnote', 'open.png')
 
 
 class AESCip:
@@ -101,7 +101,8 @@ class Info(WidgetInfo):
         self.AUTHOR = 'InterVi'
         self.EMAIL = 'intervionly@gmail.com'
         self.URL = 'https://github.com/InterVi/DeWidgets'
-        self.ICON = QIcon(os.path.join(RES, 'cnote', 'icon.png'))
+        self.ICON_PATH = os.path.join(RES, 'cnote', 'icon.png')
+        self.ICON = get_icon(self.ICON_PATH)
 
 
 class Main(Widget, QWidget):
@@ -116,7 +117,7 @@ class Main(Widget, QWidget):
         # setup image
         self.image = QLabel(self)
         self.image.setScaledContents(True)
-        self.image.setPixmap(ICON_PIXMAP)
+        self.image.setPixmap(get_pixmap(ICON_PATH))
         self.image.mousePressEvent = self._click
         self.image.show()
         # setup timer
@@ -146,7 +147,7 @@ class Main(Widget, QWidget):
                 self.note_win._exit()
             else:
                 self._stop_timer()
-                self.image.setPixmap(ICON_PIXMAP)
+                self.image.setPixmap(get_pixmap(ICON_PATH))
                 self.image.show()
 
     def _load_settings(self):
@@ -168,7 +169,7 @@ class Main(Widget, QWidget):
             pos = (self._pos.left(), self._pos.top(), self._pos.width(),
                    self._pos.height())
             self.conf['pos'] = json.dumps(pos)
-        self.widget_manager.config.save()
+        self.widget_manager.config.save(self.info.NAME)
 
     @try_except()
     def _click(self, event):
@@ -176,7 +177,7 @@ class Main(Widget, QWidget):
             self.note_win = Note(self, hexpass=self._hexpass)
         else:
             qid = QInputDialog(self)
-            qid.setWindowIcon(QIcon(OPEN_PIXMAP))
+            qid.setWindowIcon(get_icon(OPEN_PATH))
             qid.setWindowTitle(self.lang['pass_title'])
             qid.setOkButtonText(self.lang['ok_button'])
             qid.setCancelButtonText(self.lang['pass_cancel_button'])
@@ -209,7 +210,7 @@ class Main(Widget, QWidget):
         mbox = QMessageBox(QMessageBox.Critical,
                            self.lang['wrong_title'], t, QMessageBox.Ok,
                            self)
-        mbox.setWindowIcon(QIcon(ERROR))
+        mbox.setWindowIcon(get_icon(ERROR))
         ok = mbox.button(QMessageBox.Ok)
         ok.setText(self.lang['wrong_ok_button'])
         ok.setToolTip(self.lang['wrong_ok_button_tt'])
@@ -253,7 +254,7 @@ class Note(QWidget):
         self.lang = main.lang
         # setup window
         self.setWindowTitle(self.lang['note_title'])
-        self.setWindowIcon(QIcon(OPEN_PIXMAP))
+        self.setWindowIcon(get_icon(OPEN_PATH))
         self.setWindowFlags(Qt.WindowMinimizeButtonHint |
                             Qt.WindowFullscreenButtonHint)
         self.resize(500, 500)
@@ -299,7 +300,7 @@ class Note(QWidget):
                 note = gzip.decompress(base64.b64decode(self.main.conf['note'])
                                        )
                 self.text_edit.setPlainText(self.cip.decrypt(note))
-            self.main.image.setPixmap(OPEN_PIXMAP)
+            self.main.image.setPixmap(get_pixmap(OPEN_PATH))
             self.main.image.show()
             self.show()
         except:
@@ -313,12 +314,12 @@ class Note(QWidget):
         note = base64.b64encode(gzip.compress(self.cip.encrypt(
             self.text_edit.toPlainText()), 9)).decode('ASCII')
         self.main.conf['note'] = note
-        self.main.widget_manager.config.save()
+        self.main.widget_manager.config.save(self.main.info.NAME)
 
     @try_except()
     def _exit(self, checked):
         self.main._stop_timer()
-        self.main.image.setPixmap(ICON_PIXMAP)
+        self.main.image.setPixmap(get_pixmap(ICON_PATH))
         self.main.image.show()
         self._close()
 
@@ -328,7 +329,7 @@ class Note(QWidget):
             self._save_note()
         self.close()
         if not self.main._session:
-            self.main.image.setPixmap(ICON_PIXMAP)
+            self.main.image.setPixmap(get_pixmap(ICON_PATH))
             self.main.image.show()
         self.main.close_note()
 
@@ -356,7 +357,7 @@ class Settings(QWidget):
         self.lang = main.lang
         # setup window
         self.setWindowTitle(self.lang['settings_title'])
-        self.setWindowIcon(QIcon(SETTINGS))
+        self.setWindowIcon(get_icon(SETTINGS))
         self.resize(200, 220)
         # setup session label
         self.session_label = QLabel(self.lang['session_label'], self)
@@ -451,7 +452,7 @@ class Settings(QWidget):
                                    self.lang['disagree_title'],
                                    self.lang['disagree_text'],
                                    QMessageBox.Ok, self)
-                mbox.setWindowIcon(QIcon(ERROR))
+                mbox.setWindowIcon(get_icon(ERROR))
                 ok = mbox.button(QMessageBox.Ok)
                 ok.setText(self.lang['dis_ok_button'])
                 ok.setToolTip(self.lang['dis_ok_button_tt'])
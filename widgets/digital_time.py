@@ -1,18 +1,18 @@
 import os
 import json
 import base64
-from distutils.util import strtobool
 from datetime import datetime
 from PyQt5.QtWidgets import QWidget, QLabel, QListWidget, QListWidgetItem
 from PyQt5.QtWidgets import QCheckBox, QPushButton, QSpinBox, QLineEdit
 from PyQt5.QtWidgets import QColorDialog, QMessageBox
 from PyQt5.QtWidgets import QVBoxLayout, QHBoxLayout, QGridLayout
-from PyQt5.QtGui import QIcon, QColor, QPalette
+from PyQt5.QtGui import QColor, QPalette
 from PyQt5.QtCore import Qt, QTimer
 from core.api import Widget, WidgetInfo
 from core.gui.edit import Edit
 from core.paths import RES, SETTINGS, SUCCESS, DELETE
-from core.utils import try_except, print_stack_trace
+from core.resources import get_icon
+from core.utils import try_except, print_stack_trace, strtobool
 from core.gui.drag import mouse_enter
 
 
@@ -123,7 +123,8 @@ class Info(WidgetInfo):
         self.AUTHOR = 'InterVi'
         self.EMAIL = 'intervionly@gmail.com'
         self.URL = 'https://github.com/InterVi/DeWidgets'
-        self.ICON = QIcon(os.path.join(RES, 'dtime', 'icon.png'))
+        self.ICON_PATH = os.path.join(RES, 'dtime', 'icon.png')
+        self.ICON = get_icon(self.ICON_PATH)
 
 
 class Main(Widget, DTime):
@@ -285,7 +286,7 @@ class Settings(QWidget):
         self.lang = main.lang
         self.time_edit = None
         # setup window
-        self.setWindowIcon(QIcon(SETTINGS))
+        self.setWindowIcon(get_icon(SETTINGS))
         self.setWindowTitle(main.lang['settings_title'])
         self.resize(300, 400)
         # setup list
@@ -405,7 +406,7 @@ class Settings(QWidget):
                            self.lang['adding_title'],
                            self.lang['adding_text'],
                            QMessageBox.Ok, self)
-        mbox.setWindowIcon(QIcon(SUCCESS))
+        mbox.setWindowIcon(get_icon(SUCCESS))
         ok = mbox.button(QMessageBox.Ok)
         ok.setText(self.lang['adding_ok_button'])
         ok.setToolTip(self.lang['adding_ok_button_tt'])
@@ -420,7 +421,7 @@ class Settings(QWidget):
                            self.lang['delete_text'].format(
                                self.list.currentItem().text()),
                            QMessageBox.Yes | QMessageBox.No)
-        mbox.setWindowIcon(QIcon(DELETE))
+        mbox.setWindowIcon(get_icon(DELETE))
         yes = mbox.button(QMessageBox.Yes)
         yes.setText(self.lang['del_yes_button'])
         yes.setToolTip(self.lang['del_no_button'])
@@ -1,8 +1,8 @@
 import os
 from PyQt5.QtWidgets import QWidget
-from PyQt5.QtGui import QIcon
 from core.api import Widget, WidgetInfo
 from core.paths import RES
+from core.resources import get_icon
 
 not_loading = True
 
@@ -18,7 +18,8 @@ class Info(WidgetInfo):
         self.AUTHOR = 'InterVi'
         self.EMAIL = 'intervionly@gmail.com'
         self.URL = 'https://github.com/InterVi/DeWidgets'
-        self.ICON = QIcon(os.path.join(RES, 'example', 'icon.png'))
+        self.ICON_PATH = os.path.join(RES, 'example', 'icon.png')
+        self.ICON = get_icon(self.ICON_PATH)
 
 
 class Main(Widget, QWidget):
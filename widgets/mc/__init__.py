@@ -0,0 +1 @@
+"""Minecraft Servers Monitoring widget helpers."""
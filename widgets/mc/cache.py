@@ -0,0 +1,182 @@
+"""Servers status cache: last status of every server with fetch time and
+last error, saved to cache directory (JSON) and loaded on next start.
+Entries older than TTL (or with error) are stale - shown as is while
+refresh is running."""
+import os
+import json
+import time
+from core.paths import CACHE
+from core.utils import write_atomic, STDOUT
+from core.imports import lazy
+
+pinger = lazy('mcstatus.pinger')
+
+CACHE_FILE = os.path.join(CACHE, 'minecraft.json')
+"""path to cache file"""
+TTL = 60.0
+"""default time to live of entry, seconds"""
+VERSION = 1
+"""cache file format version"""
+
+
+class StatusCache:
+    """Status cache, keys - addresses (host:port)."""
+    def __init__(self, path=CACHE_FILE, ttl=TTL):
+        """
+
+        :param path: str, path to cache file
+        :param ttl: float, time to live of entry (seconds)
+        """
+        self.path = path
+        """path to cache file"""
+        self.ttl = ttl
+        """time to live of entry (seconds)"""
+        self.entries = {}
+        """keys - addresses, values - dicts: status (raw JSON of server or
+        None), latency (ms), time (fetch time), error (last error text)"""
+        self._responses = {}
+        """keys - addresses, values - PingResponse (from entries)"""
+        self._changed = False
+
+    def load(self) -> bool:
+        """Load cache file (broken file ignored).
+
+        :return: bool, True if loaded
+        """
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                data = json.load(file)
+            if data['version'] != VERSION:
+                return False
+            self.entries = data['entries']
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            STDOUT.debug('minecraft cache not loaded: ' + str(e))
+            return False
+        self._responses.clear()
+        self._changed = False
+        return True
+
+    def save(self) -> bool:
+        """Write cache file (if changed).
+
+        :return: bool, True if written
+        """
+        if not self._changed:
+            return False
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            write_atomic(self.path, json.dumps(
+                {'version': VERSION, 'entries': self.entries}))
+        except OSError as e:
+            STDOUT.debug('minecraft cache not saved: ' + str(e))
+            return False
+        self._changed = False
+        return True
+
+    def get(self, addr) -> 'pinger.PingResponse':
+        """Get last status.
+
+        :param addr: str, address
+        :return: PingResponse (with latency attribute) or None
+        """
+        if addr in self._responses:
+            return self._responses[addr]
+        entry = self.entries.get(addr)
+        if not entry or not entry['status']:
+            return None
+        try:
+            response = pinger.PingResponse(entry['status'])
+        except (ValueError, KeyError, TypeError) as e:
+            STDOUT.debug('bad cached status ' + addr + ': ' + str(e))
+            del self.entries[addr]
+            self._changed = True
+            return None
+        response.latency = entry['latency']
+        self._responses[addr] = response
+        return response
+
+    def get_error(self, addr) -> str:
+        """Get last error.
+
+        :param addr: str, address
+        :return: str, error text (empty if last request succeeded)
+        """
+        entry = self.entries.get(addr)
+        return entry['error'] if entry else ''
+
+    def get_time(self, addr) -> float:
+        """Get time of last received status.
+
+        :param addr: str, address
+        :return: float, time (0 if not received)
+        """
+        entry = self.entries.get(addr)
+        return entry['time'] if entry else 0
+
+    def put(self, addr, status):
+        """Save received status.
+
+        :param addr: str, address
+        :param status: PingResponse (with latency attribute)
+        """
+        self.entries[addr] = {'status': status.raw,
+                              'latency': status.latency,
+                              'time': time.time(), 'error': ''}
+        self._responses[addr] = status
+        self._changed = True
+
+    def put_error(self, addr, error):
+        """Save error (last status kept).
+
+        :param addr: str, address
+        :param error: str, error text
+        """
+        entry = self.entries.setdefault(
+            addr, {'status': None, 'latency': 0, 'time': 0, 'error': ''})
+        entry['error'] = error
+        self._changed = True
+
+    def is_stale(self, addr, now=None) -> bool:
+        """Check entry.
+
+        :param addr: str, address
+        :param now: float, current time (time.time())
+        :return: bool, True if no entry, older than TTL or last request
+        failed
+        """
+        entry = self.entries.get(addr)
+        if not entry or entry['error']:
+            return True
+        if now is None:
+            now = time.time()
+        return not 0 <= now - entry['time'] < self.ttl
+
+    def get_stale(self, addresses) -> list:
+        """Get stale addresses.
+
+        :param addresses: iterable, addresses
+        :return: list, addresses
+        """
+        now = time.time()
+        return [addr for addr in addresses if self.is_stale(addr, now)]
+
+    def retain(self, addresses):
+        """Remove entries of other servers.
+
+        :param addresses: iterable, addresses to keep
+        """
+        addresses = set(addresses)
+        for addr in list(self.entries):
+            if addr not in addresses:
+                del self.entries[addr]
+                self._responses.pop(addr, None)
+                self._changed = True
+
+    def clear(self):
+        """Remove all entries."""
+        if self.entries:
+            self._changed = True
+        self.entries.clear()
+        self._responses.clear()
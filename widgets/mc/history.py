@@ -0,0 +1,270 @@
+"""Servers history: players count, latency and up/down of every poll in
+fixed-size records, rolled up to minute, hour and day buckets. Every level
+of every server is append-only file, compacted (oldest records dropped)
+when it is twice bigger than level capacity, so size is bounded."""
+import os
+import time
+import struct
+import hashlib
+from core.paths import CACHE
+from core.utils import write_atomic, STDOUT
+
+HISTORY_DIR = os.path.join(CACHE, 'minecraft_history')
+"""path to history directory"""
+SAMPLE = struct.Struct('<IIIf?3x')
+"""raw record: time, online, max, latency (ms), up"""
+BUCKET = struct.Struct('<IIIIIff')
+"""rollup record: start time, samples count, up samples count, min online,
+max online, average online, average latency (ms), values - of up samples"""
+RAW = 'raw'
+"""raw samples level name"""
+RAW_CAPACITY = 2880
+"""raw samples kept for server"""
+LEVELS = (('minute', 60, 1440), ('hour', 3600, 2160), ('day', 86400, 1830))
+"""rollups: (name, bucket seconds, capacity), every level is made from
+previous"""
+SPARK = '▁▂▃▄▅▆▇█'
+"""sparkline characters"""
+MAX_COUNT = 0xFFFFFFFF
+"""max players count in record (unsigned int)"""
+
+
+def clamp(count) -> int:
+    """Fit players count (reported by server, can be any int) to record.
+
+    :param count: int, players count
+    :return: int, count in 0..MAX_COUNT
+    """
+    return min(max(int(count), 0), MAX_COUNT)
+
+
+def get_bucket(t, status) -> tuple:
+    """Make bucket from one sample.
+
+    :param t: int, time
+    :param status: PingResponse (with latency attribute) or None if down
+    :return: tuple, bucket (see BUCKET)
+    """
+    if not status:
+        return t, 1, 0, 0, 0, 0.0, 0.0
+    online = clamp(status.players.online)
+    return t, 1, 1, online, online, float(online), float(status.latency)
+
+
+def merge(a, b) -> tuple:
+    """Merge buckets (time of first).
+
+    :param a: tuple, bucket
+    :param b: tuple, bucket
+    :return: tuple, bucket
+    """
+    up = a[2] + b[2]
+    if not b[2]:
+        return (a[0], a[1] + b[1]) + a[2:]
+    if not a[2]:
+        return (a[0], a[1] + b[1]) + b[2:]
+    return (a[0], a[1] + b[1], up, min(a[3], b[3]), max(a[4], b[4]),
+            (a[5] * a[2] + b[5] * b[2]) / up,
+            (a[6] * a[2] + b[6] * b[2]) / up)
+
+
+def sparkline(values) -> str:
+    """Make text sparkline.
+
+    :param values: list, numbers (None - gap)
+    :return: str, characters from SPARK (no-break space - gap)
+    """
+    known = [value for value in values if value is not None]
+    if not known:
+        return ''
+    low, high = min(known), max(known)
+    result = ''
+    for value in values:
+        if value is None:
+            result += '\u00a0'
+        elif high == low:
+            result += SPARK[0]
+        else:
+            result += SPARK[round((value - low) / (high - low) *
+                                  (len(SPARK) - 1))]
+    return result
+
+
+class History:
+    """History of servers, keys - addresses (host:port)."""
+    def __init__(self, folder=HISTORY_DIR):
+        """
+
+        :param folder: str, path to history directory
+        """
+        self.folder = folder
+        """path to history directory"""
+        self._open = {}
+        """not finished buckets, keys - (address, level index), values -
+        buckets"""
+        self._counts = {}
+        """records in files, keys - paths"""
+
+    def _get_path(self, addr, level) -> str:
+        name = hashlib.sha1(addr.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.folder, name + '.' + level)
+
+    def _append(self, path, data, record, capacity):
+        count = self._counts.get(path)
+        if count is None:  # first write in session
+            os.makedirs(self.folder, exist_ok=True)
+            size = os.path.getsize(path) if os.path.isfile(path) else 0
+            if size % record.size:  # torn record (crash)
+                with open(path, 'r+b') as file:
+                    file.truncate(size - size % record.size)
+            count = size // record.size
+        with open(path, 'ab') as file:
+            file.write(data)
+        count += 1
+        if count >= capacity * 2:  # compact
+            with open(path, 'rb') as file:
+                file.seek(-capacity * record.size, os.SEEK_END)
+                data = file.read()
+            write_atomic(path, data)
+            count = capacity
+        self._counts[path] = count
+
+    def append(self, addr, status, now=None):
+        """Add poll result.
+
+        :param addr: str, address
+        :param status: PingResponse (with latency attribute) or None if
+        server is down
+        :param now: float, poll time (time.time())
+        """
+        t = int(time.time() if now is None else now)
+        if status:
+            sample = SAMPLE.pack(t, clamp(status.players.online),
+                                 clamp(status.players.max), status.latency,
+                                 True)
+        else:
+            sample = SAMPLE.pack(t, 0, 0, 0.0, False)
+        try:
+            self._append(self._get_path(addr, RAW), sample, SAMPLE,
+                         RAW_CAPACITY)
+            self._roll(addr, 0, get_bucket(t, status))
+        except OSError as e:
+            STDOUT.debug('minecraft history not written: ' + str(e))
+
+    def _roll(self, addr, index, bucket):
+        name, seconds, capacity = LEVELS[index]
+        bucket = (bucket[0] - bucket[0] % seconds,) + bucket[1:]
+        current = self._open.get((addr, index))
+        if current and current[0] == bucket[0]:
+            self._open[(addr, index)] = merge(current, bucket)
+            return
+        self._open[(addr, index)] = bucket
+        if current:  # finished
+            self._write(addr, index, current)
+
+    def _write(self, addr, index, bucket):
+        name, seconds, capacity = LEVELS[index]
+        self._append(self._get_path(addr, name), BUCKET.pack(*bucket),
+                     BUCKET, capacity)
+        if index + 1 < len(LEVELS):
+            self._roll(addr, index + 1, bucket)
+
+    def flush(self):
+        """Write not finished buckets (merged with next on reading)."""
+        for index in range(len(LEVELS)):  # rolled up to next level
+            for key in [key for key in self._open if key[1] == index]:
+                try:
+                    self._write(key[0], index, self._open.pop(key))
+                except OSError as e:
+                    STDOUT.debug('minecraft history not written: ' +
+                                 str(e))
+
+    def get_samples(self, addr, since=0) -> list:
+        """Get raw samples.
+
+        :param addr: str, address
+        :param since: float, min time
+        :return: list, tuples (see SAMPLE)
+        """
+        return [sample for sample in
+                self._read(self._get_path(addr, RAW), SAMPLE)
+                if sample[0] >= since]
+
+    def get_buckets(self, addr, level, since=0) -> list:
+        """Get rollup buckets.
+
+        :param addr: str, address
+        :param level: str, level name (see LEVELS)
+        :param since: float, min time
+        :return: list, buckets (see BUCKET), sorted by time
+        """
+        index = [name for name, seconds, capacity in LEVELS].index(level)
+        buckets = {}
+        records = self._read(self._get_path(addr, level), BUCKET)
+        if (addr, index) in self._open:
+            records.append(self._open[(addr, index)])
+        for bucket in records:
+            if bucket[0] < since:
+                continue
+            if bucket[0] in buckets:  # flushed not finished bucket
+                bucket = merge(buckets[bucket[0]], bucket)
+            buckets[bucket[0]] = bucket
+        return [buckets[t] for t in sorted(buckets)]
+
+    def get_series(self, addr, period=86400, points=48, now=None) -> list:
+        """Get history for period with fixed count of points (from finest
+        level covering period).
+
+        :param addr: str, address
+        :param period: float, seconds before now
+        :param points: int, count of points
+        :param now: float, end time (time.time())
+        :return: list, buckets (None if no data)
+        """
+        start = (time.time() if now is None else now) - period
+        for name, seconds, capacity in LEVELS:
+            if seconds * capacity >= period:
+                break
+        step = period / points
+        result = [None] * points
+        for bucket in self.get_buckets(addr, name, start):
+            point = int((bucket[0] - start) // step)
+            if 0 <= point < points:
+                result[point] = merge(result[point], bucket) \
+                    if result[point] else bucket
+        return result
+
+    def _read(self, path, record) -> list:
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+        except FileNotFoundError:
+            return []
+        except OSError as e:
+            STDOUT.debug('minecraft history not read: ' + str(e))
+            return []
+        data = data[:len(data) - len(data) % record.size]
+        return list(record.iter_unpack(data))
+
+    def retain(self, addresses):
+        """Remove history of other servers.
+
+        :param addresses: iterable, addresses to keep
+        """
+        addresses = set(addresses)
+        names = {os.path.basename(self._get_path(addr, RAW)).split('.')[0]
+                 for addr in addresses}
+        for key in list(self._open):
+            if key[0] not in addresses:
+                del self._open[key]
+        if not os.path.isdir(self.folder):
+            return
+        for name in os.listdir(self.folder):
+            if name.split('.')[0] not in names:
+                path = os.path.join(self.folder, name)
+                self._counts.pop(path, None)
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    STDOUT.debug('minecraft history not removed: ' +
+                                 str(e))
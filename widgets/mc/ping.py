@@ -0,0 +1,248 @@
+"""Minecraft server list ping (status protocol) over asyncio. All requests
+are made in one background thread with bounded concurrency."""
+import json
+import time
+import struct
+import random
+import asyncio
+import threading
+from PyQt5.QtCore import QObject, pyqtSignal
+from core.utils import print_stack_trace
+from core.imports import lazy
+from widgets.mc.resolver import Resolver, PORT
+
+pinger = lazy('mcstatus.pinger')
+
+PROTOCOL = 47
+"""protocol version sent in handshake"""
+CONCURRENCY = 32
+"""max count of simultaneous connections"""
+TIMEOUT = 5.0
+"""timeout for one server (connect, status and ping), seconds"""
+MAX_PACKET = 2097151
+"""max packet length (3 bytes varint)"""
+
+
+def pack_varint(value) -> bytes:
+    """Encode int to protocol varint.
+
+    :param value: int
+    :return: bytes
+    """
+    value &= 0xFFFFFFFF
+    result = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            result.append(byte | 0x80)
+        else:
+            result.append(byte)
+            return bytes(result)
+
+
+def pack_string(s) -> bytes:
+    """Encode string with varint length.
+
+    :param s: str
+    :return: bytes
+    """
+    data = s.encode('utf-8')
+    return pack_varint(len(data)) + data
+
+
+def pack_packet(packet_id, data=b'') -> bytes:
+    """Make packet with length prefix.
+
+    :param packet_id: int, packet id
+    :param data: bytes, packet data
+    :return: bytes
+    """
+    body = pack_varint(packet_id) + data
+    return pack_varint(len(body)) + body
+
+
+def unpack_varint(data, offset=0) -> tuple:
+    """Decode varint from bytes.
+
+    :param data: bytes
+    :param offset: int, start position
+    :return: tuple, (value, new offset)
+    """
+    result = 0
+    for i in range(5):
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7F) << 7 * i
+        if not byte & 0x80:
+            return result, offset
+    raise IOError('varint is too big')
+
+
+async def read_varint(reader) -> int:
+    """Read varint from stream.
+
+    :param reader: asyncio.StreamReader
+    :return: int
+    """
+    result = 0
+    for i in range(5):
+        byte = (await reader.readexactly(1))[0]
+        result |= (byte & 0x7F) << 7 * i
+        if not byte & 0x80:
+            return result
+    raise IOError('varint is too big')
+
+
+async def read_packet(reader) -> tuple:
+    """Read packet from stream.
+
+    :param reader: asyncio.StreamReader
+    :return: tuple, (packet id, bytes data)
+    """
+    length = await read_varint(reader)
+    if not 0 < length <= MAX_PACKET:
+        raise IOError('bad packet length: ' + str(length))
+    body = await reader.readexactly(length)
+    packet_id, offset = unpack_varint(body)
+    return packet_id, body[offset:]
+
+
+async def status(host, port=PORT, ip=None) -> 'pinger.PingResponse':
+    """Get server status (server list ping).
+
+    :param host: str, server host (sent in handshake)
+    :param port: int, server port
+    :param ip: str, connection address (None - host)
+    :return: PingResponse (with latency attribute, ms)
+    """
+    reader, writer = await asyncio.open_connection(ip or host, port)
+    try:
+        writer.write(
+            pack_packet(0, pack_varint(PROTOCOL) + pack_string(host) +
+                        struct.pack('>H', port) + pack_varint(1)) +
+            pack_packet(0))
+        packet_id, data = await read_packet(reader)
+        if packet_id != 0:
+            raise IOError('bad status response packet')
+        length, offset = unpack_varint(data)
+        try:
+            response = pinger.PingResponse(json.loads(
+                data[offset:offset + length].decode('utf-8')))
+        except ValueError as e:
+            raise IOError('bad status response: ' + str(e))
+        token = random.getrandbits(63)
+        sent = time.perf_counter()
+        writer.write(pack_packet(1, struct.pack('>q', token)))
+        packet_id, data = await read_packet(reader)
+        if packet_id != 1 or struct.unpack('>q', data[:8])[0] != token:
+            raise IOError('bad ping response packet')
+        response.latency = (time.perf_counter() - sent) * 1000
+        return response
+    finally:
+        writer.close()
+
+
+class StatusPoller(QObject):
+    """Poll servers in background thread, results delivered by signals in
+    GUI thread."""
+    result = pyqtSignal(str, object, str)
+    """address, PingResponse (None if failed), error text"""
+    finished = pyqtSignal()
+    """all servers of last poll() processed"""
+
+    def __init__(self, concurrency=CONCURRENCY, timeout=TIMEOUT,
+                 resolver=None, parent=None):
+        """
+
+        :param concurrency: int, max count of simultaneous connections
+        :param timeout: float, timeout for one server (seconds)
+        :param resolver: Resolver (None - new)
+        :param parent: QObject
+        """
+        super().__init__(parent)
+        self.resolver = resolver or Resolver()
+        """addresses resolver (with cache)"""
+        self.concurrency = concurrency
+        """max count of simultaneous connections"""
+        self.timeout = timeout
+        """timeout for one server (seconds)"""
+        self._loop = None
+        self._thread = None
+        self._future = None
+
+    def _start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever,
+                                        name='minecraft-poller', daemon=True)
+        self._thread.start()
+
+    async def _status(self, addr):
+        host, port, ip = await self._loop.run_in_executor(
+            None, self.resolver.resolve, addr)
+        return await status(host, port, ip)
+
+    async def _ping(self, semaphore, addr, deadline):
+        async with semaphore:
+            if deadline and self._loop.time() >= deadline:
+                return  # cycle budget is over, polled next time
+            try:
+                response = await asyncio.wait_for(self._status(addr),
+                                                  self.timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.result.emit(addr, None, str(e) or type(e).__name__)
+                return
+            self.result.emit(addr, response, '')
+
+    async def _poll(self, addresses, budget):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        deadline = self._loop.time() + budget if budget else None
+        try:
+            await asyncio.gather(*(self._ping(semaphore, addr, deadline)
+                                   for addr in addresses))
+        except asyncio.CancelledError:
+            raise
+        except:
+            print_stack_trace()()
+        self.finished.emit()
+
+    def poll(self, addresses, budget=None):
+        """Poll servers (previous unfinished poll will be cancelled).
+
+        :param addresses: iterable, addresses (host:port)
+        :param budget: float, seconds after which new requests are not
+        started (results for skipped servers are not sent), None - no limit
+        """
+        self.cancel()
+        self._start()
+        self._future = asyncio.run_coroutine_threadsafe(
+            self._poll(list(dict.fromkeys(addresses)), budget), self._loop)
+
+    def is_running(self) -> bool:
+        """Check poll status.
+
+        :return: bool, True if poll is not finished
+        """
+        return bool(self._future and not self._future.done())
+
+    def cancel(self):
+        """Cancel current poll (results for unprocessed servers will not be
+        sent)."""
+        if self._future and not self._future.done():
+            self._future.cancel()
+        self._future = None
+
+    def stop(self):
+        """Cancel poll and stop background thread."""
+        self.cancel()
+        if self._loop and self._thread and self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(1)
+            if not self._thread.is_alive():
+                self._loop.close()
+        self._loop = None
+        self._thread = None
@@ -0,0 +1,179 @@
+"""Servers addresses resolving (SRV record and host address) with cache.
+Records are cached for their DNS TTL limited by min and max TTL, not found
+names (NXDOMAIN, no records) - for negative TTL. Thread-safe (used from
+poller thread and info windows)."""
+import time
+import socket
+import threading
+import ipaddress
+from core.utils import STDOUT
+from core.imports import lazy
+
+resolver = lazy('dns.resolver')
+
+PORT = 25565
+"""default server port"""
+SRV_PREFIX = '_minecraft._tcp.'
+"""SRV record name prefix"""
+MIN_TTL = 30.0
+"""min time to keep record, seconds"""
+MAX_TTL = 3600.0
+"""max time to keep record, seconds"""
+NEGATIVE_TTL = 300.0
+"""time to keep not found names, seconds"""
+
+
+class NotFound(LookupError):
+    """name not exists or has no records of type"""
+
+
+def parse_address(addr, default=PORT) -> tuple:
+    """Split address to host and port.
+
+    :param addr: str, host:port or host
+    :param default: int, port if not in address
+    :return: tuple, (host, int port)
+    """
+    host, sep, port = addr.rpartition(':')
+    if not sep or not port.isdigit():
+        return addr, default
+    return host.strip('[]'), int(port)
+
+
+def is_ip(host) -> bool:
+    """Check host is IP address.
+
+    :param host: str
+    :return: bool, True if IPv4 or IPv6 address
+    """
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
+
+
+def dns_query(name, rdtype) -> tuple:
+    """Query DNS (dnspython). Host address not found in DNS is resolved by
+    system (hosts file, IPv6), kept for min TTL.
+
+    :param name: str, domain name
+    :param rdtype: str, SRV or A
+    :return: tuple, (list of records, int TTL), SRV records - (host, port)
+    tuples, A records - addresses
+    :raises NotFound: name not exists or has no records
+    """
+    try:
+        answer = resolver.resolve(name, rdtype)
+    except (resolver.NXDOMAIN, resolver.NoAnswer) as e:
+        if rdtype != 'A':
+            raise NotFound(str(e))
+        try:
+            info = socket.getaddrinfo(name, None, type=socket.SOCK_STREAM)
+        except socket.gaierror:
+            raise NotFound(str(e))
+        return [item[4][0] for item in info], 0
+    if rdtype == 'SRV':
+        records = [(str(r.target).rstrip('.'), int(r.port)) for r in
+                   sorted(answer, key=lambda r: (r.priority, -r.weight))]
+    else:
+        records = [r.address for r in answer]
+    return records, answer.rrset.ttl
+
+
+class Resolver:
+    """Resolver with cache."""
+    def __init__(self, query=dns_query, min_ttl=MIN_TTL, max_ttl=MAX_TTL,
+                 negative_ttl=NEGATIVE_TTL, clock=time.monotonic):
+        """
+
+        :param query: function (name, rdtype), returns (records, ttl), raises
+        NotFound (see dns_query)
+        :param min_ttl: float, min time to keep record (seconds)
+        :param max_ttl: float, max time to keep record (seconds)
+        :param negative_ttl: float, time to keep not found names (seconds)
+        :param clock: function, returns current time (seconds)
+        """
+        self.query = query
+        """DNS query function"""
+        self.min_ttl = min_ttl
+        """min time to keep record (seconds)"""
+        self.max_ttl = max_ttl
+        """max time to keep record (seconds)"""
+        self.negative_ttl = negative_ttl
+        """time to keep not found names (seconds)"""
+        self.clock = clock
+        """current time function"""
+        self.hits = 0
+        """count of answers from cache"""
+        self.misses = 0
+        """count of queries"""
+        self._cache = {}
+        """keys - (name, rdtype), values - (expire time, records or None
+        for not found)"""
+        self._lock = threading.Lock()
+
+    def lookup(self, name, rdtype) -> list:
+        """Get records (from cache or query).
+
+        :param name: str, domain name
+        :param rdtype: str, SRV or A
+        :return: list, records
+        :raises NotFound: name not exists or has no records
+        """
+        key = (name.lower(), rdtype)
+        now = self.clock()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry and entry[0] > now:
+                self.hits += 1
+                if entry[1] is None:
+                    raise NotFound(name)
+                return entry[1]
+            self.misses += 1
+        try:
+            records, ttl = self.query(name, rdtype)
+        except NotFound:
+            with self._lock:
+                self._cache[key] = (now + self.negative_ttl, None)
+            raise
+        if not records:
+            raise NotFound(name)
+        ttl = min(max(ttl, self.min_ttl), self.max_ttl)
+        with self._lock:
+            self._cache[key] = (now + ttl, records)
+        return records
+
+    def resolve(self, addr) -> tuple:
+        """Resolve server address. SRV record is used if address without
+        port (like Minecraft client), DNS errors (except not found) are
+        ignored - connection address is the host.
+
+        :param addr: str, host:port or host
+        :return: tuple, (host - for handshake, int port, connection address)
+        :raises OSError: host not found
+        """
+        host, port = parse_address(addr, None)
+        if port is None:
+            port = PORT
+            try:
+                host, port = self.lookup(SRV_PREFIX + host, 'SRV')[0]
+            except NotFound:
+                pass
+            except Exception as e:
+                STDOUT.debug('SRV lookup failed: ' + addr + ' (' + str(e) +
+                             ')')
+        if is_ip(host):
+            return host, port, host
+        try:
+            return host, port, self.lookup(host, 'A')[0]
+        except NotFound:
+            raise OSError('host not found: ' + host)
+        except Exception as e:
+            STDOUT.debug('lookup failed: ' + host + ' (' + str(e) + ')')
+            return host, port, host
+
+    def clear(self):
+        """Remove all records."""
+        with self._lock:
+            self._cache.clear()
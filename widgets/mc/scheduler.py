@@ -0,0 +1,146 @@
+"""Per-server polling schedule: every address has own next poll time.
+Unreachable servers back off exponentially up to max interval, servers with
+changing players count are polled with min interval, quiet servers - less
+often (up to max interval)."""
+import time
+import random
+from collections import deque
+
+MIN_INTERVAL = 30.0
+"""default min interval, seconds"""
+MAX_INTERVAL = 600.0
+"""default max interval, seconds"""
+BACKOFF = 2.0
+"""interval multiplier for every failure in a row"""
+GROWTH = 1.5
+"""interval multiplier for server without changes"""
+JITTER = 0.1
+"""random part of interval (servers polled at different times)"""
+TICK = 1000
+"""check interval for due servers, ms"""
+BUDGET = 10.0
+"""max time of one poll cycle (new requests are not started after it),
+seconds"""
+RATE_PERIOD = 60.0
+"""period for polls rate, seconds"""
+
+
+class Scheduler:
+    """Polling schedule, keys - addresses (host:port)."""
+    def __init__(self, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL):
+        """
+
+        :param min_interval: float, min interval (seconds)
+        :param max_interval: float, max interval (seconds)
+        """
+        self.min_interval = min_interval
+        """min interval (seconds)"""
+        self.max_interval = max(min_interval, max_interval)
+        """max interval (seconds)"""
+        self.entries = {}
+        """keys - addresses, values - dicts: due (next poll time), interval
+        (seconds), failures (count in a row)"""
+        self._polls = deque()
+        """times of finished polls (last RATE_PERIOD)"""
+
+    def set_intervals(self, min_interval, max_interval):
+        """Change intervals (current intervals are clamped).
+
+        :param min_interval: float, min interval (seconds)
+        :param max_interval: float, max interval (seconds)
+        """
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        for entry in self.entries.values():
+            interval = min(max(entry['interval'], self.min_interval),
+                           self.max_interval)
+            entry['due'] += interval - entry['interval']
+            entry['interval'] = interval
+
+    def _get_entry(self, addr) -> dict:
+        if addr not in self.entries:
+            self.entries[addr] = {'due': 0, 'interval': self.min_interval,
+                                  'failures': 0}
+        return self.entries[addr]
+
+    def seed(self, addr, last):
+        """Set next poll time from time of last received status (for
+        example, from cache).
+
+        :param addr: str, address
+        :param last: float, time of last status (0 - unknown, poll now)
+        """
+        entry = self._get_entry(addr)
+        if last:
+            entry['due'] = last + entry['interval']
+
+    def get_due(self, addresses, now=None) -> list:
+        """Get addresses to poll (earliest first).
+
+        :param addresses: iterable, addresses
+        :param now: float, current time (time.time())
+        :return: list, addresses
+        """
+        if now is None:
+            now = time.time()
+        due = [(self._get_entry(addr)['due'], addr)
+               for addr in dict.fromkeys(addresses)]
+        return [addr for t, addr in sorted(due) if t <= now]
+
+    def done(self, addr, ok, changed=False, now=None):
+        """Schedule next poll after result.
+
+        :param addr: str, address
+        :param ok: bool, True if status received
+        :param changed: bool, True if players count changed
+        :param now: float, current time (time.time())
+        """
+        if now is None:
+            now = time.time()
+        entry = self._get_entry(addr)
+        if not ok:
+            entry['failures'] += 1
+            interval = self.min_interval * BACKOFF ** min(
+                entry['failures'], 32)
+        elif changed:
+            entry['failures'] = 0
+            interval = self.min_interval
+        else:
+            entry['failures'] = 0
+            interval = entry['interval'] * GROWTH
+        entry['interval'] = min(max(interval, self.min_interval),
+                                self.max_interval)
+        entry['due'] = now + entry['interval'] * (
+            1 - random.uniform(0, JITTER))
+        self._polls.append(now)
+        self._trim(now)
+
+    def _trim(self, now):
+        while self._polls and self._polls[0] <= now - RATE_PERIOD:
+            self._polls.popleft()
+
+    def get_rate(self, now=None) -> float:
+        """Get polls per minute.
+
+        :param now: float, current time (time.time())
+        :return: float, count of finished polls in last minute
+        """
+        if now is None:
+            now = time.time()
+        self._trim(now)
+        return len(self._polls) * 60 / RATE_PERIOD
+
+    def reset(self):
+        """Poll all now (intervals kept)."""
+        for entry in self.entries.values():
+            entry['due'] = 0
+
+    def retain(self, addresses):
+        """Remove other servers.
+
+        :param addresses: iterable, addresses to keep
+        """
+        addresses = set(addresses)
+        for addr in list(self.entries):
+            if addr not in addresses:
+                del self.entries[addr]
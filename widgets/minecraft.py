@@ -1,22 +1,34 @@
 import os
 import re
-import sys
 import json
+import time
 import base64
-from multiprocessing import Process, Manager
-from mcstatus import MinecraftServer
+import asyncio
+import hashlib
+import threading
 from PyQt5.QtWidgets import QWidget, QListWidget, QListWidgetItem, QVBoxLayout
 from PyQt5.QtWidgets import QMenu, QPushButton, QMessageBox, QGridLayout
 from PyQt5.QtWidgets import QInputDialog, QSpinBox, QLabel
-from PyQt5.QtGui import QIcon, QPixmap, QImage
+from PyQt5.QtGui import QIcon, QPixmap, QImage, QFont
 from PyQt5.QtCore import Qt, QSize, QTimer
 from core.api import Widget, WidgetInfo
 from core.gui.help import TextViewer
 from core.paths import RES, RELOAD, SETTINGS, ERROR, DELETE, HELP
+from core.resources import get_icon, get_style
 from core.utils import LogLevel, try_except, print_stack_trace
+from core.imports import lazy
+from widgets.mc.ping import StatusPoller, status as get_status, TIMEOUT
+from widgets.mc.resolver import Resolver, MIN_TTL, MAX_TTL
+from widgets.mc.history import History, sparkline
+from widgets.mc.cache import StatusCache, TTL
+from widgets.mc.scheduler import Scheduler, MAX_INTERVAL, BUDGET, TICK
+
+mcstatus = lazy('mcstatus')
 
 
 def get_description(desc) -> str:
+    if isinstance(desc, str):
+        return desc
     if desc['text']:
         return desc['text']
     result = ''
@@ -36,8 +48,8 @@ class Info(WidgetInfo):
         self.AUTHOR = 'InterVi'
         self.EMAIL = 'intervionly@gmail.com'
         self.URL = 'https://github.com/InterVi/DeWidgets'
-        self.ICON = QIcon(os.path.join(sys.path[0], 'res', 'minecraft',
-                                       'minecraft.png'))
+        self.ICON_PATH = os.path.join(RES, 'minecraft', 'minecraft.png')
+        self.ICON = get_icon(self.ICON_PATH)
 
 
 class Main(Widget, QWidget):
@@ -45,15 +57,14 @@ class Main(Widget, QWidget):
         Widget.__init__(self, widget_manager, info)
         QWidget.__init__(self)
         self.servers = []
-        self.timer_interval = 30000
+        self.timer_interval = 30000  # min interval
+        self.max_interval = int(MAX_INTERVAL * 1000)
         self.lang = info.lang
         self.show_more = None
         self.settings_win = None
         # setup stylesheet
-        with open(os.path.join(RES, 'minecraft', 'style.css'), encoding='utf-8'
-                  ) as file:
-            style = file.read()
-            self.setStyleSheet(style)
+        style = get_style(os.path.join(RES, 'minecraft', 'style.css'))
+        self.setStyleSheet(style)
         # setup list
         self.list = QListWidget(self)
         self.list.setStyleSheet(style)
@@ -65,30 +76,37 @@ class Main(Widget, QWidget):
         self.list.setSelectionMode(QListWidget.NoSelection)
         # setup list menu
         self.list_menu = QMenu(self)
-        reload_action = self.list_menu.addAction(QIcon(RELOAD),
+        reload_action = self.list_menu.addAction(get_icon(RELOAD),
                                                  self.widget_manager.lang[
                                                      'MINECRAFT']['reload'])
-        reload_action.triggered.connect(self._list_fill)
+        reload_action.triggered.connect(self._reload)
         # setup v box layout
         self.v_box = QVBoxLayout(self)
         self.v_box.addWidget(self.list)
         self.v_box.setContentsMargins(0, 0, 0, 0)
-        # setup timer
+        # setup timer (polls due servers)
         self.update_timer = QTimer(self)
-        self.update_timer.timeout.connect(self._list_fill)
+        self.update_timer.timeout.connect(self._poll_due)
         self.start_timer = QTimer(self)
         self.start_timer.timeout.connect(self._list_fill)
-        # buffer
-        self.__manager = Manager()
-        self.list_buffer = self.__manager.dict()
-        # other
-        self.__procs = []
+        # status cache and polling schedule
+        self.cache = StatusCache()
+        self.scheduler = Scheduler()
+        self.history = History()
+        self.states = []  # shown (text, tooltip, favicon key, stale)
+        self.favicons = {}  # keys - sha1 of favicons, values - QIcon
+        # setup poller
+        self.resolver = Resolver()
+        self.poller = StatusPoller(resolver=self.resolver, parent=self)
+        self.poller.result.connect(self._ping_result)
 
     def boot(self):
         self._fill_settings()
+        self.cache.load()
+        for addr in self.servers:  # stale - now, other - by schedule
+            if not self.cache.is_stale(addr):
+                self.scheduler.seed(addr, self.cache.get_time(addr))
         self._list_fill()
-        self.start_timer.setSingleShot(True)
-        self.start_timer.start(1000)
 
     def place(self):
         self.start_timer.setSingleShot(True)
@@ -96,11 +114,23 @@ class Main(Widget, QWidget):
 
     def remove(self):
         self.update_timer.stop()
-        self._kill_procs()
+        self.poller.stop()
+        self.scheduler.retain(())
 
     def purge(self):
         self.update_timer.stop()
-        self._kill_procs()
+        self.poller.stop()
+        self.cache.clear()
+        self.cache.save()
+        self.history.retain(())
+
+    def unload(self):
+        self.update_timer.stop()
+        self.poller.stop()
+        self.cache.retain(self.servers)
+        self.cache.save()
+        self.history.flush()
+        self.history.retain(self.servers)
 
     @try_except()
     def show_settings(self):
@@ -108,27 +138,123 @@ class Main(Widget, QWidget):
 
     @try_except()
     def _list_fill(self, checked=False):
-        self._pool_ping()
-        self.list.clear()
-        for addr in self.servers:
-            item = QListWidgetItem(self.list)
-            try:
-                if addr not in self.list_buffer:
+        self._poll_due()
+        # stable items (changed only if status changed)
+        while self.list.count() > len(self.servers):
+            self.list.takeItem(self.list.count() - 1)
+        while self.list.count() < len(self.servers):
+            QListWidgetItem(self.list)
+        self.states = self.states[:len(self.servers)]
+        self.states += [None] * (len(self.servers) - len(self.states))
+        now = time.time()
+        for row, addr in enumerate(self.servers):
+            self._set_item(row, addr, now)
+        used = {state[2] for state in self.states if state}
+        for key in list(self.favicons):
+            if key not in used:
+                del self.favicons[key]
+
+    @try_except()
+    def _reload(self, checked=False):
+        self.poller.cancel()
+        self.resolver.clear()
+        self.scheduler.reset()
+        self._list_fill()
+
+    @try_except()
+    def _poll_due(self):
+        if self.poller.is_running():  # one cycle at a time
+            return
+        due = self.scheduler.get_due(self.servers)
+        if due:
+            self.poller.poll(due, BUDGET)
+
+    def _set_intervals(self):
+        self.update_timer.stop()
+        if self.timer_interval > 0:
+            self.scheduler.set_intervals(self.timer_interval / 1000,
+                                         self.max_interval / 1000)
+            self.cache.ttl = self.scheduler.max_interval
+            self.update_timer.start(TICK)
+        else:
+            self.cache.ttl = TTL
+
+    def _get_favicon(self, favicon) -> tuple:
+        if not favicon:
+            return '', QIcon()
+        data = favicon[favicon.find(',') + 1:]
+        key = hashlib.sha1(data.encode('utf-8')).hexdigest()
+        if key not in self.favicons:
+            self.favicons[key] = QIcon(QPixmap.fromImage(QImage.fromData(
+                base64.b64decode(data))))
+        return key, self.favicons[key]
+
+    def _set_item(self, row, addr, now=None):
+        item = self.list.item(row)
+        try:
+            status = self.cache.get(addr)
+            if not status:
+                state = addr, self.cache.get_error(addr), '', None
+                if self.states[row] != state:
                     item.setText(addr)
-                    continue
-                text, favicon, tooltip = json.loads(self.list_buffer[addr])
-                favicon = base64.b64decode(favicon)
-                item.setIcon(QIcon(QPixmap.fromImage(QImage.fromData(favicon)))
-                             )
-                item.setText(text)
-                font = item.font()
+                    item.setToolTip(state[1])
+                    item.setIcon(QIcon())
+                    item.setFont(self.list.font())
+                    self.states[row] = state
+                return
+            key, icon = self._get_favicon(status.favicon)
+            text = '[' + str(status.players.online) + ' / ' + \
+                str(status.players.max) + '] ' + \
+                self.lang['ping'].format(str(round(status.latency))) + \
+                '\n[' + status.version.name + ']\n' + \
+                re.sub('§+[a-zA-Z0-9]', '',
+                       get_description(status.description))
+            stale = self.cache.is_stale(addr, now)
+            tooltip = ''
+            if status.players.sample:
+                tooltip = ', '.join(
+                    player.name for player in status.players.sample)
+            if stale:  # shown until refreshed
+                tooltip += '\n' + self.lang['stale'].format(
+                    time.strftime('%H:%M:%S', time.localtime(
+                        self.cache.get_time(addr))))
+                if self.cache.get_error(addr):
+                    tooltip += '\n' + self.cache.get_error(addr)
+            state = text, tooltip.strip(), key, stale
+            if self.states[row] == state:
+                return
+            old = self.states[row]
+            if not old or old[2] != key:
+                item.setIcon(icon)
+            item.setText(text)
+            item.setToolTip(state[1])
+            if not old or old[3] != stale:  # None - address only
+                font = QFont(self.list.font())
                 font.setPixelSize(10)
                 font.setBold(True)
+                font.setItalic(stale)
                 item.setFont(font)
-                item.setToolTip(tooltip)
-            except:
-                item.setText(addr)
-                print_stack_trace()()
+            self.states[row] = state
+        except:
+            item.setText(addr)
+            self.states[row] = None
+            print_stack_trace()()
+
+    @try_except()
+    def _ping_result(self, addr, status, error):
+        last = self.cache.get(addr)
+        if status:
+            self.scheduler.done(addr, True, bool(last) and (
+                last.players.online != status.players.online))
+            self.cache.put(addr, status)
+        else:
+            self.widget_manager.logger.debug(addr + ': ' + error)
+            self.scheduler.done(addr, False)
+            self.cache.put_error(addr, error)
+        self.history.append(addr, status)
+        for row in range(min(self.list.count(), len(self.servers))):
+            if self.servers[row] == addr:
+                self._set_item(row, addr)
 
     def _fill_settings(self):
         section = self.widget_manager.get_config(self.info.NAME)
@@ -136,8 +262,11 @@ class Main(Widget, QWidget):
             self.servers = json.loads(section['servers'])
         if 'timer' in section:
             self.timer_interval = int(section['timer'])
-            if self.timer_interval > 0:
-                self.update_timer.start(self.timer_interval)
+        if 'max_timer' in section:
+            self.max_interval = int(section['max_timer'])
+        self.resolver.min_ttl = float(section.get('dns_min_ttl', MIN_TTL))
+        self.resolver.max_ttl = float(section.get('dns_max_ttl', MAX_TTL))
+        self._set_intervals()
 
     @try_except()
     def _show_list_menu(self, point):
@@ -147,41 +276,6 @@ class Main(Widget, QWidget):
     def _list_double_click(self, item):
         self.show_more = ShowMore(self)
 
-    def _kill_procs(self):
-        for p in self.__procs:
-            try:
-                if p and p.is_alive():
-                    p.terminate()
-            except:
-                print_stack_trace()()
-        self.__procs.clear()
-
-    def _pool_ping(self):
-        @try_except(level=LogLevel.DEBUG)
-        def ping(addr):
-            status = MinecraftServer.lookup(addr).status()
-            favicon = ''
-            if status.favicon:
-                favicon = status.favicon[status.favicon.find(',') + 1:]
-            tooltip = ''
-            if status.players.sample:
-                for player in status.players.sample:
-                    tooltip += player.name + ', '
-            text = '[' + str(status.players.online) + ' / ' + \
-                   str(status.players.max) + '] ' + \
-                   self.lang['ping'].format(
-                       str(status.latency)) + \
-                   '\n[' + status.version.name + ']\n' + \
-                   re.sub('§+[a-zA-Z0-9]', '',
-                          get_description(status.description))
-            self.list_buffer[addr] = json.dumps((text, favicon, tooltip[:-2]))
-
-        self._kill_procs()
-        for addr in self.servers:
-            proc = Process(target=ping, args=(addr,))
-            proc.start()
-            self.__procs.append(proc)
-
 
 class ShowMore(TextViewer):
     def __init__(self, main):
@@ -197,9 +291,11 @@ class ShowMore(TextViewer):
         self.setWindowIcon(main.list.item(main.list.currentRow()).icon())
         self.exit_button.clicked.connect(self.exit)
         self.text.setHtml(self.lang['wait'])
-        self.__manager = Manager()
-        self.__info_buffer = self.__manager.dict()
-        self.__proc = None
+        self.__info_buffer = dict.fromkeys(
+            ('online', 'max', 'version', 'protocol', 'players', 'ping',
+             'description', 'map', 'brand', 'plugins'), '')
+        self.__thread = None
+        self.__history = ''
         self._ping_server()
         self.timer = QTimer(self)
         self.timer.setSingleShot(True)
@@ -208,30 +304,7 @@ class ShowMore(TextViewer):
         self.show()
 
     def _ping_server(self):
-        @try_except(level=LogLevel.DEBUG)
-        def ping():
-            self.__info_buffer['online'] = ''
-            self.__info_buffer['max'] = ''
-            self.__info_buffer['version'] = ''
-            self.__info_buffer['protocol'] = ''
-            self.__info_buffer['players'] = ''
-            self.__info_buffer['ping'] = ''
-            self.__info_buffer['description'] = ''
-            self.__info_buffer['map'] = ''
-            self.__info_buffer['brand'] = ''
-            self.__info_buffer['plugins'] = ''
-            config = self.main.widget_manager.config.config
-            if 'servers' not in config[self.main.info.NAME]:
-                return
-            servers = json.loads(config[self.main.info.NAME]['servers'])
-            if not servers:
-                return
-            addr = servers[self.main.list.currentRow()]
-            try:
-                status = MinecraftServer.lookup(addr).status()
-            except:
-                print_stack_trace(LogLevel.DEBUG)()
-                return
+        def set_status(status):
             self.__info_buffer['online'] = str(status.players.online)
             self.__info_buffer['max'] = str(status.players.max)
             self.__info_buffer['version'] = status.version.name
@@ -244,8 +317,26 @@ class ShowMore(TextViewer):
             self.__info_buffer['players'] = players[:-7]
             self.__info_buffer['description'] = get_description(
                 status.description)
+            return players
+
+        @try_except(level=LogLevel.DEBUG)
+        def ping(addr, status):
+            try:  # resolved once for status and query (cached)
+                host, port, ip = self.main.resolver.resolve(addr)
+            except:
+                print_stack_trace(LogLevel.DEBUG)()
+                return
+            if status:
+                players = set_status(status)
+            else:  # not in cache
+                try:
+                    players = set_status(asyncio.run(asyncio.wait_for(
+                        get_status(host, port, ip), TIMEOUT)))
+                except:
+                    print_stack_trace(LogLevel.DEBUG)()
+                    return
             try:
-                query = MinecraftServer.lookup(addr).query()
+                query = mcstatus.MinecraftServer(ip, port).query()
             except:
                 print_stack_trace(LogLevel.DEBUG)()
                 return
@@ -260,27 +351,37 @@ class ShowMore(TextViewer):
                     players += p + ', <br/>'
             self.__info_buffer['players'] = players[:-7]
 
-        if self.__proc and self.__proc.is_alive():
-            self.__proc.terminate()
-        self.__proc = Process(target=ping)
-        self.__proc.start()
+        row = self.main.list.currentRow()
+        if not 0 <= row < len(self.main.servers):
+            return
+        addr = self.main.servers[row]
+        status = self.main.cache.get(addr)
+        if status:  # shown at once, query in background
+            set_status(status)
+        series = self.main.history.get_series(addr)
+        values = [b[5] if b and b[2] else None for b in series]
+        if any(value is not None for value in values):
+            count = sum(b[1] for b in series if b)
+            self.__history = self.lang['history'].format(
+                sparkline(values),
+                min(b[3] for b in series if b and b[2]),
+                max(b[4] for b in series if b and b[2]),
+                round(sum(b[2] for b in series if b) * 100 / count))
+        self.__thread = threading.Thread(target=ping, args=(addr, status),
+                                         name='minecraft-query', daemon=True)
+        self.__thread.start()
 
     @try_except()
     def print_info(self):
         self.text.setHtml(self.lang['info'].format(
-            **self.__info_buffer))
-        if self.__proc and self.__proc.is_alive():
+            **self.__info_buffer) + self.__history)
+        if self.__thread and self.__thread.is_alive():
             self.timer.start(100)
 
     @try_except()
     def exit(self, checked=False):
         self.timer.stop()
-        try:
-            if self.__proc and self.__proc.is_alive():
-                self.__proc.terminate()
-                self.__proc = None
-        except:
-            print_stack_trace()()
+        self.__thread = None  # daemon, result ignored
         self.close()
 
 
@@ -291,8 +392,8 @@ class Settings(QWidget):
         self.lang = main.widget_manager.lang['MINECRAFT']
         # setup window
         self.setWindowTitle(self.lang['settings_title'])
-        self.setWindowIcon(QIcon(SETTINGS))
-        self.resize(400, 460)
+        self.setWindowIcon(get_icon(SETTINGS))
+        self.resize(400, 520)
         # setup list
         self.list = QListWidget(self)
         self.list.setIconSize(QSize(64, 64))
@@ -310,6 +411,24 @@ class Settings(QWidget):
         self.time_edit.setToolTip(self.lang['time_input_tt'])
         self.time_edit.setAlignment(Qt.AlignCenter)
         self.time_edit.valueChanged.connect(self._time_changed)
+        # setup 'Max' label
+        self.max_label = QLabel(self.lang['max_time_label'], self)
+        self.max_label.setAlignment(Qt.AlignCenter)
+        # setup 'Max' spinbox
+        self.max_edit = QSpinBox(self)
+        self.max_edit.setMinimum(1)
+        self.max_edit.setMaximum(1000000000)
+        self.max_edit.setValue(int(self.main.max_interval/1000))
+        self.max_edit.setToolTip(self.lang['max_time_input_tt'])
+        self.max_edit.setAlignment(Qt.AlignCenter)
+        self.max_edit.valueChanged.connect(self._max_time_changed)
+        # setup 'Rate' label
+        self.rate_label = QLabel(self)
+        self.rate_label.setAlignment(Qt.AlignCenter)
+        self._show_rate()
+        self.rate_timer = QTimer(self)
+        self.rate_timer.timeout.connect(self._show_rate)
+        self.rate_timer.start(1000)
         # setup 'Up' button
         self.up_button = QPushButton(self.lang['up_button'], self)
         self.up_button.setToolTip(self.lang['up_button_tt'])
@@ -337,11 +456,14 @@ class Settings(QWidget):
         self.grid.addWidget(self.list, 0, 0, 1, 2)
         self.grid.addWidget(self.update_label, 1, 0)
         self.grid.addWidget(self.time_edit, 1, 1)
-        self.grid.addWidget(self.up_button, 2, 0)
-        self.grid.addWidget(self.down_button, 2, 1)
-        self.grid.addWidget(self.delete_button, 3, 0, 1, 2)
-        self.grid.addWidget(self.add_button, 4, 0, 1, 2)
-        self.grid.addWidget(self.close_button, 5, 0, 1, 2)
+        self.grid.addWidget(self.max_label, 2, 0)
+        self.grid.addWidget(self.max_edit, 2, 1)
+        self.grid.addWidget(self.rate_label, 3, 0, 1, 2)
+        self.grid.addWidget(self.up_button, 4, 0)
+        self.grid.addWidget(self.down_button, 4, 1)
+        self.grid.addWidget(self.delete_button, 5, 0, 1, 2)
+        self.grid.addWidget(self.add_button, 6, 0, 1, 2)
+        self.grid.addWidget(self.close_button, 7, 0, 1, 2)
         self.setLayout(self.grid)
         # show
         self.__change_enabeld()
@@ -372,15 +494,24 @@ class Settings(QWidget):
 
     @try_except()
     def _time_changed(self, value):
-        self.main.update_timer.stop()
-        if value > 0:
-            self.main.timer_interval = value * 1000
-            self.main.update_timer.start(self.main.timer_interval)
-        else:
-            self.main.timer_interval = 0
+        self.main.timer_interval = value * 1000
+        self.main._set_intervals()
         self.main.widget_manager.config.config[
             self.main.info.NAME]['timer'] = str(self.main.timer_interval)
-        self.main.widget_manager.config.save()
+        self.main.widget_manager.config.save(self.main.info.NAME)
+
+    @try_except()
+    def _max_time_changed(self, value):
+        self.main.max_interval = value * 1000
+        self.main._set_intervals()
+        self.main.widget_manager.config.config[
+            self.main.info.NAME]['max_timer'] = str(self.main.max_interval)
+        self.main.widget_manager.config.save(self.main.info.NAME)
+
+    @try_except()
+    def _show_rate(self):
+        self.rate_label.setText(self.lang['rate'].format(
+            round(self.main.scheduler.get_rate())))
 
     @try_except()
     def _move(self, up=True):
@@ -395,7 +526,7 @@ class Settings(QWidget):
             return
         self.main.widget_manager.config.config[self.main.info.NAME][
             'servers'] = json.dumps(self.main.servers)
-        self.main.widget_manager.config.save()
+        self.main.widget_manager.config.save(self.main.info.NAME)
         self.main._list_fill()
         self._list_fill()
         self.list.setCurrentRow(row)
@@ -413,7 +544,7 @@ class Settings(QWidget):
         mbox = QMessageBox(QMessageBox.Question, self.lang['confirm_title'],
                            self.lang['confirm_text'],
                            QMessageBox.Ok | QMessageBox.Cancel, self)
-        mbox.setWindowIcon(QIcon(DELETE))
+        mbox.setWindowIcon(get_icon(DELETE))
         mbox.setInformativeText(self.lang['confirm_inf'].format(
             self.list.currentItem().text()))
         ok = mbox.button(QMessageBox.Ok)
@@ -426,7 +557,7 @@ class Settings(QWidget):
             del self.main.servers[self.list.currentRow()]
             self.main.widget_manager.config.config[self.main.info.NAME][
                 'servers'] = json.dumps(self.main.servers)
-            self.main.widget_manager.config.save()
+            self.main.widget_manager.config.save(self.main.info.NAME)
             self.main._list_fill()
             self._list_fill()
             self.__change_enabeld()
@@ -434,7 +565,7 @@ class Settings(QWidget):
     @try_except()
     def _add(self, checked):
         id = QInputDialog(self)
-        id.setWindowIcon(QIcon(HELP))
+        id.setWindowIcon(get_icon(HELP))
         id.setWindowTitle(self.lang['input_title'])
         id.setLabelText(self.lang['input_text'])
         id.setTextValue('s.vomine.ru:25565')
@@ -450,7 +581,7 @@ class Settings(QWidget):
                 self.main.widget_manager.config.config[
                     self.main.info.NAME]['servers'] = json.dumps(
                     self.main.servers)
-                self.main.widget_manager.config.save()
+                self.main.widget_manager.config.save(self.main.info.NAME)
                 self.main._list_fill()
                 self._list_fill()
                 self.__change_enabeld()
@@ -460,7 +591,7 @@ class Settings(QWidget):
     def _show_error(self):
         mbox = QMessageBox(QMessageBox.Critical, self.lang['error_title'],
                            self.lang['error_text'], QMessageBox.Ok, self)
-        mbox.setWindowIcon(QIcon(ERROR))
+        mbox.setWindowIcon(get_icon(ERROR))
         ok = mbox.button(QMessageBox.Ok)
         ok.setText(self.lang['error_ok_button'])
         ok.setToolTip(self.lang['error_ok_button_tt'])
@@ -1,18 +1,22 @@
 import os
 import json
 from enum import IntEnum
-from distutils.util import strtobool
-import psutil
-from PyQt5.QtWidgets import QWidget, QLabel, QProgressBar, QPushButton
+from PyQt5.QtWidgets import QWidget, QLabel, QPushButton
 from PyQt5.QtWidgets import QCheckBox, QSpinBox, QComboBox, QListView
 from PyQt5.QtWidgets import QHBoxLayout, QVBoxLayout, QGridLayout
 from PyQt5.QtWidgets import QColorDialog
-from PyQt5.QtGui import QIcon, QStandardItemModel, QStandardItem, QFont
+from PyQt5.QtGui import QStandardItemModel, QStandardItem, QFont
 from PyQt5.QtGui import QColor, QPalette
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt
 from core.api import Widget, WidgetInfo
 from core.paths import RES, SETTINGS
-from core.utils import try_except
+from core.resources import get_icon, get_style
+from core.utils import try_except, strtobool
+from core.metrics import get_hub
+from core.views import RetainedView
+from core.imports import lazy
+
+psutil = lazy('psutil')
 
 
 class Rate(IntEnum):
@@ -61,7 +65,8 @@ class Info(WidgetInfo):
         self.AUTHOR = 'InterVi'
         self.EMAIL = 'intervionly@gmail.com'
         self.URL = 'https://github.com/InterVi/DeWidgets'
-        self.ICON = QIcon(os.path.join(RES, 'net_stat', 'icon.png'))
+        self.ICON_PATH = os.path.join(RES, 'net_stat', 'icon.png')
+        self.ICON = get_icon(self.ICON_PATH)
 
 
 class Main(Widget, QWidget):
@@ -76,17 +81,12 @@ class Main(Widget, QWidget):
         self.setLayout(QVBoxLayout(self))
         self.layout().setContentsMargins(0, 0, 0, 0)
         # setup stylesheet
-        with open(os.path.join(RES, 'net_stat', 'style.css'), encoding='utf-8'
-                  ) as file:
-            style = file.read()
-            self.setStyleSheet(style)
+        self.setStyleSheet(get_style(os.path.join(RES, 'net_stat',
+                                                  'style.css')))
         self.setAttribute(Qt.WA_TranslucentBackground)
-        # setup timer
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.setup_ui)
         # setup vars
         self.stats = psutil.net_if_stats()
-        self._widgets = []
+        self._view = RetainedView(self)
         self._setup_vars()
 
     def _setup_vars(self):
@@ -117,17 +117,29 @@ class Main(Widget, QWidget):
         self._palette.setColor(QPalette.WindowText, QColor('#000000'))
         self._font = QFont()
 
+    def _get_fields(self) -> list:
+        fields = ['net_io_pernic' if self._pername else 'net_io']
+        if self._con:
+            fields.append('net_connections:' + self._kind)
+        return fields
+
+    def _subscribe(self):
+        get_hub().subscribe(self.setup_ui, self._get_fields(), self._update)
+
     @try_except()
-    def setup_ui(self):
-        if self._widgets:  # clear
-            for w in self._widgets:
-                self.layout().removeWidget(w)
-                w.deleteLater()
-            self._widgets.clear()
-        # setup elements
+    def setup_ui(self, snapshot):
+        self._view.set_style(self._palette, self._font)
+        self._view.begin()
+        self.__setup_elements(snapshot)
+        self._view.end()
+
+    def __setup_elements(self, snapshot):
         if not self._labels:
-            self._add_label(self.lang['net'])
-        counters = psutil.net_io_counters(self._pername)
+            self._add_label('net', self.lang['net'])
+        counters = snapshot.get('net_io_pernic' if self._pername else
+                                'net_io')
+        if counters is None:
+            return
         speed = False
         if self._old_counters and type(counters) == type(self._old_counters):
             speed = True
@@ -139,16 +151,15 @@ class Main(Widget, QWidget):
                 if name not in counters:
                     return
                 if self._labels:
-                    self._add_label(self.lang['net_name'].format(name))
+                    self._add_label((name, 'net_name'),
+                                    self.lang['net_name'].format(name))
             if speed:
                 self.__setup_speed(counters, name)
             self.__setup_total(counters, name)
             self.__setup_packets(counters, name)
             self.__setup_errors(counters, name)
             self.__setup_drops(counters, name)
-        self.__setup_con()
-        # set layout
-        self.layout().update()
+        self.__setup_con(snapshot)
 
     def get_rate_locale(self, rate) -> str:
         if rate == Rate.B:
@@ -164,34 +175,24 @@ class Main(Widget, QWidget):
         elif rate == Rate.MBIT:
             return self.lang['mbit']
 
-    def _add_label(self, text):
-        label = QLabel(text, self)
-        label.setAlignment(Qt.AlignCenter)
-        label.setPalette(self._palette)
-        label.setFont(self._font)
-        self._widgets.append(label)
-        self.layout().addWidget(label)
+    def _add_label(self, key, text):
+        self._view.label(key, text)
 
-    def _add_rate_label(self, b, loc_str):
+    def _add_rate_label(self, key, b, loc_str):
         if self._mbit:
             value = get_mbit(b)
             rate = Rate.MBIT
         else:
             value, rate = get_rate(b)
         value = round(value, self._round)
-        self._add_label(loc_str.format(count=value,
-                                       rate=self.get_rate_locale(rate)))
+        self._add_label(key, loc_str.format(count=value,
+                                            rate=self.get_rate_locale(rate)))
 
     def __setup_speed(self, counters, name=None):
-        def setup_bar(b, max_b):
+        def setup_bar(key, b, max_b):
             if not self._bar:
                 return
-            bar = QProgressBar(self)
-            bar.setMinimum(0)
-            bar.setMaximum(100)
-            bar.setValue(get_percent(b, max_b))
-            self._widgets.append(bar)
-            self.layout().addWidget(bar)
+            self._view.bar((name, key + '_bar'), get_percent(b, max_b))
 
         def get_max_speed() -> float:
             result = 0
@@ -224,53 +225,66 @@ class Main(Widget, QWidget):
         if self._srecv:
             if recv_speed > self._max_recv_speed:
                 self._max_recv_speed = recv_speed
-            setup_bar(recv_speed, get_speed(self._max_recv_speed, name))
+            setup_bar('speed_recv', recv_speed,
+                      get_speed(self._max_recv_speed, name))
             if self._text:
-                self._add_rate_label(recv_speed, self.lang['speed_recv'])
+                self._add_rate_label((name, 'speed_recv'), recv_speed,
+                                     self.lang['speed_recv'])
         if self._ssent:
             if sent_speed > self._max_sent_speed:
                 self._max_sent_speed = sent_speed
-            setup_bar(sent_speed, get_speed(self._max_sent_speed, name))
+            setup_bar('speed_sent', sent_speed,
+                      get_speed(self._max_sent_speed, name))
             if self._text:
-                self._add_rate_label(sent_speed, self.lang['speed_sent'])
+                self._add_rate_label((name, 'speed_sent'), sent_speed,
+                                     self.lang['speed_sent'])
         self._old_counters = counters
 
     def __setup_total(self, counters, name=None):
         if self._trecv:
             b = counters[name].bytes_recv if name else counters.bytes_recv
-            self._add_rate_label(b, self.lang['total_recv'])
+            self._add_rate_label((name, 'total_recv'), b,
+                                 self.lang['total_recv'])
         if self._tsent:
             b = counters[name].bytes_sent if name else counters.bytes_sent
-            self._add_rate_label(b, self.lang['total_sent'])
+            self._add_rate_label((name, 'total_sent'), b,
+                                 self.lang['total_sent'])
 
     def __setup_packets(self, counters, name=None):
         if self._precv:
             p = counters[name].packets_recv if name else counters.packets_recv
-            self._add_label(self.lang['packets_recv'].format(str(p)))
+            self._add_label((name, 'packets_recv'),
+                            self.lang['packets_recv'].format(str(p)))
         if self._psent:
             p = counters[name].packets_sent if name else counters.packets_sent
-            self._add_label(self.lang['packets_sent'].format(str(p)))
+            self._add_label((name, 'packets_sent'),
+                            self.lang['packets_sent'].format(str(p)))
 
     def __setup_errors(self, counters, name=None):
         if self._errin:
             e = counters[name].errin if name else counters.errin
-            self._add_label(self.lang['errin'].format(str(e)))
+            self._add_label((name, 'errin'),
+                            self.lang['errin'].format(str(e)))
         if self._errout:
             e = counters[name].errout if name else counters.errout
-            self._add_label(self.lang['errout'].format(str(e)))
+            self._add_label((name, 'errout'),
+                            self.lang['errout'].format(str(e)))
 
     def __setup_drops(self, counters, name=None):
         if self._dropin:
             d = counters[name].dropin if name else counters.dropin
-            self._add_label(self.lang['dropin'].format(str(d)))
+            self._add_label((name, 'dropin'),
+                            self.lang['dropin'].format(str(d)))
         if self._dropout:
             d = counters[name].dropout if name else counters.dropout
-            self._add_label(self.lang['dropout'].format(str(d)))
+            self._add_label((name, 'dropout'),
+                            self.lang['dropout'].format(str(d)))
 
-    def __setup_con(self):
-        if self._con:
-            con = str(len(psutil.net_connections(self._kind)))
-            self._add_label(self.lang['connections'].format(con))
+    def __setup_con(self, snapshot):
+        con = snapshot.get('net_connections:' + self._kind)
+        if self._con and con is not None:
+            self._add_label('connections',
+                            self.lang['connections'].format(str(con)))
 
     def _load_settings(self):
         self.conf = self.widget_manager.get_config(self.info.NAME)
@@ -353,6 +367,7 @@ class Main(Widget, QWidget):
         self.settings_win = Settings(self)
 
     def unload(self):
+        get_hub().unsubscribe(self.setup_ui)
         self.save_settings()
 
     def place(self):
@@ -363,20 +378,19 @@ class Main(Widget, QWidget):
         self._load_settings()
 
     def remove(self):
-        self.timer.stop()
+        get_hub().unsubscribe(self.setup_ui)
 
     def purge(self):
-        self.timer.stop()
+        get_hub().unsubscribe(self.setup_ui)
         self._setup_vars()
 
     @try_except()
     def showEvent(self, event):
-        self.setup_ui()
-        self.timer.start(self._update)
+        self._subscribe()
 
     @try_except()
     def hideEvent(self, event):
-        self.timer.stop()
+        get_hub().unsubscribe(self.setup_ui)
 
 
 class Settings(QWidget):
@@ -386,7 +400,7 @@ class Settings(QWidget):
         self.main = main
         self.lang = main.lang
         # setup window
-        self.setWindowIcon(QIcon(SETTINGS))
+        self.setWindowIcon(get_icon(SETTINGS))
         self.setWindowTitle(self.lang['settings_title'])
         self.resize(500, 460)
         # setup vars
@@ -596,6 +610,6 @@ class Settings(QWidget):
             i += 1
         self.main._names = names
         self.main.save_settings()
-        self.main.timer.stop()
-        self.main.timer.start(self.main._update)
+        if self.main.isVisible():
+            self.main._subscribe()
         self.close()
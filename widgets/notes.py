@@ -4,11 +4,11 @@ import base64
 from PyQt5.QtWidgets import QWidget, QTextEdit, QPushButton, QListWidget
 from PyQt5.QtWidgets import QListWidgetItem, QCheckBox, QMessageBox, QComboBox
 from PyQt5.QtWidgets import QLabel, QGridLayout
-from PyQt5.QtGui import QIcon
 from PyQt5.QtCore import Qt
 from core.api import Widget, WidgetInfo
 from core.gui.edit import Edit
 from core.paths import RES, SETTINGS, DELETE, SUCCESS
+from core.resources import get_icon, get_style
 from core.utils import try_except, print_stack_trace
 from core.gui.drag import mouse_enter
 
@@ -66,7 +66,8 @@ class Info(WidgetInfo):
         self.AUTHOR = 'InterVi'
         self.EMAIL = 'intervionly@gmail.com'
         self.URL = 'https://github.com/InterVi/DeWidgets'
-        self.ICON = QIcon(os.path.join(RES, 'notes', 'icon.png'))
+        self.ICON_PATH = os.path.join(RES, 'notes', 'icon.png')
+        self.ICON = get_icon(self.ICON_PATH)
 
 
 class Main(Widget, Note):
@@ -109,12 +110,11 @@ class Main(Widget, Note):
         self.conf['sizes'] = json.dumps(self.sizes)
         self.conf['editable'] = json.dumps(self.editable)
         if 'hot_saves' in self.conf and self.conf['hot_saves'] == 'true':
-            self.widget_manager.config.save()
+            self.widget_manager.config.save(self.info.NAME)
 
     def get_style(self, index=0) -> str:
-        path = os.path.join(RES, 'notes', 'css', self.styles[index])
-        with open(path, encoding='utf-8') as file:
-            return file.read()
+        return get_style(os.path.join(RES, 'notes', 'css',
+                                      self.styles[index]))
 
     def _load_settings(self):
         self.conf = self.widget_manager.get_config(self.info.NAME)
@@ -183,7 +183,7 @@ class Settings(QWidget):
         self.main = main
         self.note_settings = None
         # setup window
-        self.setWindowIcon(QIcon(SETTINGS))
+        self.setWindowIcon(get_icon(SETTINGS))
         self.setWindowTitle(main.lang['settings_title'])
         self.resize(400, 400)
         # setup list
@@ -279,7 +279,7 @@ class Settings(QWidget):
                            self.main.lang['delete_title'],
                            self.main.lang['delete_text'],
                            QMessageBox.Yes | QMessageBox.No, self)
-        mbox.setWindowIcon(QIcon(DELETE))
+        mbox.setWindowIcon(get_icon(DELETE))
         mbox.setInformativeText(self.main.lang['delete_inf'].format(
             self.list.currentItem().text()))
         yes = mbox.button(QMessageBox.Yes)
@@ -336,7 +336,7 @@ class Settings(QWidget):
                            self.main.lang['success_title'],
                            self.main.lang['success_text'], QMessageBox.Ok,
                            self)
-        mbox.setWindowIcon(QIcon(SUCCESS))
+        mbox.setWindowIcon(get_icon(SUCCESS))
         ok = mbox.button(QMessageBox.Ok)
         ok.setText(self.main.lang['success_ok_button'])
         ok.setToolTip(self.main.lang['success_ok_button_tt'])
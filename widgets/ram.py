@@ -1,14 +1,15 @@
 import os
-from distutils.util import strtobool
-import psutil
-from PyQt5.QtWidgets import QWidget, QLabel, QProgressBar, QPushButton
+from PyQt5.QtWidgets import QWidget, QLabel, QPushButton
 from PyQt5.QtWidgets import QCheckBox, QHBoxLayout, QVBoxLayout, QSpinBox
 from PyQt5.QtWidgets import QColorDialog, QGridLayout
-from PyQt5.QtGui import QIcon, QColor, QPalette, QFont
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QColor, QPalette, QFont
+from PyQt5.QtCore import Qt
 from core.api import Widget, WidgetInfo
 from core.paths import RES, SETTINGS
-from core.utils import try_except
+from core.resources import get_icon, get_style
+from core.utils import try_except, strtobool
+from core.metrics import get_hub
+from core.views import RetainedView
 
 
 class Info(WidgetInfo):
@@ -21,7 +22,8 @@ class Info(WidgetInfo):
         self.AUTHOR = 'InterVi'
         self.EMAIL = 'intervionly@gmail.com'
         self.URL = 'https://github.com/InterVi/DeWidgets'
-        self.ICON = QIcon(os.path.join(RES, 'ram', 'icon.png'))
+        self.ICON_PATH = os.path.join(RES, 'ram', 'icon.png')
+        self.ICON = get_icon(self.ICON_PATH)
 
 
 class Main(Widget, QWidget):
@@ -36,16 +38,10 @@ class Main(Widget, QWidget):
         self.setLayout(QVBoxLayout(self))
         self.layout().setContentsMargins(0, 0, 0, 0)
         # setup stylesheet
-        with open(os.path.join(RES, 'ram', 'style.css'), encoding='utf-8'
-                  ) as file:
-            style = file.read()
-            self.setStyleSheet(style)
+        self.setStyleSheet(get_style(os.path.join(RES, 'ram', 'style.css')))
         self.setAttribute(Qt.WA_TranslucentBackground)
-        # setup timer
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.setup_ui)
         # setup vars
-        self._widgets = []
+        self._view = RetainedView(self)
         self._setup_vars()
 
     def _setup_vars(self):
@@ -60,53 +56,44 @@ class Main(Widget, QWidget):
         self._palette.setColor(QPalette.WindowText, QColor('#000000'))
         self._font = QFont()
 
-    def __set_info(self, swap=False):
-        mem = psutil.swap_memory() if swap else psutil.virtual_memory()
+    def _get_fields(self) -> list:
+        fields = []
+        if self._ram:
+            fields.append('virtual_memory')
+        if self._swap:
+            fields.append('swap_memory')
+        return fields
+
+    def _subscribe(self):
+        get_hub().subscribe(self.setup_ui, self._get_fields(), self._update)
+
+    def __set_info(self, mem, swap=False):
         p = pow(2, 20) if self._mb else pow(2, 30)
         total = round(mem.total / p, self._round)
         used = round(mem.used / p if swap else (mem.total - mem.available) / p,
                      self._round)
         percent = round(mem.percent if swap else
                         (mem.total - mem.available) / mem.total * 100, 0)
+        key = 'swap' if swap else 'ram'
         if self._labels:
             text = self.lang['swap'] if swap else self.lang['ram']
-            label = QLabel(text, self)
-            label.setAlignment(Qt.AlignCenter)
-            label.setPalette(self._palette)
-            label.setFont(self._font)
-            self._widgets.append(label)
-            self.layout().addWidget(label)
-        bar = QProgressBar(self)
-        bar.setMinimum(0)
-        bar.setMaximum(100)
-        bar.setValue(percent)
-        self._widgets.append(bar)
-        self.layout().addWidget(bar)
+            self._view.label((key, 'title'), text)
+        self._view.bar((key, 'bar'), int(percent))
         if self._text:
             text = self.lang['text_mb'] if self._mb else \
                 self.lang['text_gb']
             d = {'t': str(total), 'u': str(used)}
-            label = QLabel(text.format(**d), self)
-            label.setAlignment(Qt.AlignCenter)
-            label.setPalette(self._palette)
-            label.setFont(self._font)
-            self._widgets.append(label)
-            self.layout().addWidget(label)
+            self._view.label((key, 'text'), text.format(**d))
 
     @try_except()
-    def setup_ui(self):
-        if self._widgets:  # clear
-            for w in self._widgets:
-                self.layout().removeWidget(w)
-                w.deleteLater()
-            self._widgets.clear()
-        # setup elements
-        if self._ram:
-            self.__set_info()
-        if self._swap:
-            self.__set_info(True)
-        # set layout
-        self.layout().update()
+    def setup_ui(self, snapshot):
+        self._view.set_style(self._palette, self._font)
+        self._view.begin()
+        if self._ram and snapshot.get('virtual_memory'):
+            self.__set_info(snapshot.get('virtual_memory'))
+        if self._swap and snapshot.get('swap_memory'):
+            self.__set_info(snapshot.get('swap_memory'), True)
+        self._view.end()
 
     def _load_settings(self):
         self.conf = self.widget_manager.get_config(self.info.NAME)
@@ -149,6 +136,7 @@ class Main(Widget, QWidget):
         self.settings_win = Settings(self)
 
     def unload(self):
+        get_hub().unsubscribe(self.setup_ui)
         self.save_settings()
 
     def place(self):
@@ -159,20 +147,19 @@ class Main(Widget, QWidget):
         self._load_settings()
 
     def remove(self):
-        self.timer.stop()
+        get_hub().unsubscribe(self.setup_ui)
 
     def purge(self):
-        self.timer.stop()
+        get_hub().unsubscribe(self.setup_ui)
         self._setup_vars()
 
     @try_except()
     def showEvent(self, event):
-        self.setup_ui()
-        self.timer.start(self._update)
+        self._subscribe()
 
     @try_except()
     def hideEvent(self, event):
-        self.timer.stop()
+        get_hub().unsubscribe(self.setup_ui)
 
 
 class Settings(QWidget):
@@ -182,7 +169,7 @@ class Settings(QWidget):
         self.main = main
         self.lang = main.lang
         # setup window
-        self.setWindowIcon(QIcon(SETTINGS))
+        self.setWindowIcon(get_icon(SETTINGS))
         self.setWindowTitle(self.lang['settings_title'])
         self.resize(410, 240)
         # setup vars
@@ -293,6 +280,6 @@ class Settings(QWidget):
         self.main._font.setPointSize(self.size_spinbox.value())
         self.main._font.setBold(self.bold_checkbox.isChecked())
         self.main.save_settings()
-        self.main.timer.stop()
-        self.main.timer.start(self.main._update)
+        if self.main.isVisible():
+            self.main._subscribe()
         self.close()
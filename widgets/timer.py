@@ -2,17 +2,17 @@ import os
 import time
 import math
 import json
-from distutils.util import strtobool
 from PyQt5.QtWidgets import QWidget, QLCDNumber, QVBoxLayout, QHBoxLayout
 from PyQt5.QtWidgets import QLabel, QListWidget, QSpinBox, QPushButton, QMenu
 from PyQt5.QtWidgets import QCheckBox, QSlider, QMessageBox, QSystemTrayIcon
 from PyQt5.QtWidgets import QListWidgetItem
-from PyQt5.QtGui import QIcon
-from PyQt5.QtCore import QTimer, Qt, QUrl
-from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
+from PyQt5.QtCore import QTimer, Qt
 from core.api import Widget, WidgetInfo
 from core.paths import RES, SETTINGS, PLAY, PAUSE, STOP, SUCCESS
-from core.utils import try_except
+from core.resources import get_icon, get_style
+from core.utils import try_except, strtobool
+from core import clock
+from core.sound import get_engine
 
 
 class Info(WidgetInfo):
@@ -25,7 +25,76 @@ class Info(WidgetInfo):
         self.AUTHOR = 'InterVi'
         self.EMAIL = 'intervionly@gmail.com'
         self.URL = 'https://github.com/InterVi/DeWidgets'
-        self.ICON = QIcon(os.path.join(RES, 'timer', 'icon.png'))
+        self.ICON_PATH = os.path.join(RES, 'timer', 'icon.png')
+        self.ICON = get_icon(self.ICON_PATH)
+
+
+class Countdown:
+    """timer data: time settings, enabled, alarm state and deadline"""
+    def __init__(self, h=0, m=0, s=0, enabled=True):
+        self.time = h, m, s
+        """(hours, minutes, seconds)"""
+        self.enabled = enabled
+        self.pending = True
+        """alarm is not fired yet"""
+        self.remaining = self.get_duration()
+        """seconds left (if not running)"""
+        self.deadline = None
+        """absolute time from clock.now() (None - not running)"""
+        self.lcd = None
+        """(QLCDNumber, QLCDNumber, QLCDNumber)"""
+        self.h_box = None
+        """QHBoxLayout with LCDs"""
+        self._shown = None
+
+    def get_duration(self) -> int:
+        return self.time[0] * 3600 + self.time[1] * 60 + self.time[2]
+
+    def get_remaining(self, time_) -> float:
+        if self.deadline is None:
+            return self.remaining
+        return max(0.0, self.deadline - time_)
+
+    def start(self, time_) -> bool:
+        """Run countdown if enabled and not finished.
+
+        :param time_: float, current clock.now()
+        :return: bool, True if running
+        """
+        if self.deadline is None and self.enabled and self.pending and \
+                self.remaining > 0:
+            self.deadline = time_ + self.remaining
+        return self.deadline is not None
+
+    def stop(self, time_):
+        """Freeze remaining time.
+
+        :param time_: float, current clock.now()
+        """
+        if self.deadline is not None:
+            self.remaining = self.get_remaining(time_)
+            self.deadline = None
+
+    def set_time(self, h, m, s):
+        self.time = h, m, s
+        self.remaining = self.get_duration()
+        self.deadline = None
+        self.pending = True
+
+    def display(self, time_) -> bool:
+        """Show remaining time in LCDs (only if changed).
+
+        :param time_: float, current clock.now()
+        :return: bool, True if changed
+        """
+        sec = int(math.ceil(self.get_remaining(time_)))
+        if sec == self._shown or not self.lcd:
+            return False
+        self._shown = sec
+        h, m, s = sec // 3600, sec % 3600 // 60, sec % 60
+        for i in range(3):
+            self.lcd[i].display((h, m, s)[i])
+        return True
 
 
 class Main(Widget, QWidget):
@@ -37,21 +106,22 @@ class Main(Widget, QWidget):
         self.lang = info.lang
         self.settings_win = None
         # setup window
-        with open(os.path.join(RES, 'timer', 'style.css'),
-                  encoding='utf-8') as file:
-            self.setStyleSheet(file.read())
+        self.setStyleSheet(get_style(os.path.join(RES, 'timer', 'style.css')))
         # setup menu
         self.menu = QMenu(self)
-        start_action = self.menu.addAction(QIcon(PLAY), self.lang['start'])
+        start_action = self.menu.addAction(get_icon(PLAY), self.lang['start'])
         start_action.triggered.connect(self._start)
-        pause_action = self.menu.addAction(QIcon(PAUSE), self.lang['pause'])
+        pause_action = self.menu.addAction(get_icon(PAUSE), self.lang['pause'])
         pause_action.triggered.connect(self._pause)
-        reset_action = self.menu.addAction(QIcon(STOP), self.lang['reset'])
+        reset_action = self.menu.addAction(get_icon(STOP), self.lang['reset'])
         reset_action.triggered.connect(self._reset)
         # all setups
         self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.PreciseTimer)
         self.timer.timeout.connect(self._tick)
-        self._last = 0
+        self.queue = clock.DeadlineQueue()
+        self._running = False
         self.list = []
         self.shows = {}
         self.v_box = QVBoxLayout(self)
@@ -65,74 +135,94 @@ class Main(Widget, QWidget):
 
     @try_except()
     def _add_timer(self, h=0, m=0, s=0, enabled=True):
-        lcd = QLCDNumber(self), QLCDNumber(self), QLCDNumber(self)
-        for i in range(3):
-            lcd[i].display((h, m, s)[i])
-            lcd[i].setDigitCount(2)
-            lcd[i].setSegmentStyle(QLCDNumber.Flat)
-            lcd[i].setEnabled(enabled)
-        h_box = QHBoxLayout()
-        h_box.setContentsMargins(0, 0, 0, 0)
-        h_box.setSpacing(0)
-        h_box.addWidget(lcd[0])
-        h_box.addWidget(lcd[1])
-        h_box.addWidget(lcd[2])
-        self.v_box.addLayout(h_box)
-        # ------ 0 ------------ 1 -------- 2 -------- 3 -------- 4 ---
-        # (lcd, lcd, lcd), QHBoxLayout, is past, is enabled, (h, m, s)
-        self.list.append((lcd, h_box, True, enabled, (h, m, s)))
+        countdown = Countdown(h, m, s, enabled)
+        countdown.lcd = QLCDNumber(self), QLCDNumber(self), QLCDNumber(self)
+        for lcd in countdown.lcd:
+            lcd.setDigitCount(2)
+            lcd.setSegmentStyle(QLCDNumber.Flat)
+            lcd.setEnabled(enabled)
+        countdown.h_box = QHBoxLayout()
+        countdown.h_box.setContentsMargins(0, 0, 0, 0)
+        countdown.h_box.setSpacing(0)
+        for lcd in countdown.lcd:
+            countdown.h_box.addWidget(lcd)
+        self.v_box.addLayout(countdown.h_box)
+        self.list.append(countdown)
+        self._schedule(countdown)
 
     def _delete_timer(self, index):
-        self.v_box.removeItem(self.list[index][1])
+        self.queue.remove(self.list[index])
+        self.v_box.removeItem(self.list[index].h_box)
         del self.list[index]
         self._reset()  # render bug not fixed :(
 
     @try_except()
     def _turn_enabled(self, index, enabled):
-        item = self.list[index]
-        for lcd in item[0]:
+        countdown = self.list[index]
+        countdown.enabled = enabled
+        for lcd in countdown.lcd:
             lcd.setEnabled(enabled)
-        self.list[index] = item[0], item[1], item[2], enabled, item[4]
+        if not enabled:
+            countdown.stop(clock.now())
+        self._schedule(countdown)
+
+    @try_except()
+    def _edit_timer(self, index, time_, enabled):
+        countdown = self.list[index]
+        countdown.set_time(*time_)
+        self._turn_enabled(index, enabled)
+
+    def _schedule(self, countdown):
+        """Update deadlines queue, display and refresh timer for changed
+        countdown."""
+        time_ = clock.now()
+        if self._running and countdown.start(time_):
+            self.queue.push(countdown, countdown.deadline)
+        else:
+            self.queue.remove(countdown)
+        countdown.display(time_)
+        if self._running:
+            self._tick()
 
     @try_except()
     def _tick(self):
+        time_ = clock.now()
+        for deadline, countdown in self.queue.pop_due(time_):  # alarms
+            countdown.stop(deadline)
+            countdown.display(time_)
+            countdown.pending = False
+            self._alarm(self.list.index(countdown))
+        # refresh displays, find nearest second change
         ticked = False
-        sec = math.floor(time.time() - self._last)  # amplify precision
-        if not sec:
-            return
-        for n in range(len(self.list)):
-            item = self.list[n]
-            if not item[3]:
+        delay = None
+        for countdown in self.list:
+            if countdown.deadline is None:
                 continue
-            for i in range(int(sec)):
-                if not item[0][2].value():
-                    if item[0][1].value() or item[0][0].value():
-                        item[0][2].display(59)
-                        if item[0][1].value():
-                            item[0][1].display(item[0][1].value() - 1)
-                        else:
-                            item[0][1].display(59)
-                            item[0][0].display(item[0][0].value() - 1)
-                else:
-                    item[0][2].display(item[0][2].value() - 1)
-                if not item[0][2].value() and not item[0][1].value() \
-                        and not item[0][0].value() and item[2]:
-                    self._alarm(n)
-                    self.list[n] = item[0], item[1], False, item[3], item[4]
-                else:
-                    ticked = True
+            if countdown.display(time_):
+                ticked = True
+            left = countdown.deadline - time_
+            frac = left - math.floor(left)
+            if delay is None or (frac if frac else 1.0) < delay:
+                delay = frac if frac else 1.0
+        head = self.queue.peek()
+        if head and (delay is None or head[0] - time_ < delay):
+            delay = head[0] - time_
         if ticked:
-            self._last += 1  # amplify precision
             self._sec_sound()
-        else:
+        if delay is None:  # all finished
             self.timer.stop()
+        else:
+            self.timer.start(max(1, int(math.ceil(delay * 1000))))
+
+    @try_except()
+    def _play(self, file, volume):
+        get_engine().play(file, volume)
 
     @try_except()
-    def _play(self, file, volume):  # strange, big memory leak and crash
-        player = QMediaPlayer(self)
-        player.setMedia(QMediaContent(QUrl.fromLocalFile(file)))
-        player.setVolume(volume)
-        player.play()
+    def _load_sounds(self):
+        engine = get_engine()
+        for file in self.TICK, self.TACK, self.ALARM:
+            engine.load(file)
 
     @try_except()
     def _sec_sound(self):
@@ -165,18 +255,28 @@ class Main(Widget, QWidget):
 
     @try_except()
     def _start(self, checked):
-        self._last = time.time()
-        self.timer.start(int(self.conf['tick_ms']))  # amplify precision
+        self._running = True
+        time_ = clock.now()
+        for countdown in self.list:
+            if countdown.start(time_):
+                self.queue.push(countdown, countdown.deadline)
+        self._tick()
 
     @try_except()
-    def _pause(self, checked):
+    def _pause(self, checked=False):
+        self._running = False
         self.timer.stop()
+        self.queue.clear()
+        time_ = clock.now()
+        for countdown in self.list:
+            countdown.stop(time_)
+            countdown.display(time_)
 
     @try_except()
     def _reset(self, checked=False):
-        self.timer.stop()
+        self._pause()
         for timer in self.list:
-            self.v_box.removeItem(timer[1])
+            self.v_box.removeItem(timer.h_box)
         self._save_timers()
         self.list.clear()
         self._load_timers()
@@ -195,7 +295,8 @@ class Main(Widget, QWidget):
             return
         timers = []
         for timer in self.list:
-            timers.append((timer[4][0], timer[4][1], timer[4][2], timer[3]))
+            timers.append((timer.time[0], timer.time[1], timer.time[2],
+                           timer.enabled))
         self.conf['timers'] = json.dumps(timers)
 
     def _setup_conf(self):
@@ -214,16 +315,18 @@ class Main(Widget, QWidget):
             self.conf['alarm_volume'] = str(100)
         if 'seconds_volume' not in self.conf:
             self.conf['seconds_volume'] = str(100)
-        if 'tick_ms' not in self.conf:
-            self.conf['tick_ms'] = str(10)
+        if 'tick_ms' in self.conf:  # not used, deadlines are exact
+            del self.conf['tick_ms']
 
     def place(self):
         self._setup_conf()
         self._load_timers()
+        self._load_sounds()
 
     def boot(self):
         self._setup_conf()
         self._load_timers()
+        self._load_sounds()
 
     def unload(self):
         self._save_timers()
@@ -240,12 +343,12 @@ class Main(Widget, QWidget):
     @try_except()
     def mouseDoubleClickEvent(self, event):
         index = int(event.pos().y()/(self.height()/(len(self.list))))
-        self._turn_enabled(index, not self.list[index][3])
+        self._turn_enabled(index, not self.list[index].enabled)
 
     def get_timer_text(self, index) -> str:
-        timer = str(self.list[index][4][0]) + ':'
-        timer += str(self.list[index][4][1]) + ':'
-        timer += str(self.list[index][4][2])
+        timer = str(self.list[index].time[0]) + ':'
+        timer += str(self.list[index].time[1]) + ':'
+        timer += str(self.list[index].time[2])
         return timer
 
 
@@ -260,7 +363,7 @@ class Timeout(QMessageBox):
         self.index = index
         # setup window
         self.setStandardButtons(QMessageBox.NoButton)
-        self.setWindowIcon(QIcon(SUCCESS))
+        self.setWindowIcon(get_icon(SUCCESS))
         self.setWindowFlags(Qt.WindowMinimizeButtonHint |
                             Qt.WindowStaysOnTopHint | Qt.Tool)
         # setup 'Ok' button
@@ -283,7 +386,7 @@ class Settings(QWidget):
         QWidget.__init__(self)
         self.ts_win = None
         # setup window
-        self.setWindowIcon(QIcon(SETTINGS))
+        self.setWindowIcon(get_icon(SETTINGS))
         self.setWindowTitle(main.lang['settings_title'])
         self.resize(300, 400)
         # setup list
@@ -341,14 +444,6 @@ class Settings(QWidget):
             self.notify_time.setValue(int(int(main.conf['notify_msec'])/1000))
         else:
             self.notify_time.setValue(10)
-        # setup 'Tick' label
-        self.tick_label = QLabel(main.lang['tick_label'], self)
-        # setup 'Tick ms' spinbox
-        self.tick_ms = QSpinBox(self)
-        self.tick_ms.setToolTip(main.lang['tick_ms_tt'])
-        self.tick_ms.valueChanged.connect(self._tick_changed)
-        if 'tick_ms' in main.conf:
-            self.tick_ms.setValue(int(main.conf['tick_ms']))
         # setup 'Add' button
         self.add_button = QPushButton(main.lang['add_button'], self)
         self.add_button.setToolTip(main.lang['add_button_tt'])
@@ -373,10 +468,6 @@ class Settings(QWidget):
         self.h_box3 = QHBoxLayout()
         self.h_box3.addWidget(self.notify_checkbox)
         self.h_box3.addWidget(self.notify_time)
-        # setup tick h box layout
-        self.h_box4 = QHBoxLayout()
-        self.h_box4.addWidget(self.tick_label)
-        self.h_box4.addWidget(self.tick_ms)
         # setup v box layout
         self.v_box = QVBoxLayout(self)
         self.v_box.addWidget(self.list)
@@ -384,7 +475,6 @@ class Settings(QWidget):
         self.v_box.addLayout(self.h_box3)
         self.v_box.addLayout(self.h_box1)
         self.v_box.addLayout(self.h_box2)
-        self.v_box.addLayout(self.h_box4)
         self.v_box.addWidget(self.add_button)
         self.v_box.addWidget(self.delete_button)
         self.v_box.addWidget(self.close_button)
@@ -404,7 +494,7 @@ class Settings(QWidget):
         self.list.clear()
         for i in range(len(self.main.list)):
             item = QListWidgetItem(self.main.get_timer_text(i), self.list)
-            if self.main.list[i][3]:
+            if self.main.list[i].enabled:
                 font = item.font()
                 font.setBold(True)
                 item.setFont(font)
@@ -442,10 +532,6 @@ class Settings(QWidget):
     def _time_changed(self, value):
         self.main.conf['notify_msec'] = str(int(value * 1000))
 
-    @try_except()
-    def _tick_changed(self, value):
-        self.main.conf['tick_ms'] = str(int(value))
-
     @try_except()
     def _add(self, checked):
         self.ts_win = TimerSettings(self)
@@ -483,20 +569,20 @@ class TimerSettings(QWidget):
         # setup 'Hours' spinbox
         self.hbox = QSpinBox(self)
         if edit:
-            self.hbox.setValue(self.main.list[self.index][4][0])
+            self.hbox.setValue(self.main.list[self.index].time[0])
         # setup 'Minuts' spinbox
         self.mbox = QSpinBox(self)
         if edit:
-            self.mbox.setValue(self.main.list[self.index][4][1])
+            self.mbox.setValue(self.main.list[self.index].time[1])
         # setup 'Seconds' spinbox
         self.sbox = QSpinBox(self)
         if edit:
-            self.sbox.setValue(self.main.list[self.index][4][2])
+            self.sbox.setValue(self.main.list[self.index].time[2])
         # setup 'Enabled' checkbox
         self.enabled = QCheckBox(self.main.lang['ts_enabled'], self)
         self.enabled.setToolTip(self.main.lang['ts_enabled_tt'])
         if edit:
-            self.enabled.setChecked(self.main.list[self.index][3])
+            self.enabled.setChecked(self.main.list[self.index].enabled)
         else:
             self.enabled.setChecked(True)
         # setup 'Save' button
@@ -535,14 +621,10 @@ class TimerSettings(QWidget):
     @try_except()
     def _save_exit(self, checked):
         if self.edit:
-            item = self.main.list[self.index]
-            time_ = self.hbox.value(), self.mbox.value(), self.sbox.value()
-            e = self.enabled.isChecked()
-            for i in range(3):
-                item[0][i].display(time_[i])
-                item[0][i].setEnabled(e)
-            self.main.list[self.index] = (item[0], item[1], item[2], e,
-                                          time_)
+            self.main._edit_timer(self.index, (self.hbox.value(),
+                                               self.mbox.value(),
+                                               self.sbox.value()),
+                                  self.enabled.isChecked())
             self.settings._list_fill()
             self.settings._change_enabled()
         else: